@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Import-time regression check (`python -X importtime`).
+
+  python bench/bench_importtime.py [--runs 5] [--budget-ui 400] [--budget-cli 60] [--budget-sub 100]
+
+For each entry, runs a fresh interpreter --runs times and reports the median
+cumulative import time plus the slowest modules (self time). Entries are
+pkgpicker.ui_app, pkgpicker.cli on its own, and one per CLI subcommand: cli plus
+every pkgpicker module the subcommand's handler imports lazily (found by walking
+cmd_<name> and the cli helpers it calls), i.e. what `pkgpicker <name>` really
+loads before it does any work. Fails if a budget (ms) is exceeded or if an entry
+drags in something it must not:
+  pkgpicker.ui_app  → no tab module (they load when their tab is first shown)
+  pkgpicker.cli     → no textual (the subcommands neither)
+Entries whose dependencies are missing (textual) are reported and skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CLI = os.path.join(ROOT, "pkgpicker", "cli.py")
+
+FORBIDDEN = {
+    "pkgpicker.ui_app": ("pkgpicker.tabs.",),
+    "pkgpicker.cli": ("textual",),
+}
+
+def subcommand_modules() -> Dict[str, List[str]]:
+    """subcommand -> pkgpicker modules imported by cmd_<name> (and the cli functions it calls)."""
+    with open(CLI, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    funcs = {n.name: n for n in tree.body if isinstance(n, ast.FunctionDef)}
+    subs: Tuple[str, ...] = ()
+    for n in tree.body:
+        if isinstance(n, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "SUBCOMMANDS" for t in n.targets):
+            subs = tuple(ast.literal_eval(n.value))
+
+    def walk(name: str, seen: Set[str]) -> Set[str]:
+        if name in seen or name not in funcs:
+            return set()
+        seen.add(name)
+        mods: Set[str] = set()
+        for node in ast.walk(funcs[name]):
+            if isinstance(node, ast.ImportFrom) and node.level == 1:
+                if node.module:
+                    mods.add(f"pkgpicker.{node.module}")
+                else:
+                    mods.update(f"pkgpicker.{a.name}" for a in node.names)
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+                mods |= walk(node.func.id, seen)
+        return mods
+
+    return {s: sorted(walk(f"cmd_{s}", set())) for s in subs}
+
+def importtime(modules: List[str]) -> Optional[Tuple[int, Dict[str, Tuple[int, int]]]]:
+    """
+    (cumulative µs of all pkgpicker imports, module -> (self µs, cumulative µs)) for
+    one cold import of `modules`, None if the import fails.
+    """
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if p.returncode != 0:
+        return None
+    out: Dict[str, Tuple[int, int]] = {}
+    total = 0
+    for ln in p.stderr.splitlines():
+        if not ln.startswith("import time:") or "|" not in ln:
+            continue
+        parts = ln[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        raw = parts[2][1:]
+        name = raw.strip()
+        out[name] = (int(parts[0]), int(parts[1]))
+        if raw == name and name.startswith("pkgpicker"):  # top level: nested ones are inside its cumulative
+            total += int(parts[1])
+    return total, out
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=8)
+    ap.add_argument("--budget-ui", type=float, default=400.0, help="ms for pkgpicker.ui_app")
+    ap.add_argument("--budget-cli", type=float, default=60.0, help="ms for pkgpicker.cli")
+    ap.add_argument("--budget-sub", type=float, default=100.0, help="ms for each CLI subcommand's import chain")
+    args = ap.parse_args()
+
+    entries: List[Tuple[str, List[str], float, Tuple[str, ...]]] = [
+        ("pkgpicker.ui_app", ["pkgpicker.ui_app"], args.budget_ui, FORBIDDEN["pkgpicker.ui_app"]),
+        ("pkgpicker.cli", ["pkgpicker.cli"], args.budget_cli, FORBIDDEN["pkgpicker.cli"]),
+    ]
+    for sub, mods in subcommand_modules().items():
+        entries.append((f"pkgpicker {sub}", ["pkgpicker.cli"] + mods, args.budget_sub, FORBIDDEN["pkgpicker.cli"]))
+
+    bad = 0
+    for label, modules, budget, forbidden in entries:
+        runs: List[Tuple[int, Dict[str, Tuple[int, int]]]] = []
+        for _ in range(max(1, args.runs)):
+            r = importtime(modules)
+            if r is None:
+                break
+            runs.append(r)
+        if not runs:
+            print(f"{label}: import failed (missing dependency?) → skipped")
+            continue
+        total = statistics.median(t for t, _ in runs) / 1000
+        flag = "OK" if total <= budget else "OVER BUDGET"
+        print(f"{label}: {total:.1f} ms cumulative (median of {len(runs)}, budget {budget:.0f} ms) {flag}")
+        if len(modules) > 1:
+            print(f"  chain: {', '.join(m[len('pkgpicker.'):] for m in modules)}")
+        if total > budget:
+            bad += 1
+        last = runs[-1][1]
+        for name, (self_us, _) in sorted(last.items(), key=lambda kv: -kv[1][0])[: args.top]:
+            print(f"  {self_us / 1000:7.2f} ms  {name}")
+        leaked = sorted(n for n in last if n.startswith(forbidden))
+        if leaked:
+            bad += 1
+            print(f"  REGRESSION: {label} imports {', '.join(leaked[:10])}")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
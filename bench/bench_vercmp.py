@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+vercmp benchmark: pkgpicker.vercmp vs pacman's `vercmp` binary.
+
+  python bench/bench_vercmp.py [--pairs 20000] [--check 3000]
+
+Always verifies the known-answer table from pacman's vercmptest.sh, and that
+version_key() (the sort key used by the cache analyzer) orders the random
+pairs like vercmp().
+If `vercmp` is installed, also compares --check random pairs against it
+(one process per pair, so keep that number moderate) and reports mismatches.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pkgpicker.arch import which  # noqa: E402
+from pkgpicker.vercmp import parse_evr, vercmp, version_key  # noqa: E402
+
+KNOWN = [
+    ("1.5.0", "1.5.0", 0), ("1.5.1", "1.5.0", 1), ("1.5.1", "1.5", 1),
+    ("1.5.0-1", "1.5.0-1", 0), ("1.5.0-1", "1.5.0-2", -1), ("1.5.0-1", "1.5.1-1", -1), ("1.5.0-2", "1.5.1-1", -1),
+    ("1.5-1", "1.5.1-1", -1), ("1.5-2", "1.5.1-1", -1), ("1.5-2", "1.5.1-2", -1),
+    ("1.5", "1.5-1", 0), ("1.5-1", "1.5", 0), ("1.1-1", "1.1", 0), ("1.0-1", "1.1", -1), ("1.1-1", "1.0", 1),
+    ("1.5b-1", "1.5-1", -1), ("1.5b", "1.5", -1), ("1.5b-1", "1.5", -1), ("1.5b", "1.5.1", -1),
+    ("1.0a", "1.0alpha", -1), ("1.0alpha", "1.0b", -1), ("1.0b", "1.0beta", -1), ("1.0beta", "1.0rc", -1), ("1.0rc", "1.0", -1),
+    ("1.5.a", "1.5", 1), ("1.5.b", "1.5.a", 1), ("1.5.1", "1.5.b", 1),
+    ("1.5.b-1", "1.5.b", 0), ("1.5-1", "1.5.b", -1),
+    ("2.0", "2_0", 0), ("2.0_a", "2_0.a", 0), ("2.0a", "2.0.a", -1), ("2___a", "2_a", 1),
+    ("0:1.0", "0:1.0", 0), ("0:1.0", "0:1.1", -1), ("1:1.0", "0:1.0", 1), ("1:1.0", "0:1.1", 1), ("1:1.0", "2:1.1", -1),
+    ("1:1.0", "0:1.0-1", 1), ("1:1.0-1", "0:1.1-1", 1),
+    ("0:1.0", "1.0", 0), ("0:1.0", "1.1", -1), ("0:1.1", "1.0", 1), ("1:1.0", "1.0", 1), ("1:1.0", "1.1", 1), ("1:1.1", "1.1", 1),
+]
+
+def _sign(x: int) -> int:
+    return (x > 0) - (x < 0)
+
+def _rand_version(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append(str(rng.randint(0, 30)).zfill(rng.choice((1, 1, 1, 2))))
+        elif kind < 0.8:
+            parts.append(rng.choice(("a", "b", "rc", "alpha", "beta", "pre", "r")) + str(rng.randint(0, 9)))
+        else:
+            parts.append(rng.choice(("git", "r1234", "g1a2b3c", "20240101")))
+    v = rng.choice((".", ".", "_", "+")).join(parts)
+    if rng.random() < 0.15:
+        v = f"{rng.randint(1, 3)}:{v}"
+    if rng.random() < 0.85:
+        v = f"{v}-{rng.randint(1, 5)}"
+    return v
+
+def _mutate(rng: random.Random, v: str) -> str:
+    # neighbours are far more interesting than independent random strings
+    choices = [
+        lambda s: s,
+        lambda s: s + ".1",
+        lambda s: s.replace(".", "_", 1),
+        lambda s: s.rsplit("-", 1)[0],
+        lambda s: s + "a",
+        lambda s: "1:" + s,
+        lambda s: _rand_version(rng),
+    ]
+    return rng.choice(choices)(v)
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=20000)
+    ap.add_argument("--check", type=int, default=3000)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    bad = 0
+    for a, b, want in KNOWN:
+        for x, y, w in ((a, b, want), (b, a, -want)):
+            got = _sign(vercmp(x, y))
+            if got != w:
+                bad += 1
+                print(f"KNOWN MISMATCH vercmp({x!r}, {y!r}) = {got}, want {w}")
+    print(f"known-answer table: {len(KNOWN) * 2 - bad}/{len(KNOWN) * 2} ok")
+
+    rng = random.Random(args.seed)
+    pairs = []
+    for _ in range(args.pairs):
+        a = _rand_version(rng)
+        pairs.append((a, _mutate(rng, a)))
+
+    t0 = time.perf_counter()
+    res = [vercmp(a, b) for a, b in pairs]
+    dt = time.perf_counter() - t0
+    print(f"pkgpicker.vercmp: {len(pairs)} pairs in {dt * 1000:.1f} ms ({dt / len(pairs) * 1e6:.2f} µs/pair)")
+
+    # vercmp ignores pkgrel unless both sides have one; the key can't, so skip mixed pairs
+    same_rel = [(a, b, r) for (a, b), r in zip(pairs, res) if (parse_evr(a)[2] is None) == (parse_evr(b)[2] is None)]
+    t0 = time.perf_counter()
+    keyed = [_sign((version_key(a) > version_key(b)) - (version_key(a) < version_key(b))) for a, b, _ in same_rel]
+    dt = time.perf_counter() - t0
+    kbad = sum(k != _sign(r) for k, (_, _, r) in zip(keyed, same_rel))
+    bad += kbad
+    print(f"version_key: {len(same_rel)} pairs in {dt * 1000:.1f} ms, disagreements with vercmp: {kbad}")
+
+    if not which("vercmp"):
+        print("vercmp binary not found (pacman) → skipping cross-check")
+        return 1 if bad else 0
+
+    n = min(args.check, len(pairs))
+    t0 = time.perf_counter()
+    mism = 0
+    for (a, b), mine in zip(pairs[:n], res[:n]):
+        out = subprocess.run(["vercmp", a, b], stdout=subprocess.PIPE, text=True).stdout.strip()
+        if _sign(int(out or 0)) != _sign(mine):
+            mism += 1
+            if mism <= 20:
+                print(f"MISMATCH {a!r} {b!r}: vercmp={out} ours={mine}")
+    dt = time.perf_counter() - t0
+    print(f"vercmp binary: {n} pairs in {dt * 1000:.0f} ms ({dt / n * 1e6:.0f} µs/pair), mismatches: {mism}")
+    return 1 if (bad or mism) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
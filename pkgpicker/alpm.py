@@ -0,0 +1,265 @@
+from __future__ import annotations
+import os
+import re
+import tarfile
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import PkgMeta
+from .units import unit_from_path
+from .vercmp import vercmp
+
+# Read-only access to the pacman databases without spawning pacman/expac.
+DB_PATH = "/var/lib/pacman"
+PACMAN_CONF = "/etc/pacman.conf"
+
+_DEP_SPLIT = re.compile(r"[<>=]")
+_lock = threading.Lock()
+_build_lock = threading.Lock()  # one parser at a time; a second caller waits for the result
+_cache: Dict[str, Tuple[object, object]] = {}
+
+def local_dir() -> str:
+    return os.path.join(DB_PATH, "local")
+
+def sync_dir() -> str:
+    return os.path.join(DB_PATH, "sync")
+
+def dep_name(dep: str) -> str:
+    """'foo>=1:2.0', 'foo: optional reason', 'libfoo.so=1-64' -> bare name."""
+    return _DEP_SPLIT.split(dep, 1)[0].split(":", 1)[0].strip()
+
+def dep_is_versioned(dep: str) -> bool:
+    return _DEP_SPLIT.search(dep.split(": ", 1)[0]) is not None
+
+def parse_desc(text: str) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {}
+    key: Optional[str] = None
+    for ln in text.splitlines():
+        if len(ln) > 2 and ln[0] == "%" and ln[-1] == "%":
+            key = ln[1:-1]
+            out.setdefault(key, [])
+        elif not ln:
+            key = None
+        elif key is not None:
+            out[key].append(ln)
+    return out
+
+def _int(v: List[str]) -> int:
+    try:
+        return int(v[0]) if v else 0
+    except ValueError:
+        return 0
+
+def meta_from_desc(d: Dict[str, List[str]], repo: str) -> Optional[PkgMeta]:
+    name = (d.get("NAME") or [""])[0]
+    if not name:
+        return None
+    g = lambda k: tuple(d.get(k) or ())
+    return PkgMeta(
+        name=name,
+        version=(d.get("VERSION") or [""])[0],
+        repo=repo,
+        desc=(d.get("DESC") or [""])[0],
+        arch=(d.get("ARCH") or [""])[0],
+        url=(d.get("URL") or [""])[0],
+        licenses=g("LICENSE"),
+        groups=g("GROUPS"),
+        depends=g("DEPENDS"),
+        optdepends=g("OPTDEPENDS"),
+        provides=g("PROVIDES"),
+        conflicts=g("CONFLICTS"),
+        replaces=g("REPLACES"),
+        csize=_int(d.get("CSIZE") or []),
+        isize=_int(d.get("ISIZE") or d.get("SIZE") or []),
+        filename=(d.get("FILENAME") or [""])[0],
+        sha256=(d.get("SHA256SUM") or [""])[0],
+        reason=_int(d.get("REASON") or []),
+    )
+
+# -------- generation tokens --------
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def local_generation() -> int:
+    # pacman adds/removes one directory per package → the dir mtime changes on every transaction
+    return _mtime(local_dir())
+
+def sync_repos() -> List[str]:
+    """Repos in pacman.conf order (first match wins), falling back to the *.db files on disk."""
+    try:
+        on_disk = sorted(f[:-3] for f in os.listdir(sync_dir()) if f.endswith(".db"))
+    except OSError:
+        return []
+    ordered: List[str] = []
+    try:
+        for ln in open(PACMAN_CONF, "r", encoding="utf-8"):
+            m = re.match(r"^\s*\[([^\]]+)\]", ln)
+            if m and m.group(1) != "options" and m.group(1) in on_disk:
+                ordered.append(m.group(1))
+    except OSError:
+        pass
+    return ordered + [r for r in on_disk if r not in ordered]
+
+def sync_generation() -> Tuple[Tuple[str, int], ...]:
+    return tuple((r, _mtime(os.path.join(sync_dir(), f"{r}.db"))) for r in sync_repos())
+
+def _cached(key: str, token: object, build):
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] == token:
+            return hit[1]
+    with _build_lock:
+        with _lock:
+            hit = _cache.get(key)
+            if hit and hit[0] == token:
+                return hit[1]
+        val = build()
+        with _lock:
+            _cache[key] = (token, val)
+    return val
+
+def peek(key: str) -> Optional[Tuple[object, object]]:
+    """(token, value) if already built; never builds (used to write the warm-start snapshot)."""
+    with _lock:
+        return _cache.get(key)
+
+def seed(key: str, token: object, val: object) -> None:
+    """Install a value restored from the snapshot; a later token mismatch rebuilds as usual."""
+    with _lock:
+        _cache.setdefault(key, (token, val))
+
+# -------- local DB --------
+def _read_local() -> Dict[str, PkgMeta]:
+    out: Dict[str, PkgMeta] = {}
+    try:
+        entries = list(os.scandir(local_dir()))
+    except OSError:
+        return out
+    for e in entries:
+        if not e.is_dir():
+            continue
+        try:
+            txt = open(os.path.join(e.path, "desc"), "r", encoding="utf-8", errors="replace").read()
+        except OSError:
+            continue
+        m = meta_from_desc(parse_desc(txt), "local")
+        if m:
+            out[m.name] = m
+    return out
+
+def local_packages() -> Dict[str, PkgMeta]:
+    return _cached("local", local_generation(), _read_local)  # type: ignore[return-value]
+
+# -------- sync DBs --------
+def _read_sync_repo(repo: str) -> Dict[str, PkgMeta]:
+    path = os.path.join(sync_dir(), f"{repo}.db")
+    per_dir: Dict[str, Dict[str, List[str]]] = {}
+    try:
+        with tarfile.open(path, "r:*") as tf:
+            for ti in tf:
+                if not ti.isfile():
+                    continue
+                d, _, fname = ti.name.rpartition("/")
+                if fname not in ("desc", "depends"):
+                    continue
+                f = tf.extractfile(ti)
+                if f is None:
+                    continue
+                per_dir.setdefault(d, {}).update(parse_desc(f.read().decode("utf-8", "replace")))
+    except (OSError, tarfile.TarError):
+        # zstd-compressed DBs are not readable by tarfile; callers fall back to "unknown"
+        return {}
+    out: Dict[str, PkgMeta] = {}
+    for d in per_dir.values():
+        m = meta_from_desc(d, repo)
+        if m:
+            out[m.name] = m
+    return out
+
+def sync_packages() -> Dict[str, PkgMeta]:
+    def build() -> Dict[str, PkgMeta]:
+        out: Dict[str, PkgMeta] = {}
+        for repo in sync_repos():
+            for name, m in _read_sync_repo(repo).items():
+                out.setdefault(name, m)
+        return out
+    return _cached("sync", sync_generation(), build)  # type: ignore[return-value]
+
+# -------- systemd units shipped by packages (from %FILES%) --------
+def _units_in(files_text: str) -> Tuple[str, ...]:
+    out = []
+    for ln in files_text.splitlines():
+        u = unit_from_path(ln)
+        if u and "@." not in u:
+            out.append(u)
+    return tuple(sorted(set(out)))
+
+def local_units() -> Dict[str, Tuple[str, ...]]:
+    """installed package -> .service/.socket/.timer units it ships (templates excluded)."""
+    def build() -> Dict[str, Tuple[str, ...]]:
+        out: Dict[str, Tuple[str, ...]] = {}
+        try:
+            entries = list(os.scandir(local_dir()))
+        except OSError:
+            return out
+        for e in entries:
+            if not e.is_dir():
+                continue
+            try:
+                txt = open(os.path.join(e.path, "files"), "r", encoding="utf-8", errors="replace").read()
+            except OSError:
+                continue
+            units = _units_in(txt)
+            if units:
+                # dir is "<name>-<pkgver>-<pkgrel>"
+                out[e.name.rsplit("-", 2)[0]] = units
+        return out
+    return _cached("local_units", local_generation(), build)  # type: ignore[return-value]
+
+def sync_units() -> Dict[str, Tuple[str, ...]]:
+    """Same for repo packages, from the *.files DBs (`pacman -Fy`); empty if those are missing."""
+    def build() -> Dict[str, Tuple[str, ...]]:
+        out: Dict[str, Tuple[str, ...]] = {}
+        for repo in sync_repos():
+            path = os.path.join(sync_dir(), f"{repo}.files")
+            try:
+                with tarfile.open(path, "r:*") as tf:
+                    for ti in tf:
+                        if not ti.isfile() or not ti.name.endswith("/files"):
+                            continue
+                        f = tf.extractfile(ti)
+                        if f is None:
+                            continue
+                        units = _units_in(f.read().decode("utf-8", "replace"))
+                        if units:
+                            out.setdefault(ti.name.rpartition("/")[0].rsplit("-", 2)[0], units)
+            except (OSError, tarfile.TarError):
+                continue
+        return out
+    token = tuple((r, _mtime(os.path.join(sync_dir(), f"{r}.files"))) for r in sync_repos())
+    return _cached("sync_units", token, build)  # type: ignore[return-value]
+
+def provides_index(pkgs: Iterable[PkgMeta]) -> Dict[str, List[str]]:
+    """provided name -> packages providing it (including the package's own name)."""
+    idx: Dict[str, List[str]] = {}
+    for m in pkgs:
+        idx.setdefault(m.name, []).append(m.name)
+        for p in m.provides:
+            idx.setdefault(dep_name(p), []).append(m.name)
+    return idx
+
+def pending_upgrades(local: Optional[Dict[str, PkgMeta]] = None,
+                     sync: Optional[Dict[str, PkgMeta]] = None) -> List[Tuple[PkgMeta, PkgMeta]]:
+    """(installed, newer sync entry) pairs, like `pacman -Qu` against the current sync DBs."""
+    local = local_packages() if local is None else local
+    sync = sync_packages() if sync is None else sync
+    out: List[Tuple[PkgMeta, PkgMeta]] = []
+    for name, lm in local.items():
+        sm = sync.get(name)
+        if sm is not None and vercmp(sm.version, lm.version) > 0:
+            out.append((lm, sm))
+    out.sort(key=lambda t: t[0].name)
+    return out
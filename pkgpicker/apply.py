@@ -0,0 +1,421 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from . import aur
+from .alpm import local_packages, local_units, provides_index, sync_packages
+from .cache import load_json_safe, save_json
+from .models import PkgMeta
+from .pkgcache import PKG_CACHE_DIR
+from .arch import backup_write_user, run_capture, sh_quote, systemctl_active_many, which
+from .plan import PlanSnapshot
+from .units import unit_states
+
+# Plan → privileged operations. No Textual imports: the Plan tab and the CLI share this.
+
+Runner = Callable[[List[str]], Tuple[int, str]]
+Progress = Callable[[str], None]
+
+# -------- config generators --------
+def greetd_config(cmd: str) -> str:
+    return f"""# Generated by pkgpicker
+[terminal]
+vt = 1
+
+[default_session]
+command = "tuigreet --time --remember --cmd {cmd}"
+user = "greeter"
+"""
+
+def hypr_conf() -> str:
+    return r"""# Generated by pkgpicker (Hyprland starter)
+$mod = SUPER
+env = MOZ_ENABLE_WAYLAND,1
+env = QT_QPA_PLATFORM,wayland
+env = SDL_VIDEODRIVER,wayland
+
+exec-once = dbus-update-activation-environment --systemd WAYLAND_DISPLAY XDG_CURRENT_DESKTOP
+exec-once = systemctl --user import-environment WAYLAND_DISPLAY XDG_CURRENT_DESKTOP
+exec-once = waybar
+exec-once = mako
+exec-once = hyprpaper
+exec-once = wl-paste --type text --watch cliphist store
+exec-once = wl-paste --type image --watch cliphist store
+
+input {
+  kb_layout = de
+}
+
+bind = $mod, Return, exec, kitty
+bind = $mod, D, exec, wofi --show drun
+bind = $mod, V, exec, cliphist list | wofi --dmenu | cliphist decode | wl-copy
+bind = $mod, S, exec, grim -g "$(slurp)" - | wl-copy
+"""
+
+def waybar_jsonc() -> str:
+    return r"""{
+  "layer":"top","position":"top","height":30,
+  "modules-left":["hyprland/workspaces","hyprland/window"],
+  "modules-center":["clock"],
+  "modules-right":["pulseaudio","network","battery","tray"],
+  "clock":{"format":"{:%a %d.%m %H:%M}"},
+  "pulseaudio":{"format":" {volume}%","on-click":"pavucontrol"},
+  "network":{"format-wifi":" {essid}","format-ethernet":" {ipaddr}","format-disconnected":" offline"}
+}"""
+
+def mako_conf() -> str:
+    return "default-timeout=5000\n"
+
+def wofi_style() -> str:
+    return "/* Generated by pkgpicker */\nwindow { border-radius: 10px; }\n"
+
+@dataclass(frozen=True)
+class ConfigFile:
+    path: str  # absolute for system files, ~/... for user files
+    content: str
+    system: bool
+
+def preset_files(preset: str) -> List[ConfigFile]:
+    if preset == "hyprland-tuigreet":
+        return [
+            ConfigFile("/etc/greetd/config.toml", greetd_config("Hyprland"), True),
+            ConfigFile("~/.config/hypr/hyprland.conf", hypr_conf(), False),
+            ConfigFile("~/.config/waybar/config", waybar_jsonc(), False),
+            ConfigFile("~/.config/mako/config", mako_conf(), False),
+            ConfigFile("~/.config/wofi/style.css", wofi_style(), False),
+        ]
+    if preset == "plasma-tuigreet":
+        return [ConfigFile("/etc/greetd/config.toml", greetd_config("startplasma-wayland"), True)]
+    return []
+
+_MARK = "@@pkgpicker"
+
+def config_script(files: List[ConfigFile], ts: Optional[str] = None) -> str:
+    """
+    One shell script for all system files (backup + write each). Every file runs
+    in its own subshell and prints '@@pkgpicker <index> <rc>' so one failure
+    doesn't hide the others.
+    """
+    ts = ts or time.strftime("%Y%m%d-%H%M%S")
+    parts = []
+    for i, f in enumerate(files):
+        p = sh_quote(f.path)
+        d = sh_quote(f.path.rsplit("/", 1)[0] or "/")
+        body = f.content.rstrip("\n")
+        parts.append(
+            "(\n"
+            "set -e\n"
+            f"if [ -f {p} ]; then cp {p} {p}.bak-{ts}; fi\n"
+            f"install -d -m 0755 {d}\n"
+            f"cat > {p} <<'PKGPICKER_EOF'\n{body}\nPKGPICKER_EOF\n"
+            f"); echo \"{_MARK} {i} $?\"\n"
+        )
+    return "".join(parts)
+
+def _script_results(out: str) -> Dict[int, int]:
+    res: Dict[int, int] = {}
+    for ln in out.splitlines():
+        if ln.startswith(_MARK + " "):
+            try:
+                _, i, rc = ln.split()
+                res[int(i)] = int(rc)
+            except ValueError:
+                continue
+    return res
+
+# -------- compile --------
+@dataclass(frozen=True)
+class Step:
+    id: str
+    kind: str  # remove | repo | aur | svc_enable | svc_disable | configs
+    items: Tuple[str, ...]
+    prefix: Tuple[str, ...] = ()  # command = prefix + items; empty: runs in-process
+    files: Tuple[ConfigFile, ...] = ()
+    after: Tuple[str, ...] = ()  # step ids that must have succeeded first
+
+    @property
+    def cmd(self) -> Tuple[str, ...]:
+        return self.prefix + self.items
+
+    def with_items(self, items: Tuple[str, ...]) -> "Step":
+        keep = set(items)
+        return replace(self, items=items, files=tuple(f for f in self.files if f.path in keep))
+
+    def describe(self) -> str:
+        if self.kind == "configs":
+            return f"write {len(self.files)} config file(s): " + " ".join(f.path for f in self.files)
+        return " ".join(self.cmd)
+
+def compile_plan(plan: PlanSnapshot, cache_dirs: Tuple[str, ...] = ()) -> List[Step]:
+    """
+    Step DAG with at most one privileged call per kind. pacman steps are chained
+    (one transaction at a time; units are disabled before their package goes).
+    Units of already-installed packages and config files don't wait for installs.
+    cache_dirs: extra package caches for pacman -S (prefetched downloads).
+    """
+    steps: List[Step] = []
+    installs: List[str] = []
+    if plan.svc_disable:
+        units = tuple(sorted(plan.svc_disable))
+        steps.append(Step("svc_disable", "svc_disable", units, ("sudo", "systemctl", "disable", "--now", "--")))
+    if plan.remove:
+        steps.append(Step("remove", "remove", tuple(sorted(plan.remove)), ("sudo", "pacman", "-Rns", "--noconfirm"),
+                          after=("svc_disable",) if plan.svc_disable else ()))
+    if plan.repo:
+        # an explicit --cachedir replaces pacman.conf's, so the system cache goes first (downloads land there)
+        cache = tuple(a for d in ((PKG_CACHE_DIR,) + cache_dirs if cache_dirs else ()) for a in ("--cachedir", d))
+        steps.append(Step("repo", "repo", tuple(sorted(plan.repo)), ("sudo", "pacman", "-S", "--needed", "--noconfirm") + cache,
+                          after=("remove",) if plan.remove else ()))
+        installs.append("repo")
+    if plan.aur:
+        steps.append(Step("aur", "aur", tuple(sorted(plan.aur)), ("yay", "-S", "--needed", "--noconfirm"),
+                          after=tuple(x for x in ("remove", "repo") if any(s.id == x for s in steps))))
+        installs.append("aur")
+    if plan.svc_enable:
+        shipped = {u for us in local_units().values() for u in us}
+        now = tuple(sorted(u for u in plan.svc_enable if u in shipped or not installs))
+        later = tuple(sorted(u for u in plan.svc_enable if u not in now))
+        prefix = ("sudo", "systemctl", "enable", "--now", "--")
+        if now:
+            steps.append(Step("svc_enable", "svc_enable", now, prefix))
+        if later:
+            steps.append(Step("svc_enable_new", "svc_enable", later, prefix, after=tuple(installs)))
+    if plan.generate_configs and plan.preset:
+        files = tuple(preset_files(plan.preset))
+        steps.append(Step("configs", "configs", tuple(f.path for f in files), files=files))
+    return steps
+
+# -------- run --------
+@dataclass(frozen=True)
+class ItemResult:
+    step: str
+    item: str
+    ok: bool
+    detail: str = ""
+
+@dataclass
+class ApplyResult:
+    rc: int = 0
+    items: List[ItemResult] = field(default_factory=list)
+    commands: List[str] = field(default_factory=list)
+    output: List[str] = field(default_factory=list)
+    resumed: List[str] = field(default_factory=list)  # step ids finished by an earlier run
+
+    @property
+    def failed(self) -> List[ItemResult]:
+        return [r for r in self.items if not r.ok]
+
+    def report(self) -> str:
+        lines = [f"rc={self.rc} · {len(self.items) - len(self.failed)}/{len(self.items)} ok"]
+        if self.resumed:
+            lines.append(f"resumed: skipped finished steps {', '.join(self.resumed)}")
+        for r in self.items:
+            lines.append(f"  {'ok ' if r.ok else 'ERR'} {r.step:<11} {r.item}{'  ' + r.detail if r.detail else ''}")
+        return "\n".join(lines)
+
+def _check_packages(step: Step) -> List[ItemResult]:
+    local = local_packages()  # re-read: the local DB generation changed with the transaction
+    if step.kind == "remove":
+        return [ItemResult(step.kind, p, p not in local, "" if p not in local else "still installed") for p in step.items]
+    held = _resolved(step.items, local)
+    return [
+        ItemResult(step.kind, p, True, local[p].version) if p in local
+        else ItemResult(step.kind, p, p in held, held.get(p, "not installed"))
+        for p in step.items
+    ]
+
+def _resolved(names: Tuple[str, ...], local: Dict[str, PkgMeta]) -> Dict[str, str]:
+    """
+    name → what pacman installed for it, for names that are no local package: a group
+    (all members installed), a replaced package (its replacement) or a virtual provide.
+    """
+    missing = [n for n in names if n not in local]
+    if not missing:
+        return {}
+    from .validate import sync_indexes
+    groups, replaced, _ = sync_indexes(sync_packages())
+    provided = provides_index(local.values())
+    out: Dict[str, str] = {}
+    for n in missing:
+        if n in groups:
+            if all(m in local for m in groups[n]):
+                out[n] = f"group, {len(groups[n])} packages"
+        elif replaced.get(n) in local:
+            out[n] = f"replaced by {replaced[n]} {local[replaced[n]].version}"
+        elif n in provided:
+            out[n] = "provided by " + ", ".join(sorted(provided[n]))
+    return out
+
+def _check_units(step: Step) -> List[ItemResult]:
+    states = unit_states(step.items)
+    active = systemctl_active_many(list(step.items))
+    out = []
+    for u in step.items:
+        st, ac = states.get(u, ""), active.get(u, "")
+        if step.kind == "svc_enable":
+            ok = st.startswith("enabled") or (st in ("static", "indirect") and ac == "active")
+        else:
+            ok = not st.startswith("enabled")
+        out.append(ItemResult(step.kind, u, ok, f"{st}, {ac}" if ac else st))
+    return out
+
+def run_step(step: Step, run: Runner = run_capture) -> Tuple[int, str, List[ItemResult]]:
+    if step.kind == "aur" and os.geteuid() == 0:
+        # makepkg and yay both refuse to run as root (e.g. `pkgpicker apply` from a provisioning script)
+        return 2, ("ERROR: AUR packages can't be built as root. Run `pkgpicker apply` as a regular user "
+                   "with sudo rights (--helper elevates once)."), [
+            ItemResult(step.kind, p, False, "running as root, AUR build refused") for p in step.items]
+    if step.kind == "aur" and aur.available():
+        rc, out, errors = aur.build_and_install(list(step.items), run=run)
+        checked = {r.item: r for r in _check_packages(step)}
+        return rc, out, [
+            replace(checked[p], detail=errors[p]) if p in errors and not checked[p].ok else checked[p]
+            for p in step.items
+        ]
+    if step.kind == "aur" and not which("yay"):
+        return 2, "ERROR: neither makepkg+git nor yay available, cannot install AUR.", [ItemResult(step.kind, p, False, "no AUR builder") for p in step.items]
+    if step.kind == "configs":
+        return _run_configs(step, run)
+    rc, out = run(list(step.cmd))
+    if step.kind in ("svc_enable", "svc_disable"):
+        return rc, out, _check_units(step)
+    return rc, out, _check_packages(step)
+
+def _run_configs(step: Step, run: Runner) -> Tuple[int, str, List[ItemResult]]:
+    results: List[ItemResult] = []
+    out_parts: List[str] = []
+    rc = 0
+    system = [f for f in step.files if f.system]
+    if system:
+        src, out = run(["sudo", "sh", "-c", config_script(system)])
+        per = _script_results(out)
+        out_parts.append(out)
+        for i, f in enumerate(system):
+            frc = per.get(i, src or 1)
+            results.append(ItemResult(step.kind, f.path, frc == 0, "" if frc == 0 else f"rc={frc}"))
+    for f in step.files:
+        if f.system:
+            continue
+        try:
+            results.append(ItemResult(step.kind, f.path, True, backup_write_user(f.path, f.content)))
+        except OSError as e:
+            results.append(ItemResult(step.kind, f.path, False, str(e)))
+    if any(not r.ok for r in results):
+        rc = 3
+    return rc, "\n".join(out_parts), results
+
+# -------- journal --------
+def plan_key(plan: PlanSnapshot) -> str:
+    raw = json.dumps([sorted(plan.repo), sorted(plan.aur), sorted(plan.remove), sorted(plan.svc_enable),
+                      sorted(plan.svc_disable), plan.preset, plan.generate_configs])
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+# Completion is recorded per item (package, unit, config path) under its step kind,
+# not per step id: which step an item lands in depends on what is installed when the
+# plan is compiled (a unit moves from svc_enable_new to svc_enable once its package
+# is in), so step ids don't mean the same thing across runs.
+def load_journal(path: str, plan: PlanSnapshot) -> Dict[str, List[str]]:
+    """kind → items an earlier, unfinished apply of the same plan finished ({} otherwise)."""
+    j = load_json_safe(path, {})
+    if not isinstance(j, dict) or j.get("key") != plan_key(plan):
+        return {}
+    done = j.get("done")
+    if not isinstance(done, dict):
+        return {}
+    return {k: [str(i) for i in v] for k, v in done.items() if isinstance(v, list)}
+
+def _save_journal(path: str, key: str, done: Dict[str, Set[str]]) -> None:
+    tmp = path + ".tmp"
+    save_json(tmp, {"key": key, "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "done": {k: sorted(v) for k, v in done.items() if v}})
+    os.replace(tmp, path)
+
+# -------- run --------
+def run_apply(plan: PlanSnapshot, run: Runner = run_capture, progress: Optional[Progress] = None,
+              journal: Optional[str] = None, workers: int = 3, cache_dirs: Tuple[str, ...] = ()) -> ApplyResult:
+    """
+    Runs the step DAG, independent steps concurrently. Steps whose dependency
+    failed are skipped. With `journal`, the items of every finished step are
+    checkpointed; a retry of the same plan skips items that already succeeded
+    and steps with nothing left. The journal is removed once everything succeeded.
+    """
+    res = ApplyResult()
+    steps = {s.id: s for s in compile_plan(plan, cache_dirs)}
+    key = plan_key(plan)
+    done: Dict[str, Set[str]] = {k: set(v) for k, v in (load_journal(journal, plan) if journal else {}).items()}
+    lock = threading.Lock()
+    state: Dict[str, str] = {}  # id -> ok | failed | skipped
+
+    for sid, st in steps.items():
+        prev = done.get(st.kind, set())
+        if st.items and all(i in prev for i in st.items):
+            state[sid] = "ok"
+            res.resumed.append(sid)
+            res.items.extend(ItemResult(st.kind, i, True, "done earlier") for i in st.items)
+
+    def execute(st: Step) -> Tuple[int, str, List[ItemResult]]:
+        prev = done.get(st.kind, set())
+        todo = st.with_items(tuple(i for i in st.items if i not in prev))
+        earlier = [ItemResult(st.kind, i, True, "done earlier") for i in st.items if i in prev]
+        if not todo.items:
+            return 0, "", earlier
+        if progress:
+            progress(f"{st.kind}: {len(todo.items)} item(s)")
+        with lock:
+            res.commands.append(todo.describe())
+        rc, out, items = run_step(todo, run)
+        return rc, f"$ {todo.describe()}\n{out}\n", earlier + items
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        running: Dict[Future, str] = {}
+        while True:
+            for sid, st in steps.items():
+                if sid in state or sid in running.values():
+                    continue
+                deps = [state.get(d) for d in st.after if d in steps]
+                bad = [d for d in st.after if state.get(d) in ("failed", "skipped")]
+                if bad:
+                    state[sid] = "skipped"
+                    res.items.extend(ItemResult(st.kind, i, False, f"skipped: {', '.join(bad)} failed") for i in st.items)
+                elif all(d == "ok" for d in deps):
+                    running[ex.submit(execute, st)] = sid
+            if not running:
+                break
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                sid = running.pop(fut)
+                try:
+                    rc, out, items = fut.result()
+                except Exception as e:  # keep the journal consistent even if a step blows up
+                    rc, out, items = 1, f"{sid}: {e}\n", [ItemResult(steps[sid].kind, i, False, str(e)) for i in steps[sid].items]
+                ok = rc == 0 and all(r.ok for r in items)
+                state[sid] = "ok" if ok else "failed"
+                res.output.append(out)
+                res.items.extend(items)
+                if rc != 0 and res.rc == 0:
+                    res.rc = rc
+                if not ok and res.rc == 0:
+                    res.rc = 1
+                done.setdefault(steps[sid].kind, set()).update(r.item for r in items if r.ok)
+                if journal:
+                    _save_journal(journal, key, done)
+
+    if journal:
+        if all(v == "ok" for v in state.values()):
+            try:
+                os.remove(journal)
+            except OSError:
+                pass
+        else:
+            _save_journal(journal, key, done)
+    order: Dict[str, int] = {}
+    for n, st in enumerate(steps.values()):
+        order.setdefault(st.kind, n)
+    res.items.sort(key=lambda r: order.get(r.step, 0))
+    return res
@@ -3,7 +3,7 @@ import os
 import shutil
 import subprocess
 import time
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 def which(cmd: str) -> bool:
     return shutil.which(cmd) is not None
@@ -15,6 +15,13 @@ def run_capture(cmd: List[str]) -> Tuple[int, str]:
     except FileNotFoundError:
         return 127, f"Command not found: {cmd[0]}"
 
+def human_size(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(n) < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
 def sh_quote(s: str) -> str:
     return "'" + s.replace("'", "'\"'\"'") + "'"
 
@@ -36,30 +43,15 @@ def pacman_foreign_packages() -> Set[str]:
     rc, out = run_capture(["pacman", "-Qmq"])
     return set(out.split()) if rc == 0 else set()
 
-def pacman_orphans() -> List[str]:
-    rc, out = run_capture(["bash", "-lc", "pacman -Qtdq 2>/dev/null || true"])
-    return [x for x in out.split() if x.strip()]
-
-def systemctl_is_enabled(unit: str) -> str:
-    rc, out = run_capture(["systemctl", "is-enabled", unit])
-    s = out.strip()
-    return s if s else ("not-found" if rc != 0 else "")
-
-def systemctl_is_active(unit: str) -> str:
-    rc, out = run_capture(["systemctl", "is-active", unit])
-    s = out.strip()
-    return s if s else ("not-found" if rc != 0 else "")
-
-def paccache_clean() -> Tuple[int, str]:
-    if not which("paccache"):
-        return 127, "paccache not found (install pacman-contrib)."
-    return run_capture(["sudo", "paccache", "-r"])
-
-def lspci_full() -> str:
-    if which("lspci"):
-        rc, out = run_capture(["lspci", "-nnk"])
-        return out if rc == 0 else ""
-    return ""
+def systemctl_active_many(units: List[str]) -> Dict[str, str]:
+    # one process for all units; is-active prints one line per argument, in order
+    if not units:
+        return {}
+    rc, out = run_capture(["systemctl", "is-active", "--", *units])
+    lines = out.splitlines()
+    if len(lines) != len(units):
+        return {u: "unknown" for u in units}
+    return dict(zip(units, (ln.strip() for ln in lines)))
 
 def pacman_repo_has(pkg: str) -> bool:
     rc, _ = run_capture(["pacman", "-Si", pkg])
@@ -0,0 +1,234 @@
+from __future__ import annotations
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import paths
+from .alpm import dep_name, local_packages, provides_index, sync_packages
+from .arch import run_capture, which
+from .pkgcache import parse_pkg_filename
+
+# AUR builds without yay: RPC for metadata, makepkg in a bounded pool per
+# dependency level, one pacman -U at the end.
+AUR_URL = "https://aur.archlinux.org"
+AUR_DIR = paths.AUR_DIR  # <base>/ git checkouts, src/, pkg/
+
+Runner = Callable[[List[str]], Tuple[int, str]]
+Progress = Callable[[str], None]
+
+@dataclass(frozen=True)
+class AurPkg:
+    name: str
+    base: str
+    version: str
+    depends: Tuple[str, ...]
+    makedepends: Tuple[str, ...]
+
+    @property
+    def build_deps(self) -> Tuple[str, ...]:
+        return self.depends + self.makedepends
+
+def aur_info_raw(names: Iterable[str], timeout: float = 20.0) -> Dict[str, Dict[str, Any]]:
+    """RPC info records by name; one round trip per 100 names."""
+    import urllib.parse
+    import urllib.request  # ~20 ms (http.client, ssl, email); only the network paths pay for it
+    names = sorted(set(names))
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(names), 100):
+        q = urllib.parse.urlencode([("arg[]", n) for n in names[i:i + 100]])
+        with urllib.request.urlopen(f"{AUR_URL}/rpc/v5/info?{q}", timeout=timeout) as r:
+            data = json.loads(r.read().decode("utf-8"))
+        for res in data.get("results") or []:
+            out[res["Name"]] = res
+    return out
+
+def aur_info(names: Iterable[str], timeout: float = 20.0) -> Dict[str, AurPkg]:
+    return {
+        n: AurPkg(
+            name=n, base=res.get("PackageBase") or n, version=res.get("Version", ""),
+            depends=tuple(res.get("Depends") or ()),
+            makedepends=tuple(res.get("MakeDepends") or ()) + tuple(res.get("CheckDepends") or ()),
+        )
+        for n, res in aur_info_raw(names, timeout).items()
+    }
+
+def aur_search(query: str, timeout: float = 20.0) -> List[Dict[str, str]]:
+    import urllib.parse
+    import urllib.request
+    q = urllib.parse.urlencode({"arg": query, "by": "name-desc"})
+    with urllib.request.urlopen(f"{AUR_URL}/rpc/v5/search?{q}", timeout=timeout) as r:
+        data = json.loads(r.read().decode("utf-8"))
+    return [
+        {"name": x["Name"], "version": x.get("Version", ""), "desc": x.get("Description") or ""}
+        for x in data.get("results") or []
+    ]
+
+def resolve(targets: Iterable[str], info: Callable[[Iterable[str]], Dict[str, AurPkg]] = aur_info
+            ) -> Tuple[Dict[str, AurPkg], Set[str], Set[str]]:
+    """
+    (AUR packages to build incl. AUR-only deps, repo deps to install first, unresolvable deps).
+    A dep already installed or provided by a repo package is not followed.
+    """
+    local = local_packages()
+    loc_prov = provides_index(local.values())
+    repo_prov = provides_index(sync_packages().values())
+    pkgs: Dict[str, AurPkg] = {}
+    repo_deps: Set[str] = set()
+    missing: Set[str] = set()
+    todo = set(targets)
+    while todo:
+        found = info(todo)
+        missing |= {n for n in todo if n not in found}
+        pkgs.update(found)
+        nxt: Set[str] = set()
+        for p in found.values():
+            for d in p.build_deps:
+                n = dep_name(d)
+                if n in pkgs or n in loc_prov:
+                    continue
+                if n in repo_prov:
+                    repo_deps.add(repo_prov[n][0])
+                else:
+                    nxt.add(n)
+        todo = nxt - set(pkgs) - missing
+    return pkgs, repo_deps, missing - set(targets)
+
+def _base_deps(pkgs: Dict[str, AurPkg]) -> Dict[str, Set[str]]:
+    """pkgbase -> pkgbases (within this build) it needs at build time."""
+    base_of = {p.name: p.base for p in pkgs.values()}
+    out: Dict[str, Set[str]] = {}
+    for p in pkgs.values():
+        deps = out.setdefault(p.base, set())
+        for d in p.build_deps:
+            b = base_of.get(dep_name(d))
+            if b and b != p.base:
+                deps.add(b)
+    return out
+
+def build_levels(pkgs: Dict[str, AurPkg]) -> List[List[str]]:
+    """pkgbases grouped into levels; each level only needs earlier levels (Kahn). A cycle ends up last."""
+    left = _base_deps(pkgs)
+    levels: List[List[str]] = []
+    while left:
+        ready = sorted(b for b, deps in left.items() if not (deps & set(left)))
+        if not ready:
+            levels.append(sorted(left))
+            break
+        levels.append(ready)
+        for b in ready:
+            del left[b]
+    return levels
+
+def _env() -> Dict[str, str]:
+    return dict(os.environ, SRCDEST=os.path.join(AUR_DIR, "src"), PKGDEST=os.path.join(AUR_DIR, "pkg"))
+
+def _run(cmd: List[str], cwd: Optional[str] = None) -> Tuple[int, str]:
+    try:
+        p = subprocess.run(cmd, cwd=cwd, env=_env(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except FileNotFoundError:
+        return 127, f"Command not found: {cmd[0]}"
+    return p.returncode, p.stdout
+
+def build_base(base: str) -> Tuple[int, str, List[str]]:
+    """
+    Fetch/update the AUR checkout and build it unless PKGDEST already holds the
+    files for this version. Source and build dirs are kept for the next run.
+    """
+    for d in ("src", "pkg"):
+        os.makedirs(os.path.join(AUR_DIR, d), exist_ok=True)
+    wd = os.path.join(AUR_DIR, base)
+    if os.path.isdir(os.path.join(wd, ".git")):
+        rc, out = _run(["git", "-C", wd, "pull", "--ff-only", "-q"])
+    else:
+        rc, out = _run(["git", "clone", "-q", f"{AUR_URL}/{base}.git", wd])
+    if rc != 0:
+        return rc, out, []
+    rc, listing = _run(["makepkg", "--packagelist"], cwd=wd)
+    files = [ln.strip() for ln in listing.splitlines() if ln.strip().startswith("/")]
+    if rc == 0 and files and all(os.path.exists(f) for f in files):
+        return 0, f"{base}: cached build\n", files
+    # deps are installed beforehand (repo deps / earlier levels), so no -s and no sudo in here
+    rc, out = _run(["makepkg", "-f", "--noconfirm"], cwd=wd)
+    return rc, out, [f for f in files if os.path.exists(f)]
+
+def build_and_install(targets: List[str], run: Runner = run_capture, progress: Optional[Progress] = None,
+                      workers: Optional[int] = None) -> Tuple[int, str, Dict[str, str]]:
+    """
+    Returns (rc, output, {target: error}) — an empty dict means every target got installed.
+    Anything a later level needs to build is installed right after its own level
+    (--asdeps unless it is a target itself); everything else goes into a single
+    pacman -U at the end.
+    """
+    log: List[str] = []
+    errors: Dict[str, str] = {}
+    try:
+        pkgs, repo_deps, missing = resolve(targets)
+    except OSError as e:
+        return 1, f"AUR RPC: {e}\n", {t: "AUR RPC failed" for t in targets}
+    for t in targets:
+        if t not in pkgs:
+            errors[t] = "not in AUR"
+    if missing:
+        log.append("unresolvable deps: " + " ".join(sorted(missing)))
+    if repo_deps:
+        if progress:
+            progress(f"AUR: {len(repo_deps)} repo deps")
+        rc, out = run(["sudo", "pacman", "-S", "--needed", "--asdeps", "--noconfirm"] + sorted(repo_deps))
+        log.append(out)
+        if rc != 0:
+            return rc, "\n".join(log), {t: "repo deps failed" for t in targets}
+
+    wanted = set(targets) | set(pkgs)
+    needed_later = {dep_name(d) for p in pkgs.values() for d in p.build_deps}
+    base_deps = _base_deps(pkgs)
+    final: Dict[str, str] = {}  # file -> pkgname
+    workers = workers or max(1, min(8, os.cpu_count() or 1))
+    failed: Set[str] = set()
+    for level in build_levels(pkgs):
+        blocked = [b for b in level if base_deps.get(b, set()) & failed]
+        failed.update(blocked)
+        level = [b for b in level if b not in blocked]
+        if not level:
+            continue
+        if progress:
+            progress(f"AUR: building {', '.join(level)}")
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(build_base, level))
+        now: Dict[str, str] = {}
+        for base, (rc, out, files) in zip(level, results):
+            log.append(f"== {base} (rc={rc})\n{out[-4000:]}")
+            if rc != 0:
+                failed.add(base)
+                continue
+            for f in files:
+                parsed = parse_pkg_filename(os.path.basename(f))
+                if not parsed or parsed[0] not in wanted:
+                    continue
+                (now if parsed[0] in needed_later else final)[f] = parsed[0]
+        if now:
+            rc, out = run(["sudo", "pacman", "-U", "--needed", "--noconfirm"] + sorted(now))
+            log.append(out)
+            if rc != 0:
+                failed.update(pkgs[n].base for n in now.values())
+            deps = sorted(n for n in now.values() if n not in targets)
+            if rc == 0 and deps:
+                run(["sudo", "pacman", "-D", "--asdeps"] + deps)
+    if final:
+        if progress:
+            progress(f"AUR: installing {len(final)} package(s)")
+        rc, out = run(["sudo", "pacman", "-U", "--needed", "--noconfirm"] + sorted(final))
+        log.append(out)
+        deps = sorted(n for n in final.values() if n not in targets)
+        if rc == 0 and deps:
+            run(["sudo", "pacman", "-D", "--asdeps"] + deps)
+    installed = local_packages()
+    for t in targets:
+        if t in pkgs and t not in installed:
+            errors.setdefault(t, "build failed" if pkgs[t].base in failed else "not installed")
+    return (1 if errors else 0), "\n".join(log), errors
+
+def available() -> bool:
+    return which("makepkg") and which("git")
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Mapping, Optional, Tuple
+
+from .models import PkgMeta
+from .validate import AurLookup, sync_indexes
+
+# Package lists from another machine (`pacman -Qqe`, `pacman -Qe`, or names
+# pasted comma/space separated) → plan entries. All names are classified against
+# the sync DB indexes in one pass; what the repos don't know goes to the AUR in a
+# single batched lookup instead of one pacman -Si / yay -Si per name.
+_NAME_RX = re.compile(r"^[a-z0-9@_+][a-z0-9@._+-]*$")
+# `pacman -Q` always prints pkgver-pkgrel; without the pkgrel, "firefox 0ad" is two names
+_VERSION_RX = re.compile(r"^(\d+:)?[\w.+~]+-\d+(\.\d+)?$")
+
+def parse_names(text: str) -> Tuple[List[str], List[str]]:
+    """(names in first-seen order, tokens that are neither a package name nor a `pacman -Qe` version)."""
+    names: Dict[str, None] = {}
+    bad: List[str] = []
+    for ln in text.splitlines():
+        toks = [t for t in re.split(r"[\s,]+", ln.split("#", 1)[0]) if t]
+        if len(toks) == 2 and _VERSION_RX.match(toks[1]):
+            toks = toks[:1]  # `pacman -Qe` style "name version"
+        for t in toks:
+            if _NAME_RX.match(t):
+                names.setdefault(t, None)
+            else:
+                bad.append(t)
+    return list(names), bad
+
+@dataclass(slots=True)
+class Resolution:
+    repo: List[str] = field(default_factory=list)
+    aur: List[str] = field(default_factory=list)
+    group: List[Tuple[str, List[str]]] = field(default_factory=list)  # (group, members not installed yet)
+    mapped: List[Tuple[str, str]] = field(default_factory=list)  # (name, package): replaces= or single provider
+    installed: List[str] = field(default_factory=list)
+    ambiguous: List[Tuple[str, List[str]]] = field(default_factory=list)  # virtual name, several providers
+    unknown: List[str] = field(default_factory=list)
+    invalid: List[str] = field(default_factory=list)
+    aur_error: str = ""
+
+    def to_plan(self) -> Tuple[List[str], List[str]]:
+        """(repo names, aur names) to add."""
+        repo = self.repo + [p for _, ms in self.group for p in ms] + [p for _, p in self.mapped]
+        return list(dict.fromkeys(repo)), list(self.aur)
+
+    def summary(self) -> str:
+        lines = [
+            f"Repo: {len(self.repo)} · AUR: {len(self.aur)} · Gruppen: {len(self.group)} · "
+            f"umgeleitet: {len(self.mapped)} · schon installiert: {len(self.installed)}",
+        ]
+        def show(title: str, items: List[str]) -> None:
+            if items:
+                more = f" … (+{len(items) - 40})" if len(items) > 40 else ""
+                lines.append(f"\n[b]{title}[/b] ({len(items)}): " + " ".join(items[:40]) + more)
+        show("Gruppen", [f"{g}→{' '.join(ms[:8])}" + (f" … (+{len(ms) - 8})" if len(ms) > 8 else "")
+                         for g, ms in self.group])
+        show("Umgeleitet", [f"{a}→{b}" for a, b in self.mapped])
+        show("Mehrdeutig (nicht übernommen)", [f"{a}({'|'.join(p[:3])})" for a, p in self.ambiguous])
+        show("Unbekannt (nicht übernommen)", self.unknown)
+        show("Ungültig", self.invalid)
+        if self.aur_error:
+            lines.append(f"\n[yellow]AUR nicht erreichbar: {self.aur_error}[/yellow]")
+        return "\n".join(lines)
+
+def resolve_names(names: List[str], sync: Mapping[str, PkgMeta], installed: Collection[str],
+                  aur_lookup: Optional[AurLookup] = None) -> Resolution:
+    res = Resolution()
+    todo = [n for n in names if n not in installed]
+    res.installed = [n for n in names if n in installed]
+    outside = [n for n in todo if n not in sync]
+    aur: Collection[str] = ()
+    if aur_lookup is not None and outside:
+        try:
+            aur = aur_lookup(outside)
+        except (OSError, ValueError) as e:
+            res.aur_error = str(e)
+    groups, replaced, prov = sync_indexes(sync) if outside else ({}, {}, {})
+    for n in todo:
+        if n in sync:
+            res.repo.append(n)
+        elif n in aur:
+            res.aur.append(n)
+        elif n in groups:
+            # a group is no package: in plan.repo it would fail the post-install check
+            ms = sorted(p for p in set(groups[n]) if p not in installed)
+            if ms:
+                res.group.append((n, ms))
+            else:
+                res.installed.append(n)
+        elif n in replaced:
+            if replaced[n] in installed:
+                res.installed.append(n)
+            else:
+                res.mapped.append((n, replaced[n]))
+        elif n in prov:
+            ps = sorted(set(prov[n]))
+            if any(p in installed for p in ps):
+                res.installed.append(n)
+            elif len(ps) == 1:
+                res.mapped.append((n, ps[0]))
+            else:
+                res.ambiguous.append((n, ps))
+        else:
+            res.unknown.append(n)
+    return res
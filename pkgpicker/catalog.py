@@ -0,0 +1,358 @@
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import marshal
+import os
+import sys
+from dataclasses import dataclass, fields
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .models import Category, ConflictRule, PackageItem, Target
+from .paths import CATALOG_CACHE_DIR
+
+# packages.json → models. No UI imports (shared by the TUI and the CLI).
+#
+# A catalog may be split up: "include" (string or list) names further JSON files,
+# directories (every *.json inside, sorted) or glob patterns, relative to the
+# including file. Lists are concatenated, dicts merged key by key (first wins),
+# categories of the same name share one item list.
+#
+# load_catalog() caches the parsed models in marshal form, keyed by every source
+# file's mtime/size/sha1 and the mtimes of the scanned include dirs; category
+# items stay encoded until a category is first shown.
+VERSION = 2
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "ui": {"title": "PkgPicker", "tagline": "Minimal → Wayland Desktop + Packages + Services"},
+    "categories": [],
+    "targets": [],
+    "conflicts": [],
+    "services": [],
+    "presets": [],
+}
+
+_ITEM_FIELDS = tuple(f.name for f in fields(PackageItem))
+_TARGET_FIELDS = tuple(f.name for f in fields(Target))
+_RULE_FIELDS = tuple(f.name for f in fields(ConflictRule))
+_MODEL_KEYS = ("categories", "targets", "conflicts", "include")
+
+# -------- include resolution --------
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def _merge(cfg: Dict[str, Any], obj: Dict[str, Any]) -> None:
+    for k, v in obj.items():
+        if k == "include":
+            continue
+        have = cfg.get(k)
+        if have is None:
+            cfg[k] = list(v) if isinstance(v, list) else dict(v) if isinstance(v, dict) else v
+        elif isinstance(have, list) and isinstance(v, list):
+            have.extend(v)
+        elif isinstance(have, dict) and isinstance(v, dict):
+            for kk, vv in v.items():
+                have.setdefault(kk, vv)
+
+def _expand(pattern: str, dirs: List[list]) -> List[str]:
+    if os.path.isdir(pattern):
+        dirs.append([pattern, _mtime(pattern)])
+        return sorted(glob.glob(os.path.join(pattern, "*.json")))
+    if any(c in pattern for c in "*?["):
+        d = os.path.dirname(pattern) or "."
+        dirs.append([d, _mtime(d)])
+        return sorted(glob.glob(pattern))
+    return [pattern]
+
+def resolve_sources(path: str) -> Tuple[Dict[str, Any], List[list], List[list], List[str], bool]:
+    """(merged cfg, [[file, mtime_ns, size, sha1]], [[dir, mtime_ns]], errors, broken).
+
+    broken: some source could not be read or parsed (e.g. caught mid-save)."""
+    cfg: Dict[str, Any] = {}
+    files: List[list] = []
+    dirs: List[list] = []
+    errors: List[str] = []
+    seen: set = set()
+    broken = False
+
+    def visit(p: str, required: bool) -> None:
+        nonlocal broken
+        rp = os.path.realpath(p)
+        if rp in seen:
+            errors.append(f"{p}: included twice")
+            return
+        seen.add(rp)
+        try:
+            with open(p, "rb") as f:
+                raw = f.read()
+            st = os.stat(p)
+        except OSError as e:
+            files.append([p, 0, -1, ""])  # notice when it shows up
+            broken = True
+            if required:
+                errors.append(f"{p}: {e.strerror}")
+            return
+        files.append([p, st.st_mtime_ns, st.st_size, hashlib.sha1(raw).hexdigest()])
+        if not raw.strip():
+            return
+        try:
+            obj = json.loads(raw)
+        except ValueError as e:
+            errors.append(f"{p}: {e}")
+            broken = True
+            return
+        if not isinstance(obj, dict):
+            errors.append(f"{p}: not a JSON object")
+            broken = True
+            return
+        _merge(cfg, obj)
+        inc = obj.get("include") or []
+        for pat in [inc] if isinstance(inc, str) else inc:
+            for q in _expand(os.path.join(os.path.dirname(p), str(pat)), dirs):
+                visit(q, True)
+
+    visit(os.path.abspath(path), False)  # cache entries must not depend on the cwd
+    return cfg, files, dirs, errors, broken
+
+def load_config(path: str) -> Dict[str, Any]:
+    cfg = resolve_sources(path)[0]
+    for k, v in DEFAULT_CONFIG.items():
+        cfg.setdefault(k, v)
+    return cfg
+
+# -------- models --------
+def parse_categories(cfg: Dict[str, Any]) -> List[Category]:
+    out: List[Category] = []
+    for c in cfg.get("categories", []) or []:
+        items: List[PackageItem] = []
+        for it in c.get("items", []) or []:
+            if isinstance(it, str):
+                nm = it.strip()
+                if nm:
+                    items.append(PackageItem(name=nm, source="repo"))
+            elif isinstance(it, dict):
+                nm = str(it.get("name", "")).strip()
+                if not nm:
+                    continue
+                items.append(
+                    PackageItem(
+                        name=nm,
+                        source=str(it.get("source", "repo")).strip(),
+                        desc=str(it.get("desc", "")).strip(),
+                        featured=bool(it.get("featured", False)),
+                        reason=str(it.get("reason", "")).strip(),
+                    )
+                )
+        out.append(Category(name=str(c.get("name", "")).strip(), items=items))
+    return out
+
+def parse_targets(cfg: Dict[str, Any]) -> List[Target]:
+    out: List[Target] = []
+    for t in cfg.get("targets", []) or []:
+        out.append(
+            Target(
+                id=str(t.get("id", "")).strip(),
+                name=str(t.get("name", "")).strip(),
+                required_packages=list(t.get("required_packages", []) or []),
+                recommended_packages=list(t.get("recommended_packages", []) or []),
+                services=list(t.get("services", []) or []),
+                preset=str(t.get("preset", "hyprland")).strip(),
+            )
+        )
+    return out
+
+def parse_conflicts(cfg: Dict[str, Any]) -> List[ConflictRule]:
+    out: List[ConflictRule] = []
+    for r in cfg.get("conflicts", []) or []:
+        out.append(
+            ConflictRule(
+                name=str(r.get("name", "conflict")),
+                group=list(r.get("group", []) or []),
+                mode=str(r.get("mode", "at_most_one")),
+            )
+        )
+    return out
+
+def _validated_categories(cfg: Dict[str, Any], errors: List[str]) -> List[Tuple[str, List[PackageItem]]]:
+    """Categories merged by name, duplicate items dropped, unknown sources reported."""
+    merged: Dict[str, List[PackageItem]] = {}
+    seen: Dict[str, set] = {}
+    for c in parse_categories(cfg):
+        items = merged.setdefault(c.name, [])
+        names = seen.setdefault(c.name, set())
+        for it in c.items:
+            if it.name in names:
+                continue
+            if it.source not in ("repo", "aur"):
+                errors.append(f"{c.name}: {it.name}: unknown source {it.source!r}")
+            names.add(it.name)
+            items.append(it)
+    return list(merged.items())
+
+# -------- compiled cache --------
+class Catalog:
+    """Models of one (possibly split) packages.json. Category items are decoded on first use."""
+
+    def __init__(self, data: Dict[str, Any], items: Optional[Dict[int, List[PackageItem]]] = None):
+        self.cfg: Dict[str, Any] = data["cfg"]
+        self.targets = [Target(*t) for t in data["targets"]]
+        self.conflicts = [ConflictRule(*r) for r in data["conflicts"]]
+        self.categories: List[str] = [c[0] for c in data["categories"]]
+        self.counts: List[int] = [c[1] for c in data["categories"]]
+        self.digests: List[str] = [c[3] for c in data["categories"]]
+        self.errors: List[str] = list(data["errors"])
+        self.sources: List[str] = [f[0] for f in data["files"] if f[2] >= 0]
+        self.broken: bool = data["broken"]
+        self.cached = items is None
+        self._data = data
+        self._blobs: List[bytes] = [c[2] for c in data["categories"]]
+        self._items: Dict[int, List[PackageItem]] = items or {}
+
+    def items(self, idx: int) -> List[PackageItem]:
+        got = self._items.get(idx)
+        if got is None:
+            got = self._items[idx] = [PackageItem(*t) for t in marshal.loads(self._blobs[idx])]
+        return got
+
+    def digest(self) -> str:
+        """Content hash over all sources; unchanged by touch or a copy of the same files."""
+        return hashlib.sha1("\n".join(f"{f[0]}:{f[3]}" for f in self._data["files"]).encode()).hexdigest()[:16]
+
+    def stale(self) -> bool:
+        """Whether any source file or include dir changed since this catalog was built (stats only, unless an mtime moved)."""
+        return _revalidate(self._data) is None
+
+    def package_sources(self) -> Dict[str, str]:
+        """Every package the catalog mentions → source (category items first, then target packages)."""
+        out: Dict[str, str] = {}
+        for i in range(len(self.categories)):
+            for it in self.items(i):
+                out.setdefault(it.name, it.source)
+        for t in self.targets:
+            for n in (*t.required_packages, *t.recommended_packages):
+                out.setdefault(n, "repo")
+        return out
+
+@dataclass(frozen=True, slots=True)
+class CatalogDiff:
+    categories: FrozenSet[str]  # added, removed or items changed
+    order: bool  # category list itself (names/order/counts) changed
+    targets: bool
+    conflicts: bool
+    cfg: FrozenSet[str]  # changed top-level keys (ui, services, presets, …)
+    errors: bool
+    gone: FrozenSet[str]  # packages no longer anywhere in the catalog
+    moved: Tuple[Tuple[str, str], ...]  # (package, new source)
+
+    def __bool__(self) -> bool:
+        return bool(self.categories or self.order or self.targets or self.conflicts or self.cfg or self.errors)
+
+def diff_catalogs(old: Catalog, new: Catalog) -> CatalogDiff:
+    oc, nc = dict(zip(old.categories, old.digests)), dict(zip(new.categories, new.digests))
+    cats = frozenset(n for n in oc.keys() | nc.keys() if oc.get(n) != nc.get(n))
+    targets = old.targets != new.targets
+    gone: FrozenSet[str] = frozenset()
+    moved: Tuple[Tuple[str, str], ...] = ()
+    if cats or targets:
+        os_, ns = old.package_sources(), new.package_sources()
+        gone = frozenset(os_.keys() - ns.keys())
+        moved = tuple(sorted((n, s) for n, s in ns.items() if n in os_ and os_[n] != s))
+    return CatalogDiff(
+        categories=cats,
+        order=(old.categories, old.counts) != (new.categories, new.counts),
+        targets=targets,
+        conflicts=old.conflicts != new.conflicts,
+        cfg=frozenset(k for k in old.cfg.keys() | new.cfg.keys() if old.cfg.get(k) != new.cfg.get(k)),
+        errors=old.errors != new.errors,
+        gone=gone,
+        moved=moved,
+    )
+
+def _encode_category(name: str, items: List[PackageItem]) -> Tuple[str, int, bytes, str]:
+    rows = [tuple(getattr(it, f) for f in _ITEM_FIELDS) for it in items]
+    # marshal output depends on object sharing, so reload diffs compare a digest of the values instead
+    return name, len(items), marshal.dumps(rows), hashlib.sha1(repr(rows).encode()).hexdigest()[:16]
+
+def compile_catalog(path: str) -> Tuple[Dict[str, Any], Dict[int, List[PackageItem]]]:
+    """(marshal-able catalog data, decoded category items)."""
+    cfg, files, dirs, errors, broken = resolve_sources(path)
+    for k, v in DEFAULT_CONFIG.items():
+        cfg.setdefault(k, v)
+    targets = parse_targets(cfg)
+    ids = [t.id for t in targets]
+    errors += [f"target {i!r} defined more than once" for i in sorted({i for i in ids if ids.count(i) > 1})]
+    cats = _validated_categories(cfg, errors)
+    data = {
+        "version": VERSION,
+        "broken": broken,
+        "files": files,
+        "dirs": dirs,
+        "errors": errors,
+        "cfg": {k: v for k, v in cfg.items() if k not in _MODEL_KEYS},
+        "targets": [tuple(getattr(t, f) for f in _TARGET_FIELDS) for t in targets],
+        "conflicts": [tuple(getattr(r, f) for f in _RULE_FIELDS) for r in parse_conflicts(cfg)],
+        "categories": [_encode_category(name, items) for name, items in cats],
+    }
+    return data, {i: items for i, (_, items) in enumerate(cats)}
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}-py{sys.version_info[0]}{sys.version_info[1]}.bin")  # marshal is per-version
+
+def _revalidate(data: Dict[str, Any]) -> Optional[bool]:
+    """None if a source changed, else whether only mtimes moved (content hashes still match)."""
+    touched = False
+    for d, mtime in data["dirs"]:
+        if _mtime(d) != mtime:
+            return None
+    for ent in data["files"]:
+        p, mtime, size, digest = ent
+        try:
+            st = os.stat(p)
+        except OSError:
+            if size == -1:
+                continue
+            return None
+        if (st.st_mtime_ns, st.st_size) == (mtime, size):
+            continue
+        if st.st_size != size:
+            return None
+        try:
+            with open(p, "rb") as f:
+                if hashlib.sha1(f.read()).hexdigest() != digest:
+                    return None
+        except OSError:
+            return None
+        ent[1] = st.st_mtime_ns
+        touched = True
+    return touched
+
+def _save(cpath: str, data: Dict[str, Any]) -> None:
+    try:
+        os.makedirs(os.path.dirname(cpath), exist_ok=True)
+        tmp = f"{cpath}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(data, f)
+        os.replace(tmp, cpath)
+    except OSError:
+        pass  # the cache is an optimization only
+
+def load_catalog(path: str, cache_dir: str = CATALOG_CACHE_DIR) -> Catalog:
+    cpath = _cache_path(path, cache_dir)
+    try:
+        with open(cpath, "rb") as f:
+            data = marshal.load(f)
+    except (OSError, ValueError, EOFError, TypeError):
+        data = None
+    if isinstance(data, dict) and data.get("version") == VERSION:
+        touched = _revalidate(data)
+        if touched is not None:
+            if touched:
+                _save(cpath, data)
+            return Catalog(data)
+    data, items = compile_catalog(path)
+    _save(cpath, data)
+    return Catalog(data, items)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from typing import Any, List, Optional
+
+# Headless entry point. Only the subcommand that runs imports what it needs;
+# Textual is imported for the TUI alone.
+
+SUBCOMMANDS = ("apply", "export", "search", "orphans", "check", "import", "daemon")
+
+def _out(obj: Any) -> None:
+    json.dump(obj, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+def _backend(args):
+    """A running `pkgpicker daemon` if there is one, else the same queries in-process."""
+    from .daemon import Index, connect
+    return (None if args.no_daemon else connect()) or Index()
+
+def cmd_apply(args) -> int:
+    from .apply import compile_plan, run_apply
+    from .catalog import load_catalog
+    from .conflicts import conflict_problems, db_relations
+    from .cache import load_json_safe
+    from .history import log_history
+    from .paths import APPLY_JOURNAL, HISTORY_LOG, profile_path
+    from .plan import Plan
+    from .alpm import local_packages
+
+    path = args.profile if os.sep in args.profile or args.profile.endswith(".json") else profile_path(args.profile)
+    obj = load_json_safe(path, None)
+    if not isinstance(obj, dict):
+        _out({"error": f"profile not found or invalid: {path}"})
+        return 2
+    plan = Plan()
+    plan.load_profile(obj)
+    snap = plan.snapshot()
+
+    rules = load_catalog(args.data).conflicts
+    members = (set(local_packages()) - snap.remove) | snap.repo | snap.aur
+    probs = conflict_problems(members, rules, {m.name: m for m in db_relations()})
+    if probs and not args.force:
+        _out({"error": "conflicts", "conflicts": probs})
+        return 4
+    if args.dry_run:
+        _out({"steps": [{"id": s.id, "after": list(s.after), "cmd": s.describe()} for s in compile_plan(snap)]})
+        return 0
+
+    from .privhelper import get_helper, runner
+    if args.helper:
+        get_helper().start(interactive=True)
+    res = run_apply(snap, run=runner, journal=APPLY_JOURNAL,
+                    progress=(lambda m: print(m, file=sys.stderr)) if args.verbose else None)
+    log_history(HISTORY_LOG, "apply", res.commands, res.rc)
+    if args.helper:
+        get_helper().close()
+    _out({
+        "rc": res.rc,
+        "resumed": res.resumed,
+        "items": [{"step": r.step, "item": r.item, "ok": r.ok, "detail": r.detail} for r in res.items],
+    })
+    return res.rc
+
+def cmd_export(args) -> int:
+    from .alpm import local_packages, sync_packages
+    local = local_packages()
+    sync = sync_packages()
+    rows = [
+        {"name": m.name, "version": m.version, "source": "repo" if m.name in sync else "aur",
+         "reason": "explicit" if m.reason == 0 else "dependency", "desc": m.desc}
+        for m in sorted(local.values(), key=lambda m: m.name)
+        if args.all or m.reason == 0
+    ]
+    if args.format == "json":
+        _out(rows)
+    elif args.format == "csv":
+        import csv
+        w = csv.writer(sys.stdout)
+        w.writerow(["package", "source", "description"])
+        for r in rows:
+            w.writerow([r["name"], r["source"], r["desc"]])
+    else:  # profile: feed it back with `apply --profile`
+        from .plan import Plan
+        plan = Plan()
+        plan.repo.update(r["name"] for r in rows if r["source"] == "repo")
+        plan.aur.update(r["name"] for r in rows if r["source"] == "aur")
+        _out(plan.to_profile())
+    return 0
+
+def cmd_search(args) -> int:
+    _out(_backend(args).call("search", query=args.query, repo=not args.aur_only,
+                             aur=args.aur or args.aur_only, limit=args.limit))
+    return 0
+
+def cmd_orphans(args) -> int:
+    _out(_backend(args).call("orphans", optional=args.optional))
+    return 0
+
+def cmd_check(args) -> int:
+    from .catalog import load_catalog
+    from .snapshot import Snapshot
+    from .validate import by_kind, validate
+    cat = load_catalog(args.data)
+    snap = Snapshot.load()
+    rep = validate(cat, snap, aur=not args.no_aur, backend=None if args.no_aur else _backend(args))
+    try:
+        snap.save()
+    except OSError:
+        pass
+    _out({
+        "checked": rep.checked,
+        "cached": rep.cached,
+        "aur_error": rep.aur_error,
+        "catalog_errors": cat.errors,
+        "summary": by_kind(rep.findings),
+        "findings": [{"where": f.where, "name": f.name, "kind": f.kind, "detail": f.detail} for f in rep.findings],
+    })
+    return 1 if rep.findings or cat.errors else 0
+
+def cmd_import(args) -> int:
+    from dataclasses import asdict
+    from .alpm import local_packages, sync_packages
+    from .bulkimport import parse_names, resolve_names
+    from .validate import aur_lookup
+    if args.file == "-":
+        text = sys.stdin.read()
+    else:
+        try:
+            with open(args.file, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError as e:
+            _out({"error": str(e)})
+            return 2
+    names, bad = parse_names(text)
+    res = resolve_names(names, sync_packages(), local_packages(),
+                        None if args.no_aur else aur_lookup(_backend(args)))
+    res.invalid = bad
+    out = asdict(res)
+    if args.save:
+        from .cache import save_json
+        from .paths import profile_path
+        from .plan import Plan
+        repo, aur = res.to_plan()
+        plan = Plan()
+        plan.repo.update(repo)
+        plan.aur.update(aur)
+        out["profile"] = profile_path(args.save)
+        save_json(out["profile"], plan.to_profile())
+    _out(out)
+    return 1 if res.unknown or res.ambiguous or res.invalid else 0
+
+def cmd_daemon(args) -> int:
+    from .daemon import Client, DaemonError, connect, serve
+    if args.status:
+        c = Client(args.socket) if args.socket else connect()
+        try:
+            _out(c.call("ping") if c else {"error": "no daemon running"})
+        except (OSError, DaemonError) as e:
+            _out({"error": str(e)})
+            return 1
+        return 0 if c else 1
+    try:
+        serve(args.socket, interval=args.interval, aur_names=not args.no_aur, group=args.group,
+              ready=lambda p: print(f"pkgpicker daemon listening on {p}", file=sys.stderr))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="pkgpicker")
+    ap.add_argument("--data", default="packages.json")
+    ap.add_argument("--no-daemon", action="store_true", help="do not attach to a running pkgpicker daemon")
+    sub = ap.add_subparsers(dest="cmd")
+
+    p = sub.add_parser("apply", help="apply a saved profile (JSON result on stdout)")
+    p.add_argument("--profile", required=True, help="profile name in ~/.cache/pkgpicker/profiles or a path")
+    p.add_argument("--dry-run", action="store_true", help="print the compiled steps only")
+    p.add_argument("--force", action="store_true", help="apply despite conflicts")
+    p.add_argument("--helper", action="store_true", help="elevate once via the privileged helper")
+    p.add_argument("-v", "--verbose", action="store_true")
+    p.set_defaults(func=cmd_apply)
+
+    p = sub.add_parser("export", help="installed packages")
+    p.add_argument("--format", choices=("json", "csv", "profile"), default="json")
+    p.add_argument("--all", action="store_true", help="include dependencies")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("search", help="search the sync DBs (literal terms on name/desc, ^/$ anchor the name)")
+    p.add_argument("query")
+    p.add_argument("--aur", action="store_true", help="also search the AUR")
+    p.add_argument("--aur-only", action="store_true")
+    p.add_argument("--limit", type=int, default=0)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("orphans", help="orphaned dependencies, including cycles")
+    p.add_argument("--no-optional", dest="optional", action="store_false",
+                   help="optdepends don't keep packages alive (like pacman -Qttd)")
+    p.set_defaults(func=cmd_orphans)
+
+    p = sub.add_parser("check", help="validate packages.json against the sync DBs and the AUR")
+    p.add_argument("--no-aur", action="store_true", help="repos only (no network)")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("import", help="resolve a package list (pacman -Qqe dump) to repo/AUR/group")
+    p.add_argument("file", help="list file, - for stdin")
+    p.add_argument("--no-aur", action="store_true", help="repos only (no network)")
+    p.add_argument("--save", metavar="PROFILE", help="save the resolved names as a profile for `apply`")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("daemon", help="keep the indexes warm and serve JSON-RPC on a Unix socket")
+    p.add_argument("--socket", default=None, help="socket path (default: $PKGPICKER_SOCKET, /run/pkgpicker or $XDG_RUNTIME_DIR)")
+    p.add_argument("--interval", type=float, default=2.0, help="seconds between DB checks")
+    p.add_argument("--no-aur", action="store_true", help="skip the AUR package name index")
+    p.add_argument("--group", default=None, help="group allowed on the socket when running as root (default: wheel)")
+    p.add_argument("--status", action="store_true", help="ping a running daemon")
+    p.set_defaults(func=cmd_daemon)
+    return ap
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.cmd is None:
+        from .ui_app import PkgPickerApp
+        PkgPickerApp(data_path=args.data).run()
+        return 0
+    return int(args.func(args) or 0)
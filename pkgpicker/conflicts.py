@@ -0,0 +1,165 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Mapping, Set, Tuple
+
+from .alpm import dep_is_versioned, dep_name, local_packages, sync_packages
+from .models import ConflictRule, PkgMeta
+
+def _rule_problem(r: ConflictRule, present: Set[str]) -> str:
+    ordered = [p for p in r.group if p in present]
+    if r.mode == "exactly_one":
+        if len(ordered) != 1:
+            return f"{r.name}: erwartet genau 1, aktuell: {ordered if ordered else 'none'}"
+    elif len(ordered) > 1:
+        return f"{r.name}: zu viele ausgewählt: {ordered}"
+    return ""
+
+class ConflictEngine:
+    """
+    Incremental conflict checker over a member set (installed ∪ plan ∪ …).
+
+    Rules from packages.json are indexed by package, so a change only
+    re-evaluates the rules that mention the changed names. Package-level
+    conflicts=/replaces= from the pacman DBs are tracked as pairs.
+    """
+
+    def __init__(self, rules: List[ConflictRule]):
+        self.members: Set[str] = set()
+        self.set_rules(rules)
+
+        # package relations (filled by load_relations)
+        self._conflicts: Dict[str, Tuple[str, ...]] = {}
+        self._provides: Dict[str, Tuple[str, ...]] = {}
+        self._conflicted_by: Dict[str, Set[str]] = {}
+        self._member_providers: Dict[str, Set[str]] = {}
+        self._pairs: Dict[Tuple[str, str], str] = {}
+        self._pairs_by_pkg: Dict[str, Set[Tuple[str, str]]] = {}
+
+    # ---------- relations ----------
+    def load_relations(self, pkgs: Iterable[PkgMeta]) -> None:
+        """Use conflicts=/replaces=/provides= of the given packages (later entries win)."""
+        conflicts: Dict[str, Tuple[str, ...]] = {}
+        provides: Dict[str, Tuple[str, ...]] = {}
+        for m in pkgs:
+            # versioned conflicts (foo<2) depend on the resolved version → not checked here
+            names = {dep_name(c) for c in m.conflicts + m.replaces if not dep_is_versioned(c)}
+            names.discard(m.name)
+            conflicts[m.name] = tuple(sorted(names))
+            provides[m.name] = tuple(sorted({dep_name(p) for p in m.provides}))
+        self._conflicts = conflicts
+        self._provides = provides
+        self._conflicted_by = {}
+        for a, names in conflicts.items():
+            for c in names:
+                self._conflicted_by.setdefault(c, set()).add(a)
+        members = self.members
+        self.members = set()
+        self._member_providers = {}
+        self._pairs = {}
+        self._pairs_by_pkg = {}
+        self._present = [set() for _ in self.rules]
+        self._rule_probs = {}
+        self.update(added=members)
+        self._recheck_rules(range(len(self.rules)))
+
+    def set_rules(self, rules: List[ConflictRule]) -> None:
+        """Swap the packages.json rules; members and package relations are kept."""
+        self.rules = list(rules)
+        self._rules_by_pkg: Dict[str, List[int]] = {}
+        for i, r in enumerate(self.rules):
+            for p in r.group:
+                self._rules_by_pkg.setdefault(p, []).append(i)
+        self._present: List[Set[str]] = [{p for p in r.group if p in self.members} for r in self.rules]
+        self._rule_probs: Dict[int, str] = {}
+        self._recheck_rules(range(len(self.rules)))
+
+    def _names_of(self, p: str) -> Tuple[str, ...]:
+        return (p,) + self._provides.get(p, ())
+
+    def _add_pair(self, a: str, b: str, via: str) -> None:
+        key = (a, b) if a < b else (b, a)
+        if key in self._pairs:
+            return
+        self._pairs[key] = f"{a} ↔ {b}: Paketkonflikt ({via})"
+        self._pairs_by_pkg.setdefault(a, set()).add(key)
+        self._pairs_by_pkg.setdefault(b, set()).add(key)
+
+    def _drop_pairs(self, p: str) -> None:
+        for key in self._pairs_by_pkg.pop(p, set()):
+            self._pairs.pop(key, None)
+            other = key[1] if key[0] == p else key[0]
+            s = self._pairs_by_pkg.get(other)
+            if s is not None:
+                s.discard(key)
+
+    # ---------- membership ----------
+    def sync(self, members: Set[str]) -> "ConflictEngine":
+        """Bring the engine to exactly `members`, touching only the difference."""
+        self.update(added=members - self.members, removed=self.members - members)
+        return self
+
+    def update(self, added: Iterable[str] = (), removed: Iterable[str] = ()) -> None:
+        dirty: Set[int] = set()
+        for p in removed:
+            if p not in self.members:
+                continue
+            self.members.discard(p)
+            for i in self._rules_by_pkg.get(p, ()):
+                self._present[i].discard(p)
+                dirty.add(i)
+            for n in self._names_of(p):
+                s = self._member_providers.get(n)
+                if s is not None:
+                    s.discard(p)
+                    if not s:
+                        del self._member_providers[n]
+            self._drop_pairs(p)
+        for p in added:
+            if p in self.members:
+                continue
+            self.members.add(p)
+            for i in self._rules_by_pkg.get(p, ()):
+                self._present[i].add(p)
+                dirty.add(i)
+            names = self._names_of(p)
+            for n in names:
+                self._member_providers.setdefault(n, set()).add(p)
+            # p declares a conflict with something present
+            for c in self._conflicts.get(p, ()):
+                for other in self._member_providers.get(c, ()):
+                    if other != p:
+                        self._add_pair(p, other, c)
+            # something present declares a conflict with p (or what p provides)
+            for n in names:
+                for other in self._conflicted_by.get(n, ()):
+                    if other != p and other in self.members:
+                        self._add_pair(other, p, n)
+        self._recheck_rules(dirty)
+
+    def _recheck_rules(self, idxs: Iterable[int]) -> None:
+        for i in idxs:
+            msg = _rule_problem(self.rules[i], self._present[i])
+            if msg:
+                self._rule_probs[i] = msg
+            else:
+                self._rule_probs.pop(i, None)
+
+    # ---------- results ----------
+    def problems(self) -> List[str]:
+        out = [self._rule_probs[i] for i in sorted(self._rule_probs)]
+        out.extend(self._pairs[k] for k in sorted(self._pairs))
+        return out
+
+    def count(self) -> int:
+        return len(self._rule_probs) + len(self._pairs)
+
+def db_relations() -> List[PkgMeta]:
+    """Sync DB entries overlaid with the local DB (installed versions win)."""
+    merged: Dict[str, PkgMeta] = dict(sync_packages())
+    merged.update(local_packages())
+    return list(merged.values())
+
+def conflict_problems(selected: Set[str], rules: List[ConflictRule], relations: Mapping[str, PkgMeta] | None = None) -> List[str]:
+    eng = ConflictEngine(rules)
+    if relations:
+        eng.load_relations(relations.values())
+    return eng.sync(selected).problems()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+from .models import ConflictRule, Target
+from .pkgids import NAMES, NameTable
+
+# Coverage of every target at once. Targets and conflict groups are turned into
+# bitmasks over the shared NameTable once; compute() is then a handful of int
+# ops and popcounts per target, cheap enough to rerun on every plan change.
+
+@dataclass(frozen=True, slots=True)
+class Coverage:
+    target: Target
+    required: Tuple[int, int, int]  # installed, planned, missing
+    recommended: Tuple[int, int, int]
+    missing_required: int  # bitmasks, NameTable.iter_bits() for the names
+    missing_recommended: int
+    conflicts: Tuple[str, ...]
+
+def _split(mask: int, inst: int, planned: int) -> Tuple[int, int, int]:
+    i = (mask & inst).bit_count()
+    p = (mask & planned & ~inst).bit_count()
+    return i, p, mask.bit_count() - i - p
+
+class CoverageMatrix:
+    def __init__(self, targets: Sequence[Target], rules: Sequence[ConflictRule], table: NameTable = NAMES):
+        self.table = table
+        self.targets = [(t, table.bits(t.required_packages), table.bits(t.recommended_packages)) for t in targets]
+        self.rules = [(r, table.bits(r.group)) for r in rules]
+
+    def compute(self, installed: int, remove: int, planned: int) -> List[Coverage]:
+        """Arguments are bitsets (`.bits` of an IdSet/ObservableSet over the same table)."""
+        inst = installed & ~remove
+        have = inst | planned
+        out: List[Coverage] = []
+        for t, req, rec in self.targets:
+            after = have | req | rec  # membership once this target is applied on top of the plan
+            bad: List[str] = []
+            for r, group in self.rules:
+                n = (group & after).bit_count()
+                if n > 1:
+                    bad.append(r.name)
+                elif n == 0 and r.mode == "exactly_one":
+                    bad.append(f"{r.name} (none)")
+            out.append(Coverage(t, _split(req, inst, planned), _split(rec, inst, planned),
+                                req & ~have, rec & ~have, tuple(bad)))
+        return out
+
+    def names(self, bits: int) -> List[str]:
+        return sorted(self.table.iter_bits(bits))
@@ -0,0 +1,337 @@
+from __future__ import annotations
+import grp
+import gzip
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import alpm
+from .depgraph import find_orphans
+from .paths import DAEMON_SOCKET_SYSTEM, daemon_socket_paths
+from .snapshot import units_token
+from .units import UnitStates, preset_rules, preset_state
+
+# `pkgpicker daemon`: one process per host keeps the pacman/AUR/unit indexes warm
+# and answers JSON-RPC 2.0 requests, one JSON object per line, over a Unix socket.
+#
+#   → {"jsonrpc": "2.0", "id": 1, "method": "search", "params": {"query": "^vim"}}
+#   ← {"jsonrpc": "2.0", "id": 1, "result": [{"name": "vim", ...}]}
+#
+# Only read-only queries are served; nothing here needs or grants root. The system
+# socket is still only open to one group (wheel by default): a root daemon doing
+# AUR requests and full-DB scans on behalf of any local user is a cheap way to
+# stall it, so search is a literal match, never a client-supplied regex.
+SOCKET_GROUP = "wheel"
+AUR_NAMES_URL = "https://aur.archlinux.org/packages.gz"
+AUR_NAMES_TTL = 6 * 3600
+AUR_SEARCH_TTL = 1800
+
+class UnknownMethod(LookupError):
+    pass
+
+def _matcher(query: str) -> Callable[[str, str], bool]:
+    """
+    Case-insensitive literal terms, all of which must occur in the name or the
+    description; '^term' and 'term$' anchor on the name. Linear in the input,
+    whatever the query.
+    """
+    terms = []
+    for t in query.lower().split():
+        head, tail = t.startswith("^"), len(t) > 1 and t.endswith("$")
+        terms.append((head, tail, t[1 if head else 0:len(t) - 1 if tail else len(t)]))
+    def match(name: str, desc: str) -> bool:
+        n = name.lower()
+        for head, tail, core in terms:
+            if head or tail:
+                if (head and not n.startswith(core)) or (tail and not n.endswith(core)):
+                    return False
+            elif core not in n and core not in desc.lower():
+                return False
+        return True
+    return match
+
+class Index:
+    """The query side. The daemon owns one; the CLI uses a throwaway one when no daemon runs."""
+
+    def __init__(self, aur_names: bool = False):
+        self._lock = threading.Lock()
+        self._units: Optional[Tuple[Any, UnitStates, list]] = None  # (token, states, preset rules)
+        self._aur_names: frozenset = frozenset()
+        self._aur_names_ts = 0.0
+        self._aur_search: Dict[str, Tuple[float, list]] = {}
+        self.want_aur_names = aur_names
+        self.started = time.time()
+
+    # ---- indexes ----
+    def tokens(self) -> Dict[str, Any]:
+        return {"local": alpm.local_generation(), "sync": alpm.sync_generation(), "units": units_token()}
+
+    def warm(self) -> None:
+        """Build whatever is stale; alpm/depgraph caches skip parts whose token still matches."""
+        alpm.local_packages()
+        alpm.sync_packages()
+        alpm.local_units()
+        find_orphans(False)
+        find_orphans(True)
+        self._unit_states()
+        if self.want_aur_names and time.time() - self._aur_names_ts > AUR_NAMES_TTL:
+            self._load_aur_names()
+
+    def _unit_states(self) -> Tuple[UnitStates, list]:
+        token = units_token()
+        with self._lock:
+            if self._units is None or self._units[0] != token:
+                self._units = (token, UnitStates(), preset_rules())
+            return self._units[1], self._units[2]
+
+    def _load_aur_names(self) -> None:
+        import urllib.request  # keeps `pkgpicker search/orphans` (which import this module) fast
+        try:
+            with urllib.request.urlopen(AUR_NAMES_URL, timeout=30) as r:
+                raw = gzip.decompress(r.read()).decode("utf-8", "replace")
+        except OSError as e:
+            print(f"pkgpicker daemon: AUR names: {e}", file=sys.stderr)
+            return
+        self._aur_names = frozenset(ln.strip() for ln in raw.splitlines() if ln.strip() and not ln.startswith("#"))
+        self._aur_names_ts = time.time()
+
+    # ---- queries ----
+    def ping(self) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "uptime": round(time.time() - self.started, 1),
+                "aur_names": len(self._aur_names), "tokens": self.tokens()}
+
+    def installed(self) -> Dict[str, List[str]]:
+        """Same shape as snapshot.installed_state(), from the DB files instead of four pacman -Q runs."""
+        local, sync = alpm.local_packages(), alpm.sync_packages()
+        return {
+            "all": sorted(local),
+            "explicit": sorted(n for n, m in local.items() if m.reason == 0),
+            "repo": sorted(n for n in local if n in sync),
+            "foreign": sorted(n for n in local if n not in sync),
+        }
+
+    def search(self, query: str, aur: bool = False, repo: bool = True, limit: int = 0) -> List[Dict[str, Any]]:
+        """Repo rows, then AUR rows; `limit` applies to each source, so AUR hits survive a big repo result."""
+        rows: List[Dict[str, Any]] = []
+        local = alpm.local_packages()
+        if repo:
+            match = _matcher(query)
+            found = [m for m in alpm.sync_packages().values() if match(m.name, m.desc)]
+            found.sort(key=lambda m: m.name)
+            rows += [{"name": m.name, "version": m.version, "source": m.repo,
+                      "installed": m.name in local, "desc": m.desc} for m in found[:limit or None]]
+        if aur:
+            hits = self._aur(query)
+            rows += [dict(r, source="aur", installed=r["name"] in local) for r in hits[:limit or None]]
+        return rows
+
+    def _aur(self, query: str) -> List[Dict[str, str]]:
+        from .aur import aur_search
+        hit = self._aur_search.get(query)
+        if hit and time.time() - hit[0] < AUR_SEARCH_TTL:
+            return hit[1]
+        try:
+            res = aur_search(query)
+        except (OSError, ValueError) as e:
+            print(f"pkgpicker: AUR search failed: {e}", file=sys.stderr)
+            return []
+        if len(self._aur_search) > 256:
+            self._aur_search.clear()
+        self._aur_search[query] = (time.time(), res)
+        return res
+
+    def pkginfo(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        local, sync = alpm.local_packages(), alpm.sync_packages()
+        out: Dict[str, Dict[str, Any]] = {}
+        for n in names:
+            lm, sm = local.get(n), sync.get(n)
+            m = lm or sm
+            if m is None:
+                continue
+            d = asdict(m)
+            d["installed"] = lm is not None
+            d["repo"] = sm.repo if sm else ("aur" if n in self._aur_names else "local")
+            if sm is not None and lm is not None:
+                d["sync_version"] = sm.version
+            out[n] = d
+        return out
+
+    def resolve(self, names: List[str]) -> Dict[str, Any]:
+        """Where each plan entry comes from, plus the repo packages pacman -S would pull in."""
+        from .prefetch import download_set
+        local, sync = alpm.local_packages(), alpm.sync_packages()
+        prov = alpm.provides_index(sync.values())
+        out: Dict[str, Any] = {"installed": [], "repo": [], "aur": [], "missing": []}
+        for n in sorted(set(names)):
+            if n in local:
+                out["installed"].append(n)
+            elif n in sync or n in prov:
+                out["repo"].append(n)
+            elif n in self._aur_names:
+                out["aur"].append(n)
+            else:
+                out["missing"].append(n)
+        ds = download_set(out["repo"], local, sync)
+        out["deps"] = [m.name for m in ds if m.name not in out["repo"]]
+        out["download_size"] = sum(m.csize for m in ds)
+        return out
+
+    def orphans(self, optional: bool = True) -> List[Dict[str, Any]]:
+        return [{"name": n, "isize": sz, "in_cycle": cyc} for n, sz, cyc in find_orphans(with_optional=optional)]
+
+    def units(self, names: List[str]) -> Dict[str, Dict[str, str]]:
+        st, rules = self._unit_states()
+        return {u: {"enabled": st.state(u), "preset": preset_state(u, rules)} for u in names}
+
+    def aur_known(self, names: List[str]) -> Optional[List[str]]:
+        """Which names exist in the AUR, from packages.gz; None while that index is not loaded."""
+        if not self._aur_names:
+            return None
+        return [n for n in names if n in self._aur_names]
+
+    METHODS = ("ping", "installed", "search", "pkginfo", "resolve", "orphans", "units", "aur_known")
+
+    def call(self, method: str, **params: Any) -> Any:
+        if method not in self.METHODS:
+            raise UnknownMethod(method)
+        return getattr(self, method)(**params)
+
+# -------- server --------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        index: Index = self.server.index  # type: ignore[attr-defined]
+        for raw in self.rfile:
+            try:
+                req = json.loads(raw)
+                rid = req.get("id")
+                method, params = req["method"], req.get("params") or {}
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._send({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "parse error"}})
+                continue
+            try:
+                resp = {"result": index.call(method, **params)}
+            except UnknownMethod:
+                resp = {"error": {"code": -32601, "message": f"method not found: {method}"}}
+            except TypeError as e:
+                resp = {"error": {"code": -32602, "message": str(e)}}
+            except Exception as e:  # keep serving other clients
+                resp = {"error": {"code": -32000, "message": f"{type(e).__name__}: {e}"}}
+            self._send(dict(resp, jsonrpc="2.0", id=rid))
+
+    def _send(self, msg: dict) -> None:
+        self.wfile.write(json.dumps(msg, separators=(",", ":")).encode() + b"\n")
+        self.wfile.flush()
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def _bind_path() -> str:
+    env = os.environ.get("PKGPICKER_SOCKET")
+    if env:
+        return env
+    return DAEMON_SOCKET_SYSTEM if os.geteuid() == 0 else daemon_socket_paths()[-1]
+
+def _restrict(path: str, group: str) -> None:
+    """System socket: root plus `group` may connect (0660), root alone if the group doesn't exist."""
+    try:
+        gid = grp.getgrnam(group).gr_gid
+    except KeyError:
+        print(f"pkgpicker daemon: group {group!r} not found, socket is root-only", file=sys.stderr)
+        os.chmod(path, 0o600)
+        return
+    os.chown(path, 0, gid)
+    os.chmod(path, 0o660)
+
+def serve(path: Optional[str] = None, interval: float = 2.0, aur_names: bool = True,
+          ready: Optional[Callable[[str], None]] = None, group: Optional[str] = None) -> None:
+    path = path or _bind_path()
+    if Client(path).alive():
+        raise RuntimeError(f"daemon already running on {path}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.remove(path)  # stale socket from a crashed daemon
+    except FileNotFoundError:
+        pass
+    index = Index(aur_names=aur_names)
+    index.warm()
+    srv = _Server(path, _Handler)
+    srv.index = index  # type: ignore[attr-defined]
+    if os.geteuid() == 0:
+        _restrict(path, group or SOCKET_GROUP)
+
+    stop = threading.Event()
+    def watch():
+        # polling a handful of mtimes is cheaper than inotify plumbing and survives DB replacement
+        last = index.tokens()
+        while not stop.wait(interval):
+            now = index.tokens()
+            if now != last or (aur_names and time.time() - index._aur_names_ts > AUR_NAMES_TTL):
+                t0 = time.perf_counter()
+                index.warm()
+                changed = [k for k in now if now[k] != last.get(k)]
+                print(f"pkgpicker daemon: reindexed {', '.join(changed) or 'aur'} "
+                      f"in {(time.perf_counter() - t0) * 1000:.0f} ms", file=sys.stderr)
+                last = now
+    threading.Thread(target=watch, daemon=True).start()
+    if threading.current_thread() is threading.main_thread():
+        # systemd stops us with SIGTERM; shut down cleanly so the socket is removed
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=srv.shutdown, daemon=True).start())
+    if ready:
+        ready(path)
+    try:
+        srv.serve_forever()
+    finally:
+        stop.set()
+        srv.server_close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# -------- client --------
+class DaemonError(RuntimeError):
+    pass
+
+class Client:
+    """One connection per call: cheap on a Unix socket and safe from any thread."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+
+    def call(self, method: str, **params: Any) -> Any:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(self.timeout)
+            s.connect(self.path)
+            s.sendall(json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).encode() + b"\n")
+            with s.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            raise DaemonError("daemon closed the connection")
+        resp = json.loads(line)
+        if "error" in resp:
+            raise DaemonError(resp["error"].get("message", "error"))
+        return resp.get("result")
+
+    def alive(self) -> bool:
+        try:
+            self.call("ping")
+            return True
+        except (OSError, ValueError, DaemonError):
+            return False
+
+def connect() -> Optional[Client]:
+    """A client for the first reachable daemon (env, system, per-user socket), else None."""
+    for path in daemon_socket_paths():
+        if os.path.exists(path):
+            c = Client(path)
+            if c.alive():
+                return c
+    return None
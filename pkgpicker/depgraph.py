@@ -0,0 +1,208 @@
+from __future__ import annotations
+import threading
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+from .alpm import dep_name, local_generation, local_packages
+from .models import PkgMeta
+
+class DepGraph:
+    """
+    Dependency graph over the local DB, built once per local-DB generation.
+
+    Edges are resolved through provides= (pacman semantics: a dependency on
+    'sh' is satisfied by whatever installed package provides it), so forward
+    and reverse lookups are plain adjacency-list reads.
+    """
+
+    def __init__(self, pkgs: Dict[str, PkgMeta]):
+        self.pkgs = pkgs
+        providers: Dict[str, List[str]] = {}
+        for m in pkgs.values():
+            providers.setdefault(m.name, []).append(m.name)
+            for p in m.provides:
+                providers.setdefault(dep_name(p), []).append(m.name)
+        self.providers = providers
+
+        self.deps: Dict[str, Tuple[str, ...]] = {}
+        self.optdeps: Dict[str, Tuple[str, ...]] = {}
+        rdeps: Dict[str, Set[str]] = {n: set() for n in pkgs}
+        roptdeps: Dict[str, Set[str]] = {n: set() for n in pkgs}
+        for m in pkgs.values():
+            d = self._resolve(m.depends)
+            o = self._resolve(m.optdepends)
+            self.deps[m.name] = d
+            self.optdeps[m.name] = o
+            for t in d:
+                rdeps[t].add(m.name)
+            for t in o:
+                roptdeps[t].add(m.name)
+        self.rdeps = {k: tuple(sorted(v)) for k, v in rdeps.items()}
+        self.roptdeps = {k: tuple(sorted(v)) for k, v in roptdeps.items()}
+        self.explicit = sorted(n for n, m in pkgs.items() if m.reason == 0)
+        self._sole: Dict[Tuple[str, bool], List[str]] = {}
+
+    def _resolve(self, deps: Tuple[str, ...]) -> Tuple[str, ...]:
+        out: List[str] = []
+        for d in deps:
+            n = dep_name(d)
+            # prefer the package with that exact name, else every installed provider
+            if n in self.pkgs:
+                out.append(n)
+            else:
+                out.extend(self.providers.get(n, ()))
+        return tuple(sorted(set(out)))
+
+    def _edges(self, name: str, optional: bool) -> Tuple[str, ...]:
+        if optional:
+            return self.deps.get(name, ()) + self.optdeps.get(name, ())
+        return self.deps.get(name, ())
+
+    def reachable(self, roots: List[str], optional: bool = False, skip: str = "") -> Set[str]:
+        seen: Set[str] = set()
+        q = deque(r for r in roots if r in self.pkgs and r != skip)
+        seen.update(q)
+        while q:
+            n = q.popleft()
+            for t in self._edges(n, optional):
+                if t not in seen and t != skip:
+                    seen.add(t)
+                    q.append(t)
+        return seen
+
+    # ---------- orphans ----------
+    def orphans(self, optional: bool = True) -> List[str]:
+        """
+        Dependencies not reachable from any explicit package. Unlike
+        `pacman -Qtdq` this includes dependency cycles (a ↔ b, nothing else needs them).
+        optional=True lets optdepends keep packages alive, as `pacman -Qtd` does;
+        optional=False also lists packages only optionally required (`pacman -Qttd`).
+        """
+        keep = self.reachable(self.explicit, optional)
+        return sorted(n for n, m in self.pkgs.items() if m.reason != 0 and n not in keep)
+
+    def cyclic(self, names: List[str], optional: bool = True) -> Set[str]:
+        """Members of `names` on a dependency cycle within `names` (Tarjan SCCs, iterative)."""
+        sub = set(names)
+        edges = {n: [t for t in self._edges(n, optional) if t in sub] for n in sub}
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        out: Set[str] = set()
+        for root in names:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                n, i = work.pop()
+                if i == 0:
+                    index[n] = low[n] = len(index)
+                    stack.append(n)
+                    on_stack.add(n)
+                if i < len(edges[n]):
+                    work.append((n, i + 1))
+                    t = edges[n][i]
+                    if t not in index:
+                        work.append((t, 0))
+                    elif t in on_stack:
+                        low[n] = min(low[n], index[t])
+                    continue
+                if work:
+                    p = work[-1][0]
+                    low[p] = min(low[p], low[n])
+                if low[n] == index[n]:
+                    comp = []
+                    while True:
+                        t = stack.pop()
+                        on_stack.discard(t)
+                        comp.append(t)
+                        if t == n:
+                            break
+                    if len(comp) > 1 or n in edges[n]:
+                        out.update(comp)
+        return out
+
+    # ---------- why installed ----------
+    def why(self, name: str, limit: int = 5) -> List[List[str]]:
+        """
+        Shortest chains explicit → … → name (reverse BFS over rdeps), at most `limit`.
+        For an explicit package these are the other explicit packages that would pull it in.
+        """
+        if name not in self.pkgs:
+            return []
+        parent: Dict[str, str] = {name: ""}
+        q = deque([name])
+        chains: List[List[str]] = []
+        while q and len(chains) < limit:
+            n = q.popleft()
+            for r in self.rdeps.get(n, ()):
+                if r in parent:
+                    continue
+                parent[r] = n
+                if self.pkgs[r].reason == 0:
+                    chain = [r]
+                    cur = n
+                    while cur:
+                        chain.append(cur)
+                        cur = parent[cur]
+                    chains.append(chain)
+                    if len(chains) >= limit:
+                        break
+                else:
+                    q.append(r)
+        return chains
+
+    def sole_holder_of(self, name: str, optional: bool = True) -> List[str]:
+        """
+        Dependencies only `name` keeps alive (they become orphans when it goes).
+        Local fixpoint over name's subtree: a dep is held if all its reverse deps
+        are held. Cycles below `name` are left to orphans(). optional as there:
+        optdepends count as holders.
+        """
+        if name not in self.pkgs:
+            return []
+        key = (name, optional)
+        if key in self._sole:
+            return self._sole[key]
+        cand = [n for n in self.reachable([name], optional) if n != name and self.pkgs[n].reason != 0]
+        held: Set[str] = {name}
+        changed = True
+        while changed:
+            changed = False
+            for d in cand:
+                if d in held:
+                    continue
+                holders = self.rdeps.get(d, ()) + (self.roptdeps.get(d, ()) if optional else ())
+                if all(r in held for r in holders):
+                    held.add(d)
+                    changed = True
+        held.discard(name)
+        self._sole[key] = sorted(held)
+        return self._sole[key]
+
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[int, object]] = {}
+
+def _memo(key: str, gen: int, build):
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] == gen:
+            return hit[1]
+    val = build()
+    with _lock:
+        _cache[key] = (gen, val)
+    return val
+
+def local_graph() -> DepGraph:
+    """Memoized per local-DB generation (pacman transaction)."""
+    return _memo("graph", local_generation(), lambda: DepGraph(local_packages()))  # type: ignore[return-value]
+
+def find_orphans(with_optional: bool = True) -> List[Tuple[str, int, bool]]:
+    """[(name, installed size, in_cycle)] of true orphans; in_cycle = on a dependency cycle among the orphans."""
+    def build():
+        g = local_graph()
+        orph = g.orphans(with_optional)
+        cyc = g.cyclic(orph, with_optional)
+        return [(n, g.pkgs[n].isize, n in cyc) for n in orph]
+    return _memo(f"orphans:{with_optional}", local_generation(), build)  # type: ignore[return-value]
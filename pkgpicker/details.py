@@ -0,0 +1,177 @@
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from rich.markup import escape
+
+from . import alpm
+from .arch import human_size
+from .models import PkgMeta
+
+# Package details for the info panes. Sync-DB packages come from the alpm index,
+# AUR packages from batched RPC info calls. One background worker serves the
+# newest window of rows around a table cursor (nearest first) and drops older
+# windows, so the UI thread only ever reads what is already cached.
+WINDOW = 6  # rows above and below the cursor
+AUR_RETRY = 60.0  # seconds without AUR lookups after a network error
+
+T = TypeVar("T")
+Key = Tuple[str, str]  # (name, "repo" | "aur")
+
+@dataclass(frozen=True, slots=True)
+class PkgDetails:
+    name: str
+    version: str
+    source: str  # sync repo name or "aur"
+    desc: str = ""
+    url: str = ""
+    licenses: Tuple[str, ...] = ()
+    depends: Tuple[str, ...] = ()
+    optdepends: Tuple[str, ...] = ()
+    makedepends: Tuple[str, ...] = ()
+    csize: int = 0
+    isize: int = 0
+    extra: Tuple[Tuple[str, str], ...] = ()  # AUR: maintainer, votes, popularity, out-of-date
+
+def from_meta(m: PkgMeta) -> PkgDetails:
+    return PkgDetails(m.name, m.version, m.repo, m.desc, m.url, m.licenses, m.depends, m.optdepends,
+                      csize=m.csize, isize=m.isize)
+
+def from_aur(res: Dict[str, Any]) -> PkgDetails:
+    extra = [("Maintainer", res.get("Maintainer") or "orphan"), ("Votes", str(res.get("NumVotes", 0))),
+             ("Popularity", f"{res.get('Popularity', 0):.2f}")]
+    if res.get("OutOfDate"):
+        extra.append(("Out of date", time.strftime("%Y-%m-%d", time.localtime(res["OutOfDate"]))))
+    return PkgDetails(
+        res["Name"], res.get("Version", ""), "aur", res.get("Description") or "", res.get("URL") or "",
+        tuple(res.get("License") or ()), tuple(res.get("Depends") or ()), tuple(res.get("OptDepends") or ()),
+        tuple(res.get("MakeDepends") or ()), extra=tuple(extra),
+    )
+
+def _kind(src: str) -> str:
+    return "aur" if src == "aur" else "repo"
+
+def window(rows: Sequence[T], idx: int, radius: int = WINDOW) -> List[T]:
+    """rows[idx-radius .. idx+radius], nearest to idx first."""
+    out: List[T] = []
+    for d in range(radius + 1):
+        for i in ((idx,) if d == 0 else (idx - d, idx + d)):
+            if 0 <= i < len(rows):
+                out.append(rows[i])
+    return out
+
+class DetailCache:
+    def __init__(self, aur_lookup: Optional[Callable[[List[str]], Dict[str, Dict[str, Any]]]] = None):
+        self._lock = threading.Lock()
+        self._have: Dict[Key, Optional[PkgDetails]] = {}  # None: looked up, not found
+        self._want: Optional[Tuple[List[Key], Callable[[List[str]], None]]] = None
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._aur_lookup = aur_lookup
+        self._aur_down_until = 0.0
+        self.aur_error = ""
+
+    def get(self, name: str, src: str) -> Tuple[Optional[PkgDetails], bool]:
+        """(details, looked up yet)."""
+        k = (name, _kind(src))
+        with self._lock:
+            return self._have.get(k), k in self._have
+
+    def prefetch(self, rows: List[Tuple[str, str]], done: Callable[[List[str]], None]) -> None:
+        """Replace the pending window; done(names) is called from the worker after each batch."""
+        with self._lock:
+            todo = [k for k in dict.fromkeys((n, _kind(s)) for n, s in rows) if k not in self._have]
+            if not todo:
+                return
+            self._want = (todo, done)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _publish(self, got: Dict[Key, Optional[PkgDetails]], done: Callable[[List[str]], None],
+                 names: Optional[List[str]] = None) -> None:
+        with self._lock:
+            self._have.update(got)
+        try:
+            done([n for n, _ in got] if names is None else names)
+        except RuntimeError:
+            pass  # app already shut down
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                want, self._want = self._want, None
+            if want is None:
+                continue
+            keys, done = want
+            repo = [n for n, k in keys if k == "repo"]
+            aur = [n for n, k in keys if k == "aur"]
+            if repo:
+                sync, local = alpm.sync_packages(), alpm.local_packages()
+                got: Dict[Key, Optional[PkgDetails]] = {}
+                for n in repo:
+                    m = sync.get(n) or local.get(n)
+                    got[(n, "repo")] = from_meta(m) if m is not None else None
+                self._publish(got, done)
+            if not aur or time.time() < self._aur_down_until or self._want is not None:
+                continue  # the cursor moved on: serve the newer window first
+            lookup = self._aur_lookup
+            if lookup is None:
+                from .aur import aur_info_raw as lookup
+            try:
+                res = lookup(aur)  # whole window in one RPC call
+            except (OSError, ValueError) as e:
+                self._aur_down_until = time.time() + AUR_RETRY
+                self.aur_error = str(e)
+                self._publish({}, done, aur)  # panes switch from "lade …" to the error
+                continue
+            self.aur_error = ""
+            self._publish({(n, "aur"): from_aur(res[n]) if n in res else None for n in aur}, done)
+
+def _names(deps: Tuple[str, ...], limit: int = 24) -> str:
+    names = [escape(alpm.dep_name(d.split(":", 1)[0])) for d in deps]
+    more = f" … (+{len(names) - limit})" if len(names) > limit else ""
+    return " ".join(names[:limit]) + more
+
+def format_details(d: PkgDetails, installed: Optional[str] = None) -> str:
+    """Info-pane markup; `installed` is the installed version, if any."""
+    lines = [f"[b]{escape(d.name)}[/b] {escape(d.version)}  [dim]{d.source}[/dim]"]
+    if installed:
+        lines.append(f"[green]installiert[/green] {escape(installed)}")
+    if d.desc:
+        lines += ["", escape(d.desc)]
+    lines.append("")
+    if d.url:
+        lines.append(f"[dim]URL:[/dim] {escape(d.url)}")
+    if d.licenses:
+        lines.append(f"[dim]Lizenz:[/dim] {escape(', '.join(d.licenses))}")
+    if d.csize or d.isize:
+        lines.append(f"[dim]Größe:[/dim] {human_size(d.csize)} Download · {human_size(d.isize)} installiert")
+    for k, v in d.extra:
+        lines.append(f"[dim]{k}:[/dim] {escape(v)}")
+    if d.depends:
+        lines.append(f"[dim]Depends ({len(d.depends)}):[/dim] {_names(d.depends)}")
+    if d.makedepends:
+        lines.append(f"[dim]Make ({len(d.makedepends)}):[/dim] {_names(d.makedepends)}")
+    if d.optdepends:
+        lines.append(f"[dim]Optional ({len(d.optdepends)}):[/dim] {_names(d.optdepends, 12)}")
+    return "\n".join(lines)
+
+def installed_version(name: str) -> Optional[str]:
+    hit = alpm.peek("local")  # never parses the DB on the UI thread
+    m = hit[1].get(name) if hit is not None else None  # type: ignore[union-attr]
+    return m.version if m is not None else None
+
+def pane_text(cache: DetailCache, name: str, src: str, fallback: str) -> str:
+    """Details if cached; otherwise `fallback` plus a lookup status line."""
+    d, known = cache.get(name, src)
+    if d is not None:
+        return format_details(d, installed_version(name))
+    if not known and _kind(src) == "aur" and cache.aur_error:
+        return fallback + f"\n\n[yellow]AUR nicht erreichbar: {escape(cache.aur_error)}[/yellow]"
+    return fallback + ("\n\n[yellow]keine Metadaten gefunden[/yellow]" if known else "\n\n[dim]lade Details …[/dim]")
@@ -0,0 +1,248 @@
+from __future__ import annotations
+import os
+import platform
+import threading
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Hardware scan straight from sysfs (no lspci/lsusb) plus driver → package suggestions.
+SYSFS = "/sys"
+MODULES_DIR = "/usr/lib/modules"
+
+# kernel module (exact name or prefix ending in "_"/"*") -> (kind, packages)
+MODULE_PKGS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("nvidia", "gpu", ("nvidia-open", "nvidia-utils", "lib32-nvidia-utils", "vulkan-icd-loader", "lib32-vulkan-icd-loader")),
+    ("nouveau", "gpu", ("mesa", "vulkan-nouveau", "lib32-mesa", "linux-firmware-nvidia")),
+    ("amdgpu", "gpu", ("mesa", "vulkan-radeon", "lib32-mesa", "lib32-vulkan-radeon", "vulkan-icd-loader", "linux-firmware-amdgpu")),
+    ("radeon", "gpu", ("mesa", "lib32-mesa", "linux-firmware-radeon")),
+    ("i915", "gpu", ("mesa", "vulkan-intel", "lib32-mesa", "lib32-vulkan-intel", "intel-media-driver", "vulkan-icd-loader", "linux-firmware-intel")),
+    ("xe", "gpu", ("mesa", "vulkan-intel", "lib32-mesa", "lib32-vulkan-intel", "intel-media-driver", "vulkan-icd-loader", "linux-firmware-intel")),
+    ("iwlwifi", "wifi", ("linux-firmware-intel",)),
+    ("iwlmvm", "wifi", ("linux-firmware-intel",)),
+    ("ath10k_*", "wifi", ("linux-firmware-atheros",)),
+    ("ath11k*", "wifi", ("linux-firmware-atheros",)),
+    ("ath12k*", "wifi", ("linux-firmware-atheros",)),
+    ("rtw88_*", "wifi", ("linux-firmware-realtek",)),
+    ("rtw89_*", "wifi", ("linux-firmware-realtek",)),
+    ("rtl8*", "wifi", ("linux-firmware-realtek",)),
+    ("mt76*", "wifi", ("linux-firmware-mediatek",)),
+    ("mt79*", "wifi", ("linux-firmware-mediatek",)),
+    ("brcmfmac", "wifi", ("linux-firmware-broadcom",)),
+    ("btusb", "bluetooth", ("bluez", "bluez-utils")),
+    ("btintel", "bluetooth", ("bluez", "bluez-utils", "linux-firmware-intel")),
+    ("btrtl", "bluetooth", ("bluez", "bluez-utils", "linux-firmware-realtek")),
+    ("btmtk", "bluetooth", ("bluez", "bluez-utils", "linux-firmware-mediatek")),
+    ("r8169", "net", ("linux-firmware-realtek",)),
+    ("tg3", "net", ("linux-firmware-broadcom",)),
+    ("bnx2*", "net", ("linux-firmware-broadcom",)),
+    ("snd_sof*", "audio", ("sof-firmware",)),
+    ("snd_hda_intel", "audio", ("alsa-firmware",)),
+)
+
+# GPUs whose driver is out of tree (not in modules.alias): PCI vendor -> module
+GPU_VENDOR_MODULE = {"10de": "nvidia", "1002": "amdgpu", "8086": "i915"}
+
+@dataclass(frozen=True)
+class Device:
+    bus: str  # "pci" | "usb"
+    slot: str  # sysfs name, e.g. 0000:01:00.0 or 1-3:1.0
+    vendor: str  # 4 hex digits, lower case
+    device: str
+    cls: str  # pci: 6 hex digits (class/subclass/prog-if); usb: interface class/sub/proto
+    modalias: str
+    driver: str  # currently bound driver ("" if none)
+
+    @property
+    def kind(self) -> str:
+        if self.bus == "pci":
+            c = self.cls[:4]
+            if c[:2] == "03":
+                return "gpu"
+            return {"0280": "wifi", "0200": "net", "0403": "audio", "0d11": "bluetooth"}.get(c, "other")
+        if self.cls[:6] == "e00101":
+            return "bluetooth"
+        return "other"
+
+@dataclass(frozen=True)
+class Suggestion:
+    device: Device
+    kind: str
+    module: str
+    packages: Tuple[str, ...]
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def _driver(path: str) -> str:
+    try:
+        return os.path.basename(os.readlink(os.path.join(path, "driver")))
+    except OSError:
+        return ""
+
+def _hex(v: str, n: int = 4) -> str:
+    return v.lower().replace("0x", "").rjust(n, "0")
+
+def scan_pci() -> List[Device]:
+    base = os.path.join(SYSFS, "bus", "pci", "devices")
+    out: List[Device] = []
+    try:
+        entries = sorted(os.scandir(base), key=lambda e: e.name)
+    except OSError:
+        return out
+    for e in entries:
+        p = e.path
+        out.append(Device(
+            bus="pci", slot=e.name,
+            vendor=_hex(_read(os.path.join(p, "vendor"))),
+            device=_hex(_read(os.path.join(p, "device"))),
+            cls=_hex(_read(os.path.join(p, "class")), 6),
+            modalias=_read(os.path.join(p, "modalias")),
+            driver=_driver(p),
+        ))
+    return out
+
+def scan_usb() -> List[Device]:
+    """One entry per interface (drivers bind to interfaces, and they carry the modalias)."""
+    base = os.path.join(SYSFS, "bus", "usb", "devices")
+    out: List[Device] = []
+    try:
+        entries = sorted(os.scandir(base), key=lambda e: e.name)
+    except OSError:
+        return out
+    for e in entries:
+        if ":" not in e.name:
+            continue
+        parent = os.path.join(base, e.name.split(":", 1)[0])
+        vendor = _hex(_read(os.path.join(parent, "idVendor")))
+        if vendor == "1d6b":  # Linux Foundation root hubs
+            continue
+        cls = "".join(_hex(_read(os.path.join(e.path, f)), 2) for f in ("bInterfaceClass", "bInterfaceSubClass", "bInterfaceProtocol"))
+        out.append(Device(
+            bus="usb", slot=e.name, vendor=vendor,
+            device=_hex(_read(os.path.join(parent, "idProduct"))),
+            cls=cls,
+            modalias=_read(os.path.join(e.path, "modalias")),
+            driver=_driver(e.path),
+        ))
+    return out
+
+def scan_devices() -> List[Device]:
+    return scan_pci() + scan_usb()
+
+# -------- modalias index --------
+_PREFIX = {"pci": 9, "usb": 5}  # "v00008086" / "v8087": vendor part of the alias
+
+def _bucket(alias: str) -> str:
+    bus, _, rest = alias.partition(":")
+    n = _PREFIX.get(bus, 0)
+    head = rest[:n]
+    if n and len(head) == n and not any(c in head for c in "*?["):
+        return f"{bus}:{head}"
+    return f"{bus}:"
+
+class ModaliasIndex:
+    """
+    modules.alias bucketed by bus + vendor, so a device is only matched against
+    the patterns that can apply to it (plus the vendor-wildcard ones).
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.buckets: Dict[str, List[Tuple[str, str]]] = {}
+        for ln in lines:
+            if not ln.startswith("alias "):
+                continue
+            parts = ln.split()
+            if len(parts) != 3:
+                continue
+            _, pat, mod = parts
+            self.buckets.setdefault(_bucket(pat), []).append((pat, mod))
+
+    def modules(self, modalias: str) -> List[str]:
+        if not modalias:
+            return []
+        bus = modalias.split(":", 1)[0]
+        out: List[str] = []
+        for key in (_bucket(modalias), f"{bus}:"):
+            for pat, mod in self.buckets.get(key, ()):
+                if mod not in out and fnmatchcase(modalias, pat):
+                    out.append(mod)
+        return out
+
+_lock = threading.Lock()
+_index: Optional[Tuple[Tuple[str, int], ModaliasIndex]] = None
+
+def modalias_index(release: Optional[str] = None) -> ModaliasIndex:
+    """Parsed modules.alias of the running kernel, rebuilt when the file changes."""
+    global _index
+    path = os.path.join(MODULES_DIR, release or platform.release(), "modules.alias")
+    try:
+        token = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        token = (path, 0)
+    with _lock:
+        if _index is not None and _index[0] == token:
+            return _index[1]
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            idx = ModaliasIndex(f)
+    except OSError:
+        idx = ModaliasIndex(())
+    with _lock:
+        _index = (token, idx)
+    return idx
+
+# -------- module → packages --------
+def module_packages(module: str) -> Optional[Tuple[str, Tuple[str, ...]]]:
+    m = module.replace("-", "_")
+    for pat, kind, pkgs in MODULE_PKGS:
+        if fnmatchcase(m, pat):
+            return kind, pkgs
+    return None
+
+def suggest(devices: Iterable[Device], index: Optional[ModaliasIndex] = None) -> List[Suggestion]:
+    """
+    Per device: the bound driver if any, else the modalias candidates from the
+    index; the first one with a package mapping wins. GPUs without an in-tree
+    match fall back to the vendor's usual driver.
+    """
+    index = index or modalias_index()
+    out: List[Suggestion] = []
+    seen: Set[Tuple[str, str]] = set()
+    for d in devices:
+        cands = ([d.driver] if d.driver else []) + index.modules(d.modalias)
+        if d.kind == "gpu" and d.vendor in GPU_VENDOR_MODULE:
+            cands.append(GPU_VENDOR_MODULE[d.vendor])
+        for mod in cands:
+            hit = module_packages(mod)
+            if not hit:
+                continue
+            kind, pkgs = hit
+            key = (f"{d.bus}:{d.vendor}:{d.device}", mod)
+            if key not in seen:
+                seen.add(key)
+                out.append(Suggestion(d, kind if d.kind == "other" else d.kind, mod, pkgs))
+            break
+    return out
+
+def suggested_packages(sugs: Iterable[Suggestion], available: Optional[Set[str]] = None) -> List[str]:
+    """
+    Ordered, de-duplicated package list. With `available` (sync DB names), split
+    firmware packages fall back to the monolithic linux-firmware.
+    """
+    sugs = list(sugs)
+    out: List[str] = []
+    for s in sugs:
+        for p in s.packages:
+            if available and p not in available and p.startswith("linux-firmware-"):
+                p = "linux-firmware"
+            if p not in out:
+                out.append(p)
+    gpus = {s.module for s in sugs if s.kind == "gpu"}
+    if "nvidia" in gpus and gpus & {"i915", "xe", "amdgpu"} and "nvidia-prime" not in out:
+        out.append("nvidia-prime")  # hybrid graphics: prime-run for the dGPU
+    return out
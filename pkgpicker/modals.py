@@ -2,7 +2,7 @@ from __future__ import annotations
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.screen import ModalScreen
-from textual.widgets import Button, Input, Static
+from textual.widgets import Button, Input, Static, TextArea
 
 class ConfirmModal(ModalScreen[bool]):
     def __init__(self, title: str, body: str):
@@ -67,3 +67,31 @@ class TextInputModal(ModalScreen[str]):
         else:
             self.dismiss(self.query_one("#ti", Input).value.strip())
 
+class ListInputModal(ModalScreen[str]):
+    """Multi-line input (pasted package lists); the first line may instead be a file path."""
+
+    def __init__(self, title: str, hint: str):
+        super().__init__()
+        self._title = title
+        self._hint = hint
+
+    def compose(self) -> ComposeResult:
+        yield Container(
+            Static(f"[b]{self._title}[/b]"),
+            Static(f"[dim]{self._hint}[/dim]"),
+            TextArea(id="ta"),
+            Horizontal(
+                Button("OK", id="ok", variant="success"),
+                Button("Cancel", id="cancel", variant="error"),
+            ),
+            id="modal",
+        )
+
+    def on_mount(self) -> None:
+        self.query_one("#ta", TextArea).focus()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "cancel":
+            self.dismiss("")
+        else:
+            self.dismiss(self.query_one("#ta", TextArea).text)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, List
+from typing import Any, List, Tuple
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PackageItem:
     name: str
     source: str  # repo|aur
@@ -10,12 +10,12 @@ class PackageItem:
     featured: bool = False
     reason: str = ""
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Category:
     name: str
     items: List[PackageItem]
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Target:
     id: str
     name: str
@@ -24,9 +24,30 @@ class Target:
     services: List[Any]  # str or dict
     preset: str  # hyprland|plasma
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConflictRule:
     name: str
     group: List[str]
     mode: str  # at_most_one | exactly_one
 
+
+@dataclass(frozen=True, slots=True)
+class PkgMeta:
+    name: str
+    version: str
+    repo: str = ""  # sync repo name, "local" for the local DB
+    desc: str = ""
+    arch: str = ""
+    url: str = ""
+    licenses: Tuple[str, ...] = ()
+    groups: Tuple[str, ...] = ()
+    depends: Tuple[str, ...] = ()
+    optdepends: Tuple[str, ...] = ()
+    provides: Tuple[str, ...] = ()
+    conflicts: Tuple[str, ...] = ()
+    replaces: Tuple[str, ...] = ()
+    csize: int = 0
+    isize: int = 0
+    filename: str = ""
+    sha256: str = ""
+    reason: int = 0  # local only: 0 explicit | 1 dependency
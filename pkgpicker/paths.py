@@ -0,0 +1,29 @@
+from __future__ import annotations
+import os
+from typing import List
+
+# Per-user state shared by the TUI, the CLI and the workers.
+CACHE_DIR = os.path.expanduser("~/.cache/pkgpicker")
+HISTORY_LOG = os.path.join(CACHE_DIR, "history.log")
+SEARCH_CACHE_FILE = os.path.join(CACHE_DIR, "search_cache.json")
+PKGINFO_CACHE_FILE = os.path.join(CACHE_DIR, "pkginfo_cache.json")
+PROFILES_DIR = os.path.join(CACHE_DIR, "profiles")
+EXPORTS_DIR = os.path.join(CACHE_DIR, "exports")
+BUNDLES_DIR = os.path.join(EXPORTS_DIR, "bundles")
+SNAPSHOT_FILE = os.path.join(CACHE_DIR, "state-snapshot.json")
+APPLY_JOURNAL = os.path.join(CACHE_DIR, "apply-journal.json")
+PREFETCH_DIR = os.path.join(CACHE_DIR, "prefetch")
+AUR_DIR = os.path.join(CACHE_DIR, "aur")
+CATALOG_CACHE_DIR = os.path.join(CACHE_DIR, "catalog")
+
+DAEMON_SOCKET_SYSTEM = "/run/pkgpicker/daemon.sock"
+
+def daemon_socket_paths() -> List[str]:
+    """Where clients look for `pkgpicker daemon`: $PKGPICKER_SOCKET, the system socket, the per-user one."""
+    env = os.environ.get("PKGPICKER_SOCKET")
+    user = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or CACHE_DIR, "pkgpicker.sock")
+    return ([env] if env else []) + [DAEMON_SOCKET_SYSTEM, user]
+
+def profile_path(name: str, profiles_dir: str = PROFILES_DIR) -> str:
+    safe = "".join(c for c in name if c.isalnum() or c in ("-", "_")).strip("_-") or "profile"
+    return os.path.join(profiles_dir, f"{safe}.json")
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .privhelper import sudo_run
+from .vercmp import version_key
+
+PKG_CACHE_DIR = "/var/cache/pacman/pkg"
+PACMAN_LOCK = "/var/lib/pacman/db.lck"
+PART_MIN_AGE = 3600  # a .part younger than this may still be downloading
+
+
+@dataclass(frozen=True)
+class CacheFile:
+    name: str
+    version: str  # [epoch:]pkgver-pkgrel
+    arch: str
+    path: str
+    size: int  # package file; the .sig next to it is noise
+
+@dataclass
+class CachePkg:
+    name: str
+    installed: bool
+    files: List[CacheFile] = field(default_factory=list)  # newest first
+    drop: List[CacheFile] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(f.size for f in self.files)
+
+    @property
+    def reclaim(self) -> int:
+        return sum(f.size for f in self.drop)
+
+@dataclass
+class CacheReport:
+    cache_dir: str
+    keep: int
+    keep_uninstalled: int
+    pkgs: List[CachePkg]
+    files: int
+    total: int
+    partial: List[str]  # leftover *.part downloads, old enough and no pacman running
+    partial_skipped: int = 0  # recent ones, or all of them while pacman holds its lock
+
+    @property
+    def reclaim(self) -> int:
+        return sum(p.reclaim for p in self.pkgs)
+
+    def removal_paths(self) -> List[str]:
+        out: List[str] = []
+        for p in self.pkgs:
+            for f in p.drop:
+                out.append(f.path)
+                out.append(f.path + ".sig")
+        out.extend(self.partial)
+        return out
+
+def parse_pkg_filename(fname: str) -> Optional[Tuple[str, str, str]]:
+    """'foo-bar-1:2.0-3-x86_64.pkg.tar.zst' -> ('foo-bar', '1:2.0-3', 'x86_64')."""
+    i = fname.rfind(".pkg.tar")
+    if i <= 0 or not (len(fname) == i + 8 or fname[i + 8] == "."):
+        return None
+    parts = fname[:i].rsplit("-", 3)
+    if len(parts) != 4 or not all(parts):
+        return None
+    name, pkgver, pkgrel, arch = parts
+    return name, f"{pkgver}-{pkgrel}", arch
+
+def _stat_sizes(paths: List[str], workers: int = 8) -> Dict[str, int]:
+    # stat() is the only per-file syscall scandir can't answer from d_type; spread it out
+    def one(chunk: List[str]) -> List[Tuple[str, int]]:
+        out = []
+        for p in chunk:
+            try:
+                out.append((p, os.stat(p).st_size))
+            except OSError:
+                out.append((p, 0))
+        return out
+    if not paths:
+        return {}
+    step = max(256, len(paths) // (workers * 4) + 1)
+    chunks = [paths[i:i + step] for i in range(0, len(paths), step)]
+    sizes: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for res in ex.map(one, chunks):
+            sizes.update(res)
+    return sizes
+
+def analyze(installed: Iterable[str], keep: int = 3, keep_uninstalled: Optional[int] = None,
+            cache_dir: str = PKG_CACHE_DIR) -> CacheReport:
+    """
+    keep: newest versions to keep per installed package (paccache -rk N).
+    keep_uninstalled: versions to keep for packages no longer installed (paccache -ruk N);
+    None keeps as many as `keep`, like plain `paccache -r`. 0 drops them all.
+    """
+    if keep_uninstalled is None:
+        keep_uninstalled = keep
+    inst: Set[str] = set(installed)
+    pkg_files: List[Tuple[str, str, str, str]] = []
+    partial: List[str] = []
+    skipped = 0
+    busy = os.path.exists(PACMAN_LOCK)
+    cutoff = time.time() - PART_MIN_AGE
+    try:
+        with os.scandir(cache_dir) as it:
+            for e in it:
+                n = e.name
+                if n.endswith(".sig"):
+                    continue
+                if n.endswith(".part"):
+                    try:
+                        old = e.stat(follow_symlinks=False).st_mtime < cutoff
+                    except OSError:
+                        old = False
+                    if old and not busy:
+                        partial.append(e.path)
+                    else:
+                        skipped += 1
+                    continue
+                parsed = parse_pkg_filename(n)
+                if parsed and e.is_file(follow_symlinks=False):
+                    pkg_files.append((parsed[0], parsed[1], parsed[2], e.path))
+    except OSError:
+        pass
+
+    sizes = _stat_sizes([p for _, _, _, p in pkg_files])
+
+    groups: Dict[Tuple[str, str], List[CacheFile]] = {}
+    for name, ver, arch, path in pkg_files:
+        groups.setdefault((name, arch), []).append(CacheFile(name, ver, arch, path, sizes.get(path, 0)))
+
+    by_name: Dict[str, CachePkg] = {}
+    total = 0
+    for (name, _arch), files in groups.items():
+        files.sort(key=lambda f: version_key(f.version), reverse=True)
+        n_keep = keep if name in inst else keep_uninstalled
+        cp = by_name.setdefault(name, CachePkg(name=name, installed=name in inst))
+        cp.files.extend(files)
+        cp.drop.extend(files[max(0, n_keep):])
+        total += sum(f.size for f in files)
+
+    pkgs = sorted(by_name.values(), key=lambda p: (-p.reclaim, p.name))
+    return CacheReport(cache_dir=cache_dir, keep=keep, keep_uninstalled=keep_uninstalled,
+                       pkgs=pkgs, files=len(pkg_files), total=total, partial=partial, partial_skipped=skipped)
+
+def clean(report: CacheReport, sudo: bool = True) -> Tuple[int, str]:
+    """Delete exactly report.removal_paths() in one privileged `xargs -0 rm -f` call (via the root helper if running)."""
+    base = os.path.realpath(report.cache_dir)
+    busy = os.path.exists(PACMAN_LOCK)  # pacman may have started downloading since analyze()
+    paths = [p for p in report.removal_paths()
+             if os.path.dirname(os.path.realpath(p)) == base and not (busy and p.endswith(".part"))]
+    if not paths:
+        return 0, "nothing to remove"
+    cmd = ["xargs", "-0", "rm", "-f", "--"]
+    if sudo:
+        rc, out = sudo_run(cmd, input="\0".join(paths))
+        return rc, out or f"removed {len(paths)} paths"
+    try:
+        p = subprocess.run(cmd, input="\0".join(paths).encode(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    except FileNotFoundError:
+        return 127, f"Command not found: {cmd[0]}"
+    return p.returncode, p.stdout.decode("utf-8", "replace") or f"removed {len(paths)} paths"
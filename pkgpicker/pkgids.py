@@ -0,0 +1,175 @@
+from __future__ import annotations
+import sys
+import threading
+from collections.abc import Set as AbcSet
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Package names interned to small integer IDs, and sets of them stored as one
+# Python int used as a bitset: union/intersection/difference are single int ops,
+# len() is bit_count(), and an immutable copy is free (ints are immutable).
+
+class NameTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()  # workers intern too
+
+    def id(self, name: str) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(name)
+                if i is None:
+                    i = len(self.names)
+                    self.names.append(sys.intern(name))
+                    self.ids[name] = i
+        return i
+
+    def get(self, name: str) -> Optional[int]:
+        """ID without interning (membership tests never grow the table)."""
+        return self.ids.get(name)
+
+    def bits(self, names: Iterable[str]) -> int:
+        b = 0
+        for n in names:
+            b |= 1 << self.id(n)
+        return b
+
+    def known_bits(self, names: Iterable[str]) -> Tuple[int, bool]:
+        """(bits of the names already interned, whether any name was not); never grows the table."""
+        b, unknown = 0, False
+        ids = self.ids
+        for n in names:
+            i = ids.get(n)
+            if i is None:
+                unknown = True
+            else:
+                b |= 1 << i
+        return b, unknown
+
+    def iter_bits(self, bits: int) -> Iterator[str]:
+        # bin() is C speed; scanning the reversed digit string beats bit tricks for dense sets
+        digits = bin(bits)[:1:-1]
+        names = self.names
+        i = digits.find("1")
+        while i >= 0:
+            yield names[i]
+            i = digits.find("1", i + 1)
+
+NAMES = NameTable()
+
+class Bitset:
+    """Read side shared by IdSet and state.ObservableSet: subclasses provide `bits` and `table`."""
+
+    __slots__ = ()
+    bits: int
+    table: NameTable
+
+    def _other_bits(self, other: Iterable[str]) -> int:
+        """Interns other's names: only for results that can contain them (|, ^, update)."""
+        if isinstance(other, Bitset) and other.table is self.table:
+            return other.bits
+        return self.table.bits(other)
+
+    def _known_bits(self, other: Iterable[str]) -> Tuple[int, bool]:
+        """(bits, other has names the table doesn't know) for tests, & and -, which can't add names."""
+        if isinstance(other, Bitset) and other.table is self.table:
+            return other.bits, False
+        return self.table.known_bits(other)
+
+    def frozen(self) -> "IdSet":
+        return IdSet(table=self.table, bits=self.bits)
+
+    def __contains__(self, name: object) -> bool:
+        i = self.table.get(name) if isinstance(name, str) else None
+        return i is not None and (self.bits >> i) & 1 == 1
+
+    def __iter__(self) -> Iterator[str]:
+        return self.table.iter_bits(self.bits)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Bitset) and other.table is self.table:
+            return self.bits == other.bits
+        return AbcSet.__eq__(self, other)  # type: ignore[arg-type]
+
+    def __le__(self, other) -> bool:
+        return not (self.bits & ~self._known_bits(other)[0])
+
+    def __ge__(self, other) -> bool:
+        b, unknown = self._known_bits(other)
+        return not unknown and not (b & ~self.bits)
+
+    def __lt__(self, other) -> bool:
+        return self <= other and self != other
+
+    def __gt__(self, other) -> bool:
+        return self >= other and self != other
+
+    # binary operators always produce an immutable IdSet
+    def __or__(self, other):
+        return IdSet(table=self.table, bits=self.bits | self._other_bits(other))
+
+    def __and__(self, other):
+        return IdSet(table=self.table, bits=self.bits & self._known_bits(other)[0])
+
+    def __sub__(self, other):
+        return IdSet(table=self.table, bits=self.bits & ~self._known_bits(other)[0])
+
+    def __xor__(self, other):
+        return IdSet(table=self.table, bits=self.bits ^ self._other_bits(other))
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __rsub__(self, other):
+        return IdSet(table=self.table, bits=self._other_bits(other) & ~self.bits)
+
+    def isdisjoint(self, other: Iterable[str]) -> bool:
+        return not (self.bits & self._known_bits(other)[0])
+
+    issubset = __le__
+    issuperset = __ge__
+
+    def union(self, *others: Iterable[str]) -> "IdSet":
+        b = self.bits
+        for o in others:
+            b |= self._other_bits(o)
+        return IdSet(table=self.table, bits=b)
+
+    def intersection(self, *others: Iterable[str]) -> "IdSet":
+        b = self.bits
+        for o in others:
+            b &= self._known_bits(o)[0]
+        return IdSet(table=self.table, bits=b)
+
+    def difference(self, *others: Iterable[str]) -> "IdSet":
+        b = self.bits
+        for o in others:
+            b &= ~self._known_bits(o)[0]
+        return IdSet(table=self.table, bits=b)
+
+class IdSet(Bitset, AbcSet):
+    """Immutable set of names; copying one is free, so snapshots hand these out."""
+
+    __slots__ = ("bits", "table")
+
+    def __init__(self, names: Iterable[str] = (), table: NameTable = NAMES, bits: Optional[int] = None):
+        self.table = table
+        self.bits = table.bits(names) if bits is None else bits
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[str]) -> "IdSet":
+        return cls(it)
+
+    def __hash__(self) -> int:
+        return AbcSet._hash(self)  # equal to a frozenset of the same names, so hash like one
@@ -0,0 +1,221 @@
+from __future__ import annotations
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from .state import ObservableSet
+
+SET_FIELDS = ("repo", "aur", "remove", "svc_enable", "svc_disable")
+SCALAR_FIELDS = ("preset", "generate_configs")
+ALL_FIELDS: FrozenSet[str] = frozenset(SET_FIELDS + SCALAR_FIELDS)
+
+# journal op: (field, added|old, removed|new)
+Op = Tuple[str, Any, Any]
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    # IdSets: immutable, and taking one from the live plan copies no names
+    repo: AbstractSet[str]
+    aur: AbstractSet[str]
+    remove: AbstractSet[str]
+    svc_enable: AbstractSet[str]
+    svc_disable: AbstractSet[str]
+    preset: Optional[str]
+    generate_configs: bool
+
+    def is_empty(self) -> bool:
+        return not (self.repo or self.aur or self.remove or self.svc_enable or self.svc_disable
+                    or (self.generate_configs and self.preset))
+
+@dataclass(frozen=True)
+class PlanChange:
+    fields: FrozenSet[str]
+    label: str = ""
+    replay: str = ""  # "" | "undo" | "redo"
+
+class Plan:
+    """
+    The install/remove/services/preset plan.
+
+    Mutations go through the ObservableSet fields (or the preset/
+    generate_configs properties); each top-level mutation or `batch()` is one
+    journal entry for undo/redo and one PlanChange for subscribers.
+    """
+
+    def __init__(self) -> None:
+        self.repo = ObservableSet()
+        self.aur = ObservableSet()
+        self.remove = ObservableSet()
+        self.svc_enable = ObservableSet()
+        self.svc_disable = ObservableSet()
+        self._preset: Optional[str] = None
+        self._generate_configs = False
+
+        self.version = 0
+        self._subs: Dict[str, Tuple[FrozenSet[str], Callable[[PlanChange], None]]] = {}
+        self._undo: List[Tuple[str, List[Op]]] = []
+        self._redo: List[Tuple[str, List[Op]]] = []
+        self._depth = 0
+        self._pending: List[Op] = []
+        self._label = ""
+        self._replaying = ""
+        self._snap: Optional[PlanSnapshot] = None
+        self._snap_version = -1
+
+        for f in SET_FIELDS:
+            getattr(self, f).subscribe(self._recorder(f))
+
+    # ---------- subscriptions ----------
+    def subscribe(self, key: str, fn: Callable[[PlanChange], None], fields: Iterable[str] = ALL_FIELDS) -> None:
+        """Register `fn` under `key` (re-registering replaces); only called if one of `fields` changed."""
+        self._subs[key] = (frozenset(fields), fn)
+
+    def unsubscribe(self, key: str) -> None:
+        self._subs.pop(key, None)
+
+    def _emit(self, ops: List[Op], label: str) -> None:
+        self.version += 1
+        ch = PlanChange(fields=frozenset(op[0] for op in ops), label=label, replay=self._replaying)
+        for fields, fn in list(self._subs.values()):
+            if fields & ch.fields:
+                fn(ch)
+
+    # ---------- journal ----------
+    def _recorder(self, field: str):
+        def _rec(added, removed) -> None:
+            self._record((field, frozenset(added), frozenset(removed)))
+        return _rec
+
+    def _record(self, op: Op) -> None:
+        self._pending.append(op)
+        if self._depth == 0:
+            self._flush()
+
+    def _flush(self) -> None:
+        ops, self._pending = self._pending, []
+        label, self._label = self._label, ""
+        if not ops:
+            return
+        if not self._replaying:
+            self._undo.append((label, ops))
+            del self._undo[:-200]
+            self._redo.clear()
+        self._emit(ops, label)
+
+    @contextmanager
+    def batch(self, label: str = "") -> Iterator["Plan"]:
+        """Group several mutations into one undo step and one change event."""
+        if self._depth == 0:
+            self._label = label
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._flush()
+
+    def _replay(self, ops: List[Op], inverse: bool, mode: str, label: str) -> None:
+        self._replaying = mode
+        try:
+            with self.batch(label):
+                for field, a, b in (reversed(ops) if inverse else ops):
+                    if field in SCALAR_FIELDS:
+                        setattr(self, field, a if inverse else b)
+                        continue
+                    s: ObservableSet = getattr(self, field)
+                    added, removed = (b, a) if inverse else (a, b)
+                    s.difference_update(removed)
+                    s.update(added)
+        finally:
+            self._replaying = ""
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> str:
+        if not self._undo:
+            return ""
+        label, ops = self._undo.pop()
+        self._replay(ops, inverse=True, mode="undo", label=label)
+        self._redo.append((label, ops))
+        return label or "change"
+
+    def redo(self) -> str:
+        if not self._redo:
+            return ""
+        label, ops = self._redo.pop()
+        self._replay(ops, inverse=False, mode="redo", label=label)
+        self._undo.append((label, ops))
+        return label or "change"
+
+    # ---------- scalars ----------
+    @property
+    def preset(self) -> Optional[str]:
+        return self._preset
+
+    @preset.setter
+    def preset(self, value: Optional[str]) -> None:
+        if value != self._preset:
+            old, self._preset = self._preset, value
+            self._record(("preset", old, value))
+
+    @property
+    def generate_configs(self) -> bool:
+        return self._generate_configs
+
+    @generate_configs.setter
+    def generate_configs(self, value: bool) -> None:
+        value = bool(value)
+        if value != self._generate_configs:
+            old, self._generate_configs = self._generate_configs, value
+            self._record(("generate_configs", old, value))
+
+    # ---------- bulk ----------
+    def clear(self) -> None:
+        with self.batch("clear"):
+            for f in SET_FIELDS:
+                getattr(self, f).clear()
+            self.preset = None
+            self.generate_configs = False
+
+    def snapshot(self) -> PlanSnapshot:
+        """Immutable view for workers (apply runs on it while the user keeps editing)."""
+        if self._snap is None or self._snap_version != self.version:
+            self._snap = PlanSnapshot(
+                repo=self.repo.frozen(),
+                aur=self.aur.frozen(),
+                remove=self.remove.frozen(),
+                svc_enable=self.svc_enable.frozen(),
+                svc_disable=self.svc_disable.frozen(),
+                preset=self._preset,
+                generate_configs=self._generate_configs,
+            )
+            self._snap_version = self.version
+        return self._snap
+
+    def to_profile(self) -> Dict[str, Any]:
+        return {
+            "plan_repo": sorted(self.repo),
+            "plan_aur": sorted(self.aur),
+            "remove_explicit": sorted(self.remove),
+            "svc_enable": sorted(self.svc_enable),
+            "svc_disable": sorted(self.svc_disable),
+            "preset": self._preset,
+            "gen_configs": self._generate_configs,
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def load_profile(self, obj: Dict[str, Any]) -> None:
+        with self.batch("profile load"):
+            self.repo.replace(obj.get("plan_repo", []) or [])
+            self.aur.replace(obj.get("plan_aur", []) or [])
+            self.remove.replace(obj.get("remove_explicit", []) or [])
+            self.svc_enable.replace(obj.get("svc_enable", []) or [])
+            self.svc_disable.replace(obj.get("svc_disable", []) or [])
+            self.preset = obj.get("preset") or None
+            self.generate_configs = bool(obj.get("gen_configs", False))
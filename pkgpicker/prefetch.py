@@ -0,0 +1,209 @@
+from __future__ import annotations
+import hashlib
+import os
+import platform
+import re
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .alpm import PACMAN_CONF, dep_name, provides_index
+from .models import PkgMeta
+from .pkgcache import PKG_CACHE_DIR
+
+# Background `pacman -Sw`: packages in the plan are downloaded into a user-owned
+# directory while the plan is still being edited; apply passes it to pacman as an
+# extra --cachedir, so no root is needed until the actual transaction.
+
+def repo_servers(conf: str = PACMAN_CONF, arch: Optional[str] = None) -> Dict[str, List[str]]:
+    """repo -> mirror base URLs ($repo/$arch expanded) from pacman.conf and its Include files."""
+    arch = arch or platform.machine()
+    out: Dict[str, List[str]] = {}
+    repo = ""
+    def lines(path: str) -> List[str]:
+        try:
+            return open(path, "r", encoding="utf-8", errors="replace").read().splitlines()
+        except OSError:
+            return []
+    for ln in lines(conf):
+        ln = ln.split("#", 1)[0].strip()
+        m = re.match(r"^\[([^\]]+)\]$", ln)
+        if m:
+            repo = "" if m.group(1) == "options" else m.group(1)
+            continue
+        if not repo or "=" not in ln:
+            continue
+        k, v = (x.strip() for x in ln.split("=", 1))
+        if k == "Server":
+            srv = [v]
+        elif k == "Include":
+            srv = [x.split("=", 1)[1].strip() for x in (y.split("#", 1)[0].strip() for y in lines(v))
+                   if x.startswith("Server") and "=" in x]
+        else:
+            continue
+        out.setdefault(repo, []).extend(s.replace("$repo", repo).replace("$arch", arch) for s in srv)
+    return out
+
+def download_set(names: Iterable[str], local: Dict[str, PkgMeta], sync: Dict[str, PkgMeta]) -> List[PkgMeta]:
+    """Sync entries pacman -S would download for `names`: the packages plus unsatisfied deps."""
+    loc_prov = provides_index(local.values())
+    sync_prov = provides_index(sync.values())
+    out: Dict[str, PkgMeta] = {}
+    todo = list(names)
+    while todo:
+        n = todo.pop()
+        cand = sync.get(n) or next((sync[p] for p in sync_prov.get(n, ())), None)
+        if cand is None or cand.name in out:
+            continue
+        lm = local.get(cand.name)
+        if lm is not None and lm.version == cand.version:
+            continue
+        out[cand.name] = cand
+        for d in cand.depends:
+            dn = dep_name(d)
+            if dn not in loc_prov and dn not in out:
+                todo.append(dn)
+    return sorted(out.values(), key=lambda m: m.name)
+
+@dataclass
+class Job:
+    meta: PkgMeta
+    urls: List[str]
+    state: str = "queued"  # queued | downloading | done | failed | cancelled
+    error: str = ""
+    cancel: threading.Event = field(default_factory=threading.Event)
+
+class Prefetcher:
+    """
+    update() is cheap and idempotent: new files are queued on a bounded pool,
+    files that left the wanted set are cancelled (partial downloads removed).
+    """
+
+    CHUNK = 256 * 1024
+
+    def __init__(self, dest: str, servers: Optional[Dict[str, List[str]]] = None, workers: int = 3,
+                 cache_dirs: Iterable[str] = (PKG_CACHE_DIR,), on_change: Optional[Callable[[], None]] = None):
+        self.dest = dest
+        self.servers = repo_servers() if servers is None else servers
+        self.cache_dirs = tuple(cache_dirs)
+        self.on_change = on_change
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+
+    def _have(self, fname: str) -> bool:
+        return any(os.path.exists(os.path.join(d, fname)) for d in self.cache_dirs + (self.dest,))
+
+    def update(self, pkgs: Iterable[PkgMeta]) -> None:
+        """No-op after close(): a caller may still hold this instance while prefetch is toggled off."""
+        wanted = {m.filename: m for m in pkgs if m.filename}
+        with self._lock:
+            if not self._closed:
+                self._sync(wanted)
+
+    def _sync(self, wanted: Dict[str, PkgMeta]) -> None:
+        for fname, job in list(self.jobs.items()):
+            if fname not in wanted and job.state in ("queued", "downloading"):
+                job.cancel.set()
+                job.state = "cancelled"
+            if fname not in wanted:
+                del self.jobs[fname]
+        for fname, m in wanted.items():
+            old = self.jobs.get(fname)
+            if old is not None and old.state != "failed":
+                continue
+            if self._have(fname):
+                self.jobs[fname] = Job(m, [], state="done")
+                continue
+            job = Job(m, [f"{s.rstrip('/')}/{fname}" for s in self.servers.get(m.repo, ())])
+            self.jobs[fname] = job
+            self._pool.submit(self._fetch, job)
+
+    def _fetch(self, job: Job) -> None:
+        if job.cancel.is_set():
+            return
+        job.state = "downloading"
+        fname = job.meta.filename
+        os.makedirs(self.dest, exist_ok=True)
+        final = os.path.join(self.dest, fname)
+        part = f"{final}.{id(job):x}.part"  # a re-queued job never shares the file with a cancelled one
+        errors: List[str] = []
+        for url in job.urls:
+            h = hashlib.sha256()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as r, open(part, "wb") as f:
+                    while True:
+                        if job.cancel.is_set():
+                            break
+                        buf = r.read(self.CHUNK)
+                        if not buf:
+                            break
+                        h.update(buf)
+                        f.write(buf)
+            except OSError as e:
+                errors.append(f"{url}: {e}")
+                continue
+            if job.cancel.is_set():
+                break
+            if job.meta.sha256 and h.hexdigest() != job.meta.sha256:
+                errors.append(f"{url}: sha256 mismatch")
+                continue
+            os.replace(part, final)
+            job.state = "done"
+            self._changed()
+            return
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        if not job.cancel.is_set():
+            job.state = "failed"
+            job.error = "; ".join(errors) or "no mirror for repo"
+            self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change:
+            self.on_change()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = list(self.jobs.values())
+        out: Dict[str, int] = {}
+        for j in jobs:
+            out[j.state] = out.get(j.state, 0) + 1
+        out["bytes_left"] = sum(j.meta.csize for j in jobs if j.state in ("queued", "downloading"))
+        return out
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Until nothing is queued/downloading (tests, CLI)."""
+        ev = threading.Event()
+        deadline = None if timeout is None else timeout
+        while True:
+            with self._lock:
+                busy = any(j.state in ("queued", "downloading") for j in self.jobs.values())
+            if not busy:
+                return True
+            if deadline is not None:
+                if deadline <= 0:
+                    return False
+                deadline -= 0.05
+            ev.wait(0.05)
+
+    def clear(self) -> None:
+        """Cancel everything and drop the downloaded files (after a successful apply)."""
+        self.update(())
+        try:
+            for name in os.listdir(self.dest):
+                if ".pkg.tar" in name:
+                    os.remove(os.path.join(self.dest, name))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync({})
+            self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,222 @@
+from __future__ import annotations
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from .arch import run_capture
+
+# Long-lived root helper: started once with sudo, then runs queued commands sent
+# as JSON lines over its stdin and streams output/exit codes back over stdout.
+#
+#   → {"id": 1, "argv": ["pacman", "-S", "--needed", "--noconfirm", "foo"], "input": null}
+#   ← {"id": 1, "out": "resolving dependencies...\n"}      (0..n times)
+#   ← {"id": 1, "rc": 0}
+#
+# Requests run concurrently, each in its own thread; output lines carry the
+# request id. pacman serializes itself through its db lock, and the apply DAG
+# already chains pacman steps, so what overlaps is systemctl, config writes and
+# cache cleanup next to a transaction.
+#
+# There is no command allow-list: the helper runs whatever its parent sends, with
+# the root rights the user's sudo granted. Only the parent holds the pipes, so no
+# other process can talk to it, but anything that runs as the user could run sudo
+# itself just as well. elevate=False runs the same protocol as the current user
+# (stand-in for tests).
+
+def _send(out: BinaryIO, msg: dict, lock: Optional[threading.Lock] = None) -> None:
+    data = json.dumps(msg).encode() + b"\n"
+    if lock is None:
+        out.write(data)
+        out.flush()
+        return
+    with lock:
+        out.write(data)
+        out.flush()
+
+def _execute(rid: int, argv: List[str], data: Optional[str], send: Callable[[dict], None]) -> None:
+    try:
+        p = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE if data is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+    except OSError as e:
+        send({"id": rid, "out": f"{e}\n"})
+        send({"id": rid, "rc": 127})
+        return
+    if data is not None:
+        def feed(p=p, data=data):
+            try:
+                p.stdin.write(data.encode("utf-8", "surrogateescape"))
+                p.stdin.close()
+            except OSError:
+                pass
+        threading.Thread(target=feed, daemon=True).start()
+    for line in p.stdout:
+        send({"id": rid, "out": line.decode("utf-8", "replace")})
+    send({"id": rid, "rc": p.wait()})
+
+def serve(inp: BinaryIO, out: BinaryIO) -> None:
+    lock = threading.Lock()
+    send = lambda msg: _send(out, msg, lock)  # noqa: E731
+    workers: List[threading.Thread] = []
+    for raw in inp:
+        try:
+            req = json.loads(raw)
+            rid = req["id"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        if req.get("op") == "exit":
+            break
+        argv = [str(a) for a in req.get("argv") or []]
+        if not argv:
+            send({"id": rid, "rc": 126})
+            continue
+        t = threading.Thread(target=_execute, args=(rid, argv, req.get("input"), send))
+        t.start()
+        workers = [w for w in workers if w.is_alive()] + [t]
+    for w in workers:  # never leave a pacman transaction behind
+        w.join()
+
+class PrivHelper:
+    def __init__(self, elevate: bool = True, python: str = sys.executable):
+        self.elevate = elevate
+        self.python = python
+        self.proc: Optional[subprocess.Popen] = None
+        self.error = ""  # why the last start() failed, if sudo said so
+        self._cond = threading.Condition()  # guards proc, _pending and writes to the helper's stdin
+        self._pending: Dict[int, "queue.Queue[Optional[dict]]"] = {}
+        self._next = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self, interactive: bool = True) -> bool:
+        """interactive=False uses `sudo -n` (only works with cached credentials)."""
+        if self.alive:
+            return True
+        pkg_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cmd = [self.python, "-m", "pkgpicker.privhelper"]
+        if self.elevate:
+            cmd = ["sudo"] + ([] if interactive else ["-n"]) + ["--", "env", f"PYTHONPATH={pkg_root}"] + cmd
+        env = dict(os.environ, PYTHONPATH=pkg_root)
+        self.error = ""
+        try:
+            # interactive: stderr stays on the terminal, that's where sudo asks for the password.
+            # The `sudo -n` probe gets its own pipe so its complaint doesn't land on the TUI.
+            self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env,
+                                         stderr=None if interactive else subprocess.PIPE)
+        except OSError as e:
+            self.proc = None
+            self.error = str(e)
+            return False
+        proc = self.proc
+        threading.Thread(target=self._read, args=(proc,), daemon=True).start()
+        rc, _ = self.run(["true"])
+        if rc != 0:
+            self.close()
+            if proc.stderr is not None:
+                self.error = proc.stderr.read().decode("utf-8", "replace").strip()
+            return False
+        if proc.stderr is not None:  # keep draining, nothing may block on a full pipe
+            threading.Thread(target=proc.stderr.read, daemon=True).start()
+        return True
+
+    def _read(self, proc: subprocess.Popen) -> None:
+        # one reader for all requests: route each line to the caller waiting on its id
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            with self._cond:
+                q = self._pending.get(msg.get("id"))
+            if q is not None:
+                q.put(msg)
+        with self._cond:
+            if self.proc is proc:
+                self.proc = None
+            for q in self._pending.values():
+                q.put(None)
+
+    def run(self, argv: List[str], input: Optional[str] = None,
+            on_output: Optional[Callable[[str], None]] = None) -> Tuple[int, str]:
+        """Blocks until argv finished; other threads' requests run alongside."""
+        q: "queue.Queue[Optional[dict]]" = queue.Queue()
+        with self._cond:
+            if not self.alive:
+                return 125, "privileged helper not running"
+            self._next += 1
+            rid = self._next
+            assert self.proc is not None and self.proc.stdin
+            try:
+                _send(self.proc.stdin, {"id": rid, "argv": argv, "input": input})
+            except OSError as e:
+                return 125, f"privileged helper: {e}"
+            self._pending[rid] = q
+        chunks: List[str] = []
+        try:
+            while True:
+                msg = q.get()
+                if msg is None:
+                    return 125, "".join(chunks) + "privileged helper exited\n"
+                if "out" in msg:
+                    chunks.append(msg["out"])
+                    if on_output:
+                        on_output(msg["out"])
+                if "rc" in msg:
+                    return int(msg["rc"]), "".join(chunks)
+        finally:
+            with self._cond:
+                self._pending.pop(rid, None)
+                self._cond.notify_all()
+
+    def close(self) -> None:
+        """Waits for running requests (a pacman transaction must not be cut off), then stops the helper."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._pending)
+            p, self.proc = self.proc, None
+        if p is None:
+            return
+        try:
+            if p.poll() is None and p.stdin:
+                _send(p.stdin, {"id": 0, "op": "exit"})
+                p.stdin.close()
+            p.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            p.kill()
+
+_helper: Optional[PrivHelper] = None
+
+def get_helper() -> PrivHelper:
+    global _helper
+    if _helper is None:
+        _helper = PrivHelper(elevate=os.geteuid() != 0)
+    return _helper
+
+def sudo_run(argv: List[str], input: Optional[str] = None) -> Tuple[int, str]:
+    """Run argv as root: through the helper when it is up, else a one-off sudo."""
+    h = _helper
+    if h is not None and h.alive:
+        return h.run(argv, input=input)
+    cmd = argv if os.geteuid() == 0 else ["sudo", "--"] + argv
+    try:
+        p = subprocess.run(cmd, input=input, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except FileNotFoundError:
+        return 127, f"Command not found: {cmd[0]}"
+    return p.returncode, p.stdout
+
+def runner(cmd: List[str]) -> Tuple[int, str]:
+    """apply.Runner: `sudo ...` commands go to the helper, the rest (yay) run as the user."""
+    if cmd and cmd[0] == "sudo":
+        return sudo_run(cmd[1:])
+    return run_capture(cmd)
+
+if __name__ == "__main__":
+    serve(sys.stdin.buffer, sys.stdout.buffer)
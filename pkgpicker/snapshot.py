@@ -0,0 +1,129 @@
+from __future__ import annotations
+import json
+import os
+import threading
+from dataclasses import fields
+from typing import Any, Dict, List, Tuple
+
+from . import alpm
+from .arch import pacman_foreign_packages, pacman_installed_all, pacman_installed_explicit, pacman_repo_packages
+from .cache import load_json_safe
+from .models import PkgMeta
+from .paths import SNAPSHOT_FILE
+from .units import ETC_DIR, PRESET_DIRS, RUN_DIR, VENDOR_DIRS
+
+# Warm start: derived state from the last session, each part stored together with
+# the validation token it was computed for (DB / unit-dir mtimes). The UI renders
+# a part right away, even a stale one, and recomputes in the background only the
+# parts whose token moved.
+VERSION = 2
+
+_FIELDS = tuple(f.name for f in fields(PkgMeta))
+_TUPLE_FIELDS = tuple(i for i, f in enumerate(fields(PkgMeta)) if str(f.type).startswith("Tuple"))
+
+def _norm(token: Any) -> Any:
+    # tokens are compared against their JSON round trip (tuples come back as lists)
+    return json.loads(json.dumps(token))
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+class Snapshot:
+    def __init__(self, path: str = SNAPSHOT_FILE):
+        self.path = path
+        self.parts: Dict[str, Tuple[Any, Any]] = {}  # key -> (token, value)
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = SNAPSHOT_FILE) -> "Snapshot":
+        snap = cls(path)
+        obj = load_json_safe(path, None)
+        if isinstance(obj, dict) and obj.get("version") == VERSION and isinstance(obj.get("parts"), dict):
+            for key, part in obj["parts"].items():
+                if isinstance(part, list) and len(part) == 2:
+                    snap.parts[key] = (part[0], part[1])
+        return snap
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            if self.parts.pop(key, None) is not None:
+                self.dirty = True
+
+    def get(self, key: str, token: Any = None) -> Tuple[Any, bool]:
+        """(value or None, fresh). fresh means the stored token equals `token`."""
+        with self._lock:
+            hit = self.parts.get(key)
+        if hit is None:
+            return None, False
+        return hit[1], token is not None and hit[0] == _norm(token)
+
+    def put(self, key: str, token: Any, value: Any) -> None:
+        with self._lock:
+            self.parts[key] = (_norm(token), value)
+            self.dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {"version": VERSION, "parts": {k: [t, v] for k, (t, v) in self.parts.items()}}
+            self.dirty = False
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+# -------- installed sets --------
+def installed_token() -> Any:
+    return [alpm.local_generation(), alpm.sync_generation()]  # foreign/repo split depends on the sync DBs
+
+def installed_state() -> Dict[str, List[str]]:
+    return {
+        "all": sorted(pacman_installed_all()),
+        "explicit": pacman_installed_explicit(),
+        "repo": sorted(pacman_repo_packages()),
+        "foreign": sorted(pacman_foreign_packages()),
+    }
+
+# -------- local package metadata --------
+def restore_local(snap: Snapshot) -> bool:
+    """Seed alpm's local-DB cache when the DB is unchanged since the snapshot (one stat)."""
+    token = alpm.local_generation()
+    rows, fresh = snap.get("local", token)
+    if not fresh or not isinstance(rows, list):
+        return False
+    out: Dict[str, PkgMeta] = {}
+    try:
+        for r in rows:
+            for i in _TUPLE_FIELDS:
+                r[i] = tuple(r[i])
+            m = PkgMeta(*r)
+            out[m.name] = m
+    except (TypeError, ValueError, IndexError, KeyError):
+        # truncated, hand-edited or from another schema: read the DB cold, remember_local() rewrites it
+        snap.discard("local")
+        return False
+    alpm.seed("local", token, out)
+    return True
+
+def remember_local(snap: Snapshot) -> None:
+    hit = alpm.peek("local")
+    if hit is None or snap.get("local", hit[0])[1]:
+        return
+    pkgs: Dict[str, PkgMeta] = hit[1]  # type: ignore[assignment]
+    snap.put("local", hit[0], [[getattr(m, f) for f in _FIELDS] for m in pkgs.values()])
+
+# -------- systemd units --------
+def units_token() -> List[Any]:
+    """Unit/preset dir mtimes plus the *.wants dirs below /etc (enable/disable only touch those)."""
+    dirs = [ETC_DIR, RUN_DIR, *VENDOR_DIRS, *PRESET_DIRS]
+    try:
+        dirs += sorted(e.path for e in os.scandir(ETC_DIR) if e.is_dir(follow_symlinks=False))
+    except OSError:
+        pass
+    return [[d, _mtime(d)] for d in dirs]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+from collections.abc import MutableSet
+from typing import Any, Callable, Iterable, List, Set, Tuple
+
+from .conflicts import ConflictEngine
+from .models import ConflictRule, PkgMeta
+from .pkgids import NAMES, Bitset, NameTable
+
+Listener = Callable[[Set[str], Set[str]], None]
+
+class ObservableSet(Bitset, MutableSet):
+    """
+    Mutable name set (bitset over the shared NameTable) that reports every
+    effective change as (added, removed) to its listeners. In-place operators
+    (|=, -=, &=, ^=) are routed through the same path; frozen() is an O(1) copy.
+    """
+
+    def __init__(self, items: Iterable[str] = (), table: NameTable = NAMES):
+        self.table = table
+        self.bits = table.bits(items)
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, fn: Listener, first: bool = False) -> None:
+        # first=True for derived state that other listeners read back
+        if first:
+            self._listeners.insert(0, fn)
+        else:
+            self._listeners.append(fn)
+
+    def unsubscribe(self, fn: Listener) -> None:
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
+
+    def _emit(self, added: Set[str], removed: Set[str]) -> None:
+        if not (added or removed):
+            return
+        for fn in list(self._listeners):
+            fn(added, removed)
+
+    def _set_bits(self, new: int) -> None:
+        old, self.bits = self.bits, new
+        it = self.table.iter_bits
+        self._emit(set(it(new & ~old)), set(it(old & ~new)))
+
+    def _apply(self, add: Iterable[str] = (), rm: Iterable[str] = ()) -> None:
+        self._set_bits((self.bits | self._other_bits(add)) & ~self._known_bits(rm)[0])
+
+    def replace(self, items: Iterable[str]) -> None:
+        self._set_bits(self._other_bits(items))
+
+    def add(self, x: str) -> None:
+        self._set_bits(self.bits | (1 << self.table.id(x)))
+
+    def discard(self, x: str) -> None:
+        i = self.table.get(x)
+        if i is not None:
+            self._set_bits(self.bits & ~(1 << i))
+
+    def remove(self, x: str) -> None:
+        if x not in self:
+            raise KeyError(x)
+        self.discard(x)
+
+    def pop(self) -> str:
+        x = next(iter(self))
+        self.discard(x)
+        return x
+
+    def clear(self) -> None:
+        self._set_bits(0)
+
+    def update(self, *others: Iterable[str]) -> None:
+        b = self.bits
+        for o in others:
+            b |= self._other_bits(o)
+        self._set_bits(b)
+
+    def difference_update(self, *others: Iterable[str]) -> None:
+        b = self.bits
+        for o in others:
+            b &= ~self._known_bits(o)[0]
+        self._set_bits(b)
+
+    def intersection_update(self, *others: Iterable[str]) -> None:
+        b = self.bits
+        for o in others:
+            b &= self._known_bits(o)[0]
+        self._set_bits(b)
+
+    def symmetric_difference_update(self, other: Iterable[str]) -> None:
+        self._set_bits(self.bits ^ self._other_bits(other))
+
+    def __ior__(self, other):  # type: ignore[override]
+        self.update(other)
+        return self
+
+    def __isub__(self, other):  # type: ignore[override]
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):  # type: ignore[override]
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):  # type: ignore[override]
+        self.symmetric_difference_update(other)
+        return self
+
+class observed_set:
+    """
+    Descriptor for ObservableSet attributes: `obj.x = {...}` replaces the
+    contents in place, so subscribers stay attached across reassignments.
+    """
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.attr = "_obs_" + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj.__dict__[self.attr]
+
+    def __set__(self, obj, value: Iterable[str]) -> None:
+        cur = obj.__dict__.get(self.attr)
+        if cur is None:
+            obj.__dict__[self.attr] = ObservableSet(value)
+        elif cur is not value:
+            cur.replace(value)
+
+class StatusModel:
+    """
+    Derived state behind the status bar and the plan info box.
+
+    Every input set pushes its changes here; membership of the changed names is
+    re-derived with O(1) lookups and forwarded to the two conflict engines, so
+    no full union of installed ∪ plan ∪ selection is ever built.
+    """
+
+    def __init__(self, app: Any, plan: Any, rules: List[ConflictRule]):
+        self.app = app
+        self.plan = plan
+        self.status_conflicts = ConflictEngine(rules)  # incl. selection
+        self.plan_conflicts = ConflictEngine(rules)  # what apply will do
+        self.version = 0
+        for s in (app.installed_all, app.selected_repo, app.selected_aur, plan.remove, plan.repo, plan.aur):
+            s.subscribe(self._on_members, first=True)
+        for s in (plan.svc_enable, plan.svc_disable):
+            s.subscribe(self._on_counts, first=True)
+
+    def _on_counts(self, added: Set[str], removed: Set[str]) -> None:
+        self.version += 1
+
+    def _on_members(self, added: Set[str], removed: Set[str]) -> None:
+        self.version += 1
+        self._resync(added | removed)
+
+    def _resync(self, names: Iterable[str]) -> None:
+        a, p = self.app, self.plan
+        plan_in, plan_out, st_in, st_out = [], [], [], []
+        for n in names:
+            in_plan = (n in a.installed_all and n not in p.remove) or n in p.repo or n in p.aur
+            in_status = in_plan or n in a.selected_repo or n in a.selected_aur
+            (plan_in if in_plan else plan_out).append(n)
+            (st_in if in_status else st_out).append(n)
+        self.plan_conflicts.update(added=plan_in, removed=plan_out)
+        self.status_conflicts.update(added=st_in, removed=st_out)
+
+    def load_relations(self, rel: List[PkgMeta]) -> None:
+        self.status_conflicts.load_relations(rel)
+        self.plan_conflicts.load_relations(rel)
+        self.version += 1
+
+    def set_rules(self, rules: List[ConflictRule]) -> None:
+        self.status_conflicts.set_rules(rules)
+        self.plan_conflicts.set_rules(rules)
+        self.version += 1
+
+    def counts(self) -> Tuple[int, ...]:
+        a, p = self.app, self.plan
+        return (
+            len(a.selected_repo), len(a.selected_aur),
+            len(p.repo), len(p.aur), len(p.remove),
+            len(p.svc_enable), len(p.svc_disable),
+            self.status_conflicts.count(),
+        )
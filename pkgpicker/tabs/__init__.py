@@ -1,2 +1,52 @@
-__all__ = []
+from __future__ import annotations
+from dataclasses import dataclass
+from importlib import import_module
+from types import ModuleType
+from typing import Dict, Tuple
 
+# Tab registry: which pane, module, buttons and tables belong together.
+# Modules are imported on first use (tab shown / event routed), and events are
+# dispatched through the BUTTONS/TABLES dicts instead of asking every tab in turn.
+
+@dataclass(frozen=True)
+class TabSpec:
+    id: str
+    title: str
+    module: str
+    buttons: Tuple[str, ...] = ()
+    tables: Tuple[str, ...] = ()
+
+TABS: Tuple[TabSpec, ...] = (
+    TabSpec("tab_packages", "Packages", "packages_tab",
+            ("btn_add_plan", "btn_clear_sel", "btn_target_to_plan"), ("cat_tbl", "pkg_tbl")),
+    TabSpec("tab_search", "Search", "search_tab",
+            ("btn_search_repo", "btn_search_aur", "btn_search_both"), ("search_tbl",)),
+    TabSpec("tab_plan", "Plan", "plan_tab",
+            ("btn_plan_addsel", "btn_plan_clear", "btn_plan_apply", "btn_profile_save", "btn_profile_load",
+             "btn_plan_prefetch", "btn_plan_bulk"),
+            ("plan_add_tbl", "plan_rm_tbl", "plan_svc_tbl")),
+    TabSpec("tab_installed", "Installed", "installed_tab",
+            ("btn_inst_refresh", "btn_inst_mark_rm", "btn_inst_clear_rm", "btn_inst_export"), ("inst_tbl",)),
+    TabSpec("tab_upgrades", "Upgrades", "upgrades_tab", ("btn_upg_refresh",), ("upg_tbl",)),
+    TabSpec("tab_coverage", "Coverage", "coverage_tab", ("btn_cov_req", "btn_cov_all", "btn_cov_use"), ("cov_tbl",)),
+    TabSpec("tab_ready", "ReadyCheck", "ready_tab", ("btn_ready_scan", "btn_ready_add")),
+    TabSpec("tab_services", "Services", "services_tab",
+            ("btn_svc_refresh", "btn_svc_en", "btn_svc_dis", "btn_svc_clear"), ("svc_tbl",)),
+    TabSpec("tab_presets", "Presets", "presets_tab",
+            ("btn_preset_hypr", "btn_preset_plasma", "btn_preset_toggle_cfg")),
+    TabSpec("tab_hygiene", "Hygiene", "hygiene_tab",
+            ("btn_hyg_orphans", "btn_hyg_optdeps", "btn_hyg_add_rm", "btn_hyg_cache", "btn_hyg_keep",
+             "btn_hyg_ukeep", "btn_hyg_clean")),
+    TabSpec("tab_history", "History", "history_tab", ("btn_hist_refresh",), ("hist_tbl",)),
+    TabSpec("tab_selfcheck", "Self-Check", "selfcheck_tab", ("btn_chk_run", "btn_chk_repo")),
+    TabSpec("tab_help", "Help", "help_tab"),
+)
+
+BY_ID: Dict[str, TabSpec] = {t.id: t for t in TABS}
+BUTTONS: Dict[str, TabSpec] = {b: t for t in TABS for b in t.buttons}
+TABLES: Dict[str, TabSpec] = {w: t for t in TABS for w in t.tables}
+
+def load(tab_id: str) -> ModuleType:
+    return import_module(f".{BY_ID[tab_id].module}", __name__)
+
+__all__ = ["TabSpec", "TABS", "BY_ID", "BUTTONS", "TABLES", "load"]
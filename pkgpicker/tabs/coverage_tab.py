@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import time
+from typing import List, Optional
+
+from textual.containers import Container, Horizontal
+from textual.coordinate import Coordinate
+from textual.widgets import Button, DataTable, Static
+
+from ..coverage import Coverage, CoverageMatrix
+
+COLUMNS = ("", "Target", "Required", "Recommended", "Missing", "Conflicts")
+
+def build(app, pane):
+    app.mount_topcard(pane, "Coverage", "alle Targets: installiert ✔ / geplant + / fehlend ✘", "Enter → als Target wählen")
+    row = Horizontal(id="cov_row")
+    pane.mount(row)
+
+    tbl = DataTable(id="cov_tbl")
+    app.safe_cursor_row(tbl)
+    tbl.add_columns(*COLUMNS)
+
+    row.mount(Container(tbl, id="cov_left"))
+    row.mount(Static("", id="cov_info", classes="infobox"))
+
+    pane.mount(
+        Horizontal(
+            Button("Missing required → Plan", id="btn_cov_req", variant="success"),
+            Button("Missing all → Plan", id="btn_cov_all", variant="primary"),
+            Button("Use as target", id="btn_cov_use", variant="default"),
+            classes="toolbar",
+        )
+    )
+
+    app._coverage = CoverageMatrix(app.targets, app.conflicts)  # type: ignore[attr-defined]
+    app._coverage_rows = []  # type: ignore[attr-defined]
+    app.plan.subscribe("coverage_tab", lambda ch: refresh(app), fields=("repo", "aur", "remove"))
+    if getattr(app, "_coverage_listener", None) is None:
+        app._coverage_listener = lambda added, removed: refresh(app)  # type: ignore[attr-defined]
+        app.installed_all.subscribe(app._coverage_listener)
+    refresh(app)
+
+def on_catalog(app, diff) -> None:
+    if diff.targets or diff.conflicts:
+        app._coverage = CoverageMatrix(app.targets, app.conflicts)  # type: ignore[attr-defined]
+    refresh(app)  # also moves the ▶ marker when the current target's index changed
+
+def _cell(c) -> str:
+    i, p, m = c
+    return f"{i}✔ {p}+ {m}✘ / {i + p + m}"
+
+def _row(app, idx: int, cov: Coverage) -> tuple:
+    return (
+        "▶" if idx == app.target_idx else "",
+        cov.target.name or cov.target.id,
+        _cell(cov.required),
+        _cell(cov.recommended),
+        str(cov.required[2] + cov.recommended[2]),
+        ", ".join(cov.conflicts) or "-",
+    )
+
+def refresh(app):
+    try:
+        tbl = app.query_one("#cov_tbl", DataTable)
+    except Exception:
+        return
+    t0 = time.perf_counter()
+    rows = app._coverage.compute(
+        app.installed_all.bits, app.plan.remove.bits, app.plan.repo.bits | app.plan.aur.bits
+    )
+    dt = (time.perf_counter() - t0) * 1e6
+    new = [_row(app, i, c) for i, c in enumerate(rows)]
+    old = [tuple(str(x) for x in tbl.get_row_at(i)) for i in range(tbl.row_count)]
+    if len(old) == len(new):
+        for i, (a, b) in enumerate(zip(old, new)):
+            for col, (x, y) in enumerate(zip(a, b)):
+                if x != y:
+                    tbl.update_cell_at(Coordinate(i, col), y)
+    else:
+        tbl.clear()
+        for r in new:
+            tbl.add_row(*r)
+    app._coverage_rows = rows  # type: ignore[attr-defined]
+    app._coverage_us = dt  # type: ignore[attr-defined]
+    _info(app, _current(app))
+
+def _current(app) -> Optional[Coverage]:
+    rows: List[Coverage] = getattr(app, "_coverage_rows", [])
+    try:
+        tbl = app.query_one("#cov_tbl", DataTable)
+    except Exception:
+        return None
+    if not rows or not tbl.row_count:
+        return None
+    return rows[max(0, min(tbl.cursor_row, len(rows) - 1))]
+
+def _info(app, cov: Optional[Coverage]):
+    try:
+        box = app.query_one("#cov_info", Static)
+    except Exception:
+        return
+    if cov is None:
+        box.update("Keine Targets in packages.json.")
+        return
+    m = app._coverage
+    miss_req, miss_rec = m.names(cov.missing_required), m.names(cov.missing_recommended)
+    body = [
+        f"[b]{cov.target.name}[/b]  [dim]{cov.target.id} · preset {cov.target.preset}[/dim]",
+        f"Required: {_cell(cov.required)}",
+        f"Recommended: {_cell(cov.recommended)}",
+        "",
+        "[b]Fehlt (required)[/b]: " + (" ".join(miss_req) or "-"),
+        "[b]Fehlt (recommended)[/b]: " + (" ".join(miss_rec) or "-"),
+        "[b]Konflikte[/b]: " + (", ".join(cov.conflicts) or "-"),
+        "",
+        f"[dim]matrix recomputed in {getattr(app, '_coverage_us', 0):.0f} µs[/dim]",
+    ]
+    box.update("\n".join(body))
+
+def on_row_highlighted(app, event, table_id: str) -> bool:
+    if table_id != "cov_tbl":
+        return False
+    _info(app, _current(app))
+    return True
+
+def _use_target(app) -> None:
+    cov = _current(app)
+    if cov is None:
+        return
+    app.target_idx = app.query_one("#cov_tbl", DataTable).cursor_row
+    app.refresh_all()
+    app.refresh_tab("tab_packages")
+    refresh(app)
+    app.set_last(f"Target: {cov.target.name}")
+
+def _add_missing(app, recommended: bool) -> None:
+    cov = _current(app)
+    if cov is None:
+        return
+    names = app._coverage.names(cov.missing_required | (cov.missing_recommended if recommended else 0))
+    if not names:
+        app.set_last("Coverage: nothing missing")
+        return
+    with app.plan.batch(f"coverage {cov.target.id} → plan"):
+        app.plan.repo.update(names)
+    app.set_last(f"Coverage: {len(names)} → Plan")
+
+def action_info(app) -> bool:
+    _use_target(app)
+    return True
+
+async def on_button(app, bid: str) -> bool:
+    if bid == "btn_cov_req":
+        _add_missing(app, recommended=False)
+        return True
+    if bid == "btn_cov_all":
+        _add_missing(app, recommended=True)
+        return True
+    if bid == "btn_cov_use":
+        _use_target(app)
+        return True
+    return False
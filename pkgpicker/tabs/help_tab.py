@@ -7,11 +7,14 @@ def build(app, pane):
         "## Keys\n"
         "- `F1..F12` Tabs\n"
         "- `[` `]` Target\n"
+        "- `c` Coverage (alle Targets)\n"
         "- `/` Search focus\n"
         "- `Space` Toggle\n"
         "- `a` Selection → Plan\n"
-        "- `q` QuickAdd\n"
+        "- `q` QuickAdd (mehrere Namen → Zusammenfassung)\n"
+        "- `b` Bulk Import (Liste oder Datei, z.B. `pacman -Qqe`)\n"
         "- `i` Apply\n"
+        "- `ctrl+z` / `ctrl+y` Plan Undo/Redo\n"
         "- `x` Export\n"
     , classes="infobox"))
 
@@ -4,7 +4,7 @@ from textual.containers import Container, Horizontal
 from textual.widgets import Button, DataTable, Static
 
 def build(app, pane):
-    app.mount_topcard(pane, "History", "Logged actions (apply/paccache/etc.)", "Enter Info")
+    app.mount_topcard(pane, "History", "Logged actions (apply/cacheclean/etc.)", "Enter Info")
     row = Horizontal(id="hist_row")
     pane.mount(row)
 
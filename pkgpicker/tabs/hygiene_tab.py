@@ -4,58 +4,187 @@ import threading
 from textual.containers import Horizontal
 from textual.widgets import Button, Static
 
-from ..arch import pacman_orphans, paccache_clean, which
+from ..alpm import local_generation
+from ..arch import human_size
+from ..depgraph import find_orphans
 from ..history import log_history
+from ..pkgcache import analyze, clean
+
+KEEP_CHOICES = (1, 2, 3, 5)
+UKEEP_CHOICES = (3, 2, 1, 0)  # versions kept for packages no longer installed (paccache -ruk); 0 is opt-in
 
 def build(app, pane):
     app.mount_topcard(pane, "Hygiene", "Orphans + pacman cache cleanup", "Use with care.")
+    keep = getattr(app, "_cache_keep", 3)
+    ukeep = getattr(app, "_cache_ukeep", 3)
     pane.mount(
         Horizontal(
             Button("List orphans", id="btn_hyg_orphans", variant="primary"),
+            Button(f"Optdeps keep: {'on' if getattr(app, '_orph_optdeps', True) else 'off'}", id="btn_hyg_optdeps", variant="default"),
             Button("Add orphans → Remove plan", id="btn_hyg_add_rm", variant="warning"),
-            Button("paccache -r", id="btn_hyg_paccache", variant="success"),
             classes="toolbar",
         )
     )
     pane.mount(Static("", id="hyg_out", classes="infobox"))
+    pane.mount(
+        Horizontal(
+            Button("Analyze cache", id="btn_hyg_cache", variant="primary"),
+            Button(f"Keep: {keep}", id="btn_hyg_keep", variant="default"),
+            Button(f"Uninstalled keep: {ukeep}", id="btn_hyg_ukeep", variant="default"),
+            Button("Clean cache", id="btn_hyg_clean", variant="success"),
+            classes="toolbar",
+        )
+    )
+    pane.mount(Static("Cache: not analyzed yet.", id="hyg_cache", classes="infobox"))
     _render(app)
 
 def _render(app):
-    box = app.query_one("#hyg_out", Static)
-    orph = pacman_orphans()
+    # graph walk over the local DB (cached per pacman transaction), off the UI thread
+    keep_opt = bool(getattr(app, "_orph_optdeps", True))
+    key, token = f"orphans:{keep_opt}", local_generation()
+    cached, fresh = app.snapshot.get(key, token)
+    if cached is not None:
+        _show(app, [tuple(x) for x in cached], keep_opt)
+        if fresh:
+            return
+    def worker():
+        res = app.daemon_call("orphans", optional=keep_opt)
+        if res is not None:
+            orph = [(r["name"], r["isize"], r["in_cycle"]) for r in res]
+        else:
+            orph = find_orphans(with_optional=keep_opt)
+        app.snapshot.put(key, token, orph)
+        app.call_from_thread(_show, app, orph, keep_opt)
+    threading.Thread(target=worker, daemon=True).start()
+
+def _show(app, orph, keep_opt: bool):
+    try:
+        box = app.query_one("#hyg_out", Static)
+    except Exception:
+        return
+    total = sum(sz for _, sz, _ in orph)
+    cyc = [n for n, _, c in orph if c]
+    lines = [f"{n}  [dim]{human_size(sz)}{'  (cycle)' if c else ''}[/dim]" for n, sz, c in orph[:120]]
+    body = [
+        f"[b]Orphans[/b]: {len(orph)} · {human_size(total)}"
+        f" · in cycles: {len(cyc)} · optdeps keep: {'on' if keep_opt else 'off'}",
+        "\n".join(lines) + ("\n..." if len(orph) > 120 else ""),
+    ]
+    box.update("\n".join(body))
+    app._orph_cache = [n for n, _, _ in orph]  # type: ignore[attr-defined]
+
+# ---------- package cache ----------
+def _analyze(app):
+    keep = getattr(app, "_cache_keep", 3)
+    ukeep = getattr(app, "_cache_ukeep", 3)
+    installed = set(app.installed_all)
+    def worker():
+        rep = analyze(installed, keep=keep, keep_uninstalled=ukeep)
+        app.call_from_thread(_show_cache, app, rep)
+    threading.Thread(target=worker, daemon=True).start()
+
+def _show_cache(app, rep):
+    app._cache_report = rep  # type: ignore[attr-defined]
+    try:
+        box = app.query_one("#hyg_cache", Static)
+    except Exception:
+        return
+    inst = [p for p in rep.pkgs if p.installed and p.drop]
+    gone = [p for p in rep.pkgs if not p.installed]
+    gone_sz = sum(p.size for p in gone)
+    lines = [
+        f"{p.name}  [dim]{len(p.drop)}/{len(p.files)} old · {human_size(p.reclaim)}[/dim]"
+        for p in inst[:80]
+    ]
+    glines = [f"{p.name}  [dim]{len(p.files)} · {human_size(p.size)}[/dim]" for p in gone[:40]]
     body = [
-        f"[b]Orphans[/b]: {len(orph)}",
-        " ".join(orph[:120]) + (" ..." if len(orph) > 120 else ""),
+        f"[b]Cache[/b] {rep.cache_dir}: {rep.files} files · {human_size(rep.total)}"
+        f" · keep {rep.keep}/{rep.keep_uninstalled} → reclaim [b]{human_size(rep.reclaim)}[/b]",
+        "",
+        f"[b]Installed, older versions[/b]: {len(inst)}",
+        "\n".join(lines) + ("\n..." if len(inst) > 80 else ""),
         "",
-        f"paccache available: {'YES' if which('paccache') else 'no'}",
+        f"[b]Not installed[/b]: {len(gone)} · {human_size(gone_sz)}"
+        f" · {sum(len(p.drop) for p in gone)} to remove",
+        "\n".join(glines) + ("\n..." if len(gone) > 40 else ""),
     ]
+    if rep.partial or rep.partial_skipped:
+        body += ["", f"Partial downloads: {len(rep.partial)}"
+                     + (f" · {rep.partial_skipped} kept (recent or pacman running)" if rep.partial_skipped else "")]
     box.update("\n".join(body))
-    app._orph_cache = orph  # type: ignore[attr-defined]
 
-def _paccache_worker(app):
-    app.call_from_thread(app.set_busy, "Running paccache …")
-    rc, out = paccache_clean()
-    log_history(app.HISTORY_LOG, "paccache", ["sudo paccache -r"], rc)
+def _clean_worker(app, rep):
+    app.call_from_thread(app.set_busy, "Cleaning package cache …")
+    paths = rep.removal_paths()
+    rc, out = clean(rep)
+    log_history(app.HISTORY_LOG, "cacheclean", [f"rm {len(paths)} paths in {rep.cache_dir} (keep {rep.keep})"], rc)
     app.call_from_thread(app.set_busy, "")
-    app.call_from_thread(app.show_output, "paccache", f"rc={rc}\n\n{out[-12000:]}")
-    app.call_from_thread(app.set_last, f"paccache rc={rc}")
+    app.call_from_thread(app.show_output, "Cache cleanup", f"rc={rc}\n\n{out[-12000:]}")
+    app.call_from_thread(app.set_last, f"cache clean rc={rc}")
+    app.call_from_thread(_analyze, app)
 
 async def on_button(app, bid: str) -> bool:
     if bid == "btn_hyg_orphans":
         _render(app)
         app.set_last("Orphans refreshed")
         return True
+    if bid == "btn_hyg_optdeps":
+        app._orph_optdeps = not getattr(app, "_orph_optdeps", True)  # type: ignore[attr-defined]
+        try:
+            app.query_one("#btn_hyg_optdeps").label = f"Optdeps keep: {'on' if app._orph_optdeps else 'off'}"
+        except Exception:
+            pass
+        _render(app)
+        return True
     if bid == "btn_hyg_add_rm":
-        orph = getattr(app, "_orph_cache", []) or pacman_orphans()
-        for p in orph:
-            app.remove_explicit.add(p)
+        orph = getattr(app, "_orph_cache", []) or [n for n, _, _ in find_orphans(getattr(app, "_orph_optdeps", True))]
+        with app.plan.batch("orphans → remove"):
+            app.plan.remove.update(orph)
         app.set_last(f"Added {len(orph)} orphans to remove plan")
         return True
-    if bid == "btn_hyg_paccache":
-        ok = await app.ask_confirm("paccache -r", "Pacman cache cleanup ausführen?")
+    if bid == "btn_hyg_cache":
+        _analyze(app)
+        app.set_last("Analyzing package cache …")
+        return True
+    if bid == "btn_hyg_keep":
+        cur = getattr(app, "_cache_keep", 3)
+        nxt = KEEP_CHOICES[(KEEP_CHOICES.index(cur) + 1) % len(KEEP_CHOICES)] if cur in KEEP_CHOICES else 3
+        app._cache_keep = nxt  # type: ignore[attr-defined]
+        try:
+            app.query_one("#btn_hyg_keep").label = f"Keep: {nxt}"
+        except Exception:
+            pass
+        _analyze(app)
+        return True
+    if bid == "btn_hyg_ukeep":
+        cur = getattr(app, "_cache_ukeep", 3)
+        nxt = UKEEP_CHOICES[(UKEEP_CHOICES.index(cur) + 1) % len(UKEEP_CHOICES)] if cur in UKEEP_CHOICES else 3
+        app._cache_ukeep = nxt  # type: ignore[attr-defined]
+        try:
+            app.query_one("#btn_hyg_ukeep").label = f"Uninstalled keep: {nxt}"
+        except Exception:
+            pass
+        _analyze(app)
+        return True
+    if bid == "btn_hyg_clean":
+        rep = getattr(app, "_cache_report", None)
+        if rep is None or (rep.keep, rep.keep_uninstalled) != (getattr(app, "_cache_keep", 3), getattr(app, "_cache_ukeep", 3)):
+            _analyze(app)
+            app.set_last("Analyze first, then clean")
+            return True
+        if not rep.removal_paths():
+            app.set_last("Cache: nothing to remove")
+            return True
+        ok = await app.ask_confirm(
+            "Clean cache",
+            f"{sum(len(p.drop) for p in rep.pkgs)} Pakete löschen ({human_size(rep.reclaim)})?"
+            + ("\n\nUninstalled keep 0: kein Cache-Stand entfernter Pakete bleibt (Offline-Reinstall/Downgrade unmöglich)."
+               if rep.keep_uninstalled == 0 and any(not p.installed and p.drop for p in rep.pkgs) else ""),
+        )
         if not ok:
             return True
-        threading.Thread(target=_paccache_worker, args=(app,), daemon=True).start()
+        app.ensure_priv_helper()
+        threading.Thread(target=_clean_worker, args=(app, rep), daemon=True).start()
         return True
     return False
 
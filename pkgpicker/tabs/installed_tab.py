@@ -7,10 +7,13 @@ import time
 from typing import Dict, List, Tuple
 
 from textual.containers import Container, Horizontal
+from textual.coordinate import Coordinate
 from textual.widgets import Button, DataTable, Static
 
+from ..alpm import local_packages
 from ..cache import pkginfo_installed
-from ..arch import run_capture
+from ..arch import human_size, run_capture
+from ..depgraph import local_graph
 
 def build(app, pane):
     app.mount_topcard(pane, "Installed", "Explizit installierte Pakete (ohne Dependencies) + Infos + Remove + Export", "Space Toggle(Remove) · x Export CSV")
@@ -34,6 +37,9 @@ def build(app, pane):
         )
     )
 
+    app.plan.subscribe("installed_tab", lambda ch: _update_rm_column(app), fields=("remove",))
+    # warm the reverse-dependency index so cursor moves never wait for it
+    threading.Thread(target=local_graph, daemon=True).start()
     refresh(app)
 
 def _src_for_pkg(app, pkg: str) -> str:
@@ -45,13 +51,18 @@ def refresh(app):
     tbl.clear(columns=True)
     tbl.add_columns("RM", "Pkg", "Src", "Ver", "Desc")
 
-    # show up to 2500 explicit packages
-    for p in app.installed_explicit[:2500]:
+    # show up to 2500 explicit packages; metadata from the local DB (seeded from the snapshot)
+    local = local_packages()
+    for p in sorted(app.installed_explicit)[:2500]:
         src = _src_for_pkg(app, p)
-        info = pkginfo_installed(app.PKGINFO_CACHE_FILE, p)
-        ver = info.get("ver", "")
-        desc = (info.get("desc", "") or "")[:80]
-        rm = "✔" if p in app.remove_explicit else ""
+        m = local.get(p)
+        if m is not None:
+            ver, desc = m.version, m.desc[:80]
+        else:
+            info = pkginfo_installed(app.PKGINFO_CACHE_FILE, p)
+            ver = info.get("ver", "")
+            desc = (info.get("desc", "") or "")[:80]
+        rm = "✔" if p in app.plan.remove else ""
         tbl.add_row(rm, p, src, ver, desc, key=p)
 
     app.set_last("Installed loaded")
@@ -62,6 +73,15 @@ def refresh(app):
             pass
     
 
+def _update_rm_column(app):
+    try:
+        tbl = app.query_one("#inst_tbl", DataTable)
+    except Exception:
+        return
+    for i in range(tbl.row_count):
+        p = str(tbl.get_row_at(i)[1])
+        tbl.update_cell_at(Coordinate(i, 0), "✔" if p in app.plan.remove else "")
+
 def _selected_pkg(app) -> str:
     tbl = app.query_one("#inst_tbl", DataTable)
     if not tbl.row_count:
@@ -74,7 +94,11 @@ def on_row_highlighted(app, event, table_id: str) -> bool:
     p = _selected_pkg(app)
     if not p:
         return True
-    info = pkginfo_installed(app.PKGINFO_CACHE_FILE, p)
+    m = local_graph().pkgs.get(p)
+    if m is not None:
+        info = {"ver": m.version, "repo": _src_for_pkg(app, p), "desc": m.desc}
+    else:
+        info = pkginfo_installed(app.PKGINFO_CACHE_FILE, p)
     src = _src_for_pkg(app, p)
     body = (
         f"[b]{p}[/b]\n"
@@ -83,9 +107,37 @@ def on_row_highlighted(app, event, table_id: str) -> bool:
         f"Repo: {info.get('repo','')}\n\n"
         f"{info.get('desc','')}"
     )
-    app.query_one("#inst_info", Static).update(body)
+    app.query_one("#inst_info", Static).update(body + _why_block(p, getattr(app, "_orph_optdeps", True)))
     return True
 
+def _why_block(p: str, optional: bool = True) -> str:
+    # optional: optdepends keep packages alive, as in the Hygiene orphan list
+    g = local_graph()
+    if p not in g.pkgs:
+        return ""
+    lines = ["", "", "[b]Why installed[/b]"]
+    chains = g.why(p)
+    if g.pkgs[p].reason == 0:
+        lines.append("explicit")
+    if chains:
+        for ch in chains:
+            lines.append("  " + " → ".join(ch))
+    elif g.pkgs[p].reason != 0:
+        lines.append("  [dim](nothing explicit needs it → orphan)[/dim]")
+    rd = g.rdeps.get(p, ())
+    if rd:
+        lines.append(f"Required by ({len(rd)}): " + " ".join(rd[:20]) + (" …" if len(rd) > 20 else ""))
+    opt = g.roptdeps.get(p, ())
+    if opt:
+        lines.append(f"Optional for ({len(opt)}): " + " ".join(opt[:20]) + (" …" if len(opt) > 20 else ""))
+    sole = g.sole_holder_of(p, optional)
+    if sole:
+        size = sum(g.pkgs[n].isize for n in sole)
+        lines.append("")
+        lines.append(f"[b]Keeps alive alone[/b] ({len(sole)}, {human_size(size)}):")
+        lines.append("  " + " ".join(sole[:40]) + (" …" if len(sole) > 40 else ""))
+    return "\n".join(lines)
+
 def action_toggle(app) -> bool:
     try:
         if not app.query_one("#inst_tbl").has_focus:
@@ -96,11 +148,10 @@ def action_toggle(app) -> bool:
     if not p:
         return True
     # only explicit packages are listed → safe to mark for removal
-    if p in app.remove_explicit:
-        app.remove_explicit.remove(p)
+    if p in app.plan.remove:
+        app.plan.remove.remove(p)
     else:
-        app.remove_explicit.add(p)
-    refresh(app)
+        app.plan.remove.add(p)
     app.update_status()
     return True
 
@@ -110,7 +161,7 @@ def action_info(app) -> bool:
 def _export_worker(app, out_path: str) -> None:
     # export list of explicit packages with src + info
     rows: List[Tuple[str, str, str]] = []
-    for p in app.installed_explicit:
+    for p in sorted(app.installed_explicit):
         src = "aur" if p in app.installed_foreign else "repo"
         info = pkginfo_installed(app.PKGINFO_CACHE_FILE, p)
         desc = info.get("desc", "")
@@ -141,12 +192,11 @@ async def on_button(app, bid: str) -> bool:
         app.set_last("Installed refreshed")
         return True
     if bid == "btn_inst_mark_rm":
-        # already in remove_explicit via toggle; this is a shortcut (no-op)
+        # already in plan.remove via toggle; this is a shortcut (no-op)
         app.set_last("Use Space to mark removals; Apply in Plan tab")
         return True
     if bid == "btn_inst_clear_rm":
-        app.remove_explicit.clear()
-        refresh(app)
+        app.plan.remove.clear()
         app.set_last("Remove marks cleared")
         return True
     if bid == "btn_inst_export":
@@ -3,6 +3,8 @@ from textual.containers import Container, Horizontal
 from textual.widgets import Button, DataTable, Static
 from typing import Optional
 
+from ..details import pane_text, window
+
 def build(app, pane):
     ui = app.cfg.get("ui", {}) or {}
     t = app.current_target()
@@ -47,16 +49,16 @@ def refresh(app):
     cat_tbl.clear(columns=True)
     cat_tbl.add_columns("Kategorie")
 
-    if not app.categories:
+    if not app.catalog.categories:
         cat_tbl.add_row("(keine Kategorien in packages.json)")
         _populate_pkg_tbl(app)
         _info(app, None, None)
         return
 
-    for c in app.categories:
-        cat_tbl.add_row(c.name, key=c.name)
+    for name, n in zip(app.catalog.categories, app.catalog.counts):
+        cat_tbl.add_row(f"{name} [dim]{n}[/dim]", key=name)
 
-    app.cat_idx = max(0, min(app.cat_idx, len(app.categories) - 1))
+    app.cat_idx = max(0, min(app.cat_idx, len(app.catalog.categories) - 1))
     try:
         cat_tbl.move_cursor(row=app.cat_idx, column=0)
     except Exception:
@@ -65,10 +67,19 @@ def refresh(app):
     _populate_pkg_tbl(app)
     _info(app, None, None)
 
+def on_catalog(app, diff) -> None:
+    if diff.order:
+        refresh(app)
+    elif app.catalog.categories and app.catalog.categories[app.cat_idx] in diff.categories:
+        _populate_pkg_tbl(app)
+    elif diff.gone or diff.moved:
+        _populate_pkg_tbl(app)  # Sel column
+
 def _category_items(app):
-    if not app.categories:
+    # decoded on first highlight of the category (catalog.items memoizes)
+    if not app.catalog.categories:
         return []
-    return app.categories[app.cat_idx].items
+    return app.catalog.items(app.cat_idx)
 
 def _populate_pkg_tbl(app):
     pkg_tbl = app.query_one("#pkg_tbl", DataTable)
@@ -86,14 +97,29 @@ def _info(app, pkg: Optional[str], src: Optional[str]):
     if not pkg:
         box.update("[b]Info[/b]\n\nSpace Toggle · Enter Info · a → Plan")
         return
-    box.update(f"[b]{pkg}[/b]\n[dim]Quelle:[/dim] {src or ''}")
+    box.update(pane_text(app.details, pkg, src or "repo", f"[b]{pkg}[/b]\n[dim]Quelle:[/dim] {src or ''}"))
+
+def _prefetch(app, idx: int) -> None:
+    rows = [(it.name, it.source) for it in _category_items(app)]
+    app.details.prefetch(window(rows, idx), lambda names: app.call_from_thread(_details_ready, app, names))
+
+def _details_ready(app, names) -> None:
+    try:
+        tbl = app.query_one("#pkg_tbl", DataTable)
+    except Exception:
+        return
+    if tbl.row_count:
+        row = tbl.get_row_at(tbl.cursor_row)
+        if str(row[1]) in names:
+            _info(app, str(row[1]), str(row[2]))
 
 def on_row_highlighted(app, event, table_id: str) -> bool:
     if table_id == "cat_tbl":
-        if not app.categories:
+        if not app.catalog.categories:
             return True
-        app.cat_idx = max(0, min(event.cursor_row, len(app.categories) - 1))
+        app.cat_idx = max(0, min(event.cursor_row, len(app.catalog.categories) - 1))
         _populate_pkg_tbl(app)
+        _prefetch(app, 0)
         return True
 
     if table_id == "pkg_tbl":
@@ -101,6 +127,7 @@ def on_row_highlighted(app, event, table_id: str) -> bool:
         if tbl.row_count:
             row = tbl.get_row_at(tbl.cursor_row)
             _info(app, str(row[1]), str(row[2]))
+            _prefetch(app, tbl.cursor_row)
         return True
 
     return False
@@ -118,10 +145,8 @@ async def on_button(app, bid: str) -> bool:
         return True
     if bid == "btn_target_to_plan":
         t = app.current_target()
-        for p in t.required_packages:
-            app.plan_repo.add(p)
-        for p in t.recommended_packages:
-            app.plan_repo.add(p)
+        with app.plan.batch(f"target {t.id} → plan"):
+            app.plan.repo.update(t.required_packages, t.recommended_packages)
         app.set_last("Target → Plan")
         return True
     return False
@@ -4,83 +4,22 @@ import csv
 import os
 import subprocess
 import threading
-import time
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional
 
 from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import Button, DataTable, Static
 
-from ..arch import which, run_capture, pacman_repo_has, aur_has_yay
+from ..arch import human_size
 from ..history import log_history
-from ..modals import TextInputModal
+from ..bulkimport import parse_names, resolve_names
+from ..modals import ListInputModal, TextInputModal
 from ..cache import save_json, load_json_safe
-from ..models import ConflictRule
-
-# -------- configs generators --------
-def greetd_config(cmd: str) -> str:
-    return f"""# Generated by pkgpicker
-[terminal]
-vt = 1
-
-[default_session]
-command = "tuigreet --time --remember --cmd {cmd}"
-user = "greeter"
-"""
-
-def hypr_conf() -> str:
-    return r"""# Generated by pkgpicker (Hyprland starter)
-$mod = SUPER
-env = MOZ_ENABLE_WAYLAND,1
-env = QT_QPA_PLATFORM,wayland
-env = SDL_VIDEODRIVER,wayland
-
-exec-once = dbus-update-activation-environment --systemd WAYLAND_DISPLAY XDG_CURRENT_DESKTOP
-exec-once = systemctl --user import-environment WAYLAND_DISPLAY XDG_CURRENT_DESKTOP
-exec-once = waybar
-exec-once = mako
-exec-once = hyprpaper
-exec-once = wl-paste --type text --watch cliphist store
-exec-once = wl-paste --type image --watch cliphist store
-
-input {
-  kb_layout = de
-}
-
-bind = $mod, Return, exec, kitty
-bind = $mod, D, exec, wofi --show drun
-bind = $mod, V, exec, cliphist list | wofi --dmenu | cliphist decode | wl-copy
-bind = $mod, S, exec, grim -g "$(slurp)" - | wl-copy
-"""
-
-def waybar_jsonc() -> str:
-    return r"""{
-  "layer":"top","position":"top","height":30,
-  "modules-left":["hyprland/workspaces","hyprland/window"],
-  "modules-center":["clock"],
-  "modules-right":["pulseaudio","network","battery","tray"],
-  "clock":{"format":"{:%a %d.%m %H:%M}"},
-  "pulseaudio":{"format":" {volume}%","on-click":"pavucontrol"},
-  "network":{"format-wifi":" {essid}","format-ethernet":" {ipaddr}","format-disconnected":" offline"}
-}"""
-
-def mako_conf() -> str:
-    return "default-timeout=5000\n"
-
-def wofi_style() -> str:
-    return "/* Generated by pkgpicker */\nwindow { border-radius: 10px; }\n"
-
-# -------- conflict helpers --------
-def conflict_problems(selected: Set[str], rules: List[ConflictRule]) -> List[str]:
-    probs: List[str] = []
-    for r in rules:
-        present = [p for p in r.group if p in selected]
-        if r.mode == "exactly_one":
-            if len(present) != 1:
-                probs.append(f"{r.name}: erwartet genau 1, aktuell: {present if present else 'none'}")
-        else:
-            if len(present) > 1:
-                probs.append(f"{r.name}: zu viele ausgewählt: {present}")
-    return probs
+from ..alpm import local_packages, sync_packages
+from ..apply import load_journal, run_apply
+from ..prefetch import Prefetcher, download_set
+from ..privhelper import runner
+from ..paths import APPLY_JOURNAL, PREFETCH_DIR, profile_path
+from ..plan import PlanSnapshot
 
 # -------- UI --------
 def build(app, pane):
@@ -88,7 +27,7 @@ def build(app, pane):
         pane,
         "Plan",
         "Install/Remove/Services/Presets + Apply",
-        "i Apply · q QuickAdd · p SaveProfile · l LoadProfile",
+        "i Apply · q QuickAdd · b BulkImport · p SaveProfile · l LoadProfile",
     )
 
     row = Horizontal(id="plan_row")
@@ -127,10 +66,14 @@ def build(app, pane):
             Button("Apply (i)", id="btn_plan_apply", variant="primary"),
             Button("Save Profile (p)", id="btn_profile_save", variant="success"),
             Button("Load Profile (l)", id="btn_profile_load", variant="primary"),
+            Button(f"Prefetch: {'on' if getattr(app, '_prefetch', None) else 'off'}", id="btn_plan_prefetch", variant="default"),
+            Button("Bulk Import (b)", id="btn_plan_bulk", variant="default"),
             classes="toolbar",
         )
     )
 
+    app.plan.subscribe("plan_tab", lambda ch: refresh(app))
+    app.plan.subscribe("prefetch", lambda ch: _schedule_prefetch(app), fields=("repo",))
     refresh(app)
 
 def refresh(app):
@@ -142,9 +85,9 @@ def _populate_plan_tables(app):
     tbl.clear(columns=True)
     tbl.add_columns("Pkg", "Src", "Inst")
     allp = []
-    for p in sorted(app.plan_repo):
+    for p in sorted(app.plan.repo):
         allp.append((p, "repo"))
-    for p in sorted(app.plan_aur):
+    for p in sorted(app.plan.aur):
         allp.append((p, "aur"))
     for p, src in allp:
         inst = "✔" if p in app.installed_all else ""
@@ -153,30 +96,36 @@ def _populate_plan_tables(app):
     trm = app.query_one("#plan_rm_tbl", DataTable)
     trm.clear(columns=True)
     trm.add_columns("Pkg", "Inst?")
-    for p in sorted(app.remove_explicit):
+    for p in sorted(app.plan.remove):
         inst = "✔" if p in app.installed_all else ""
         trm.add_row(p, inst, key=p)
 
     tsvc = app.query_one("#plan_svc_tbl", DataTable)
     tsvc.clear(columns=True)
     tsvc.add_columns("Unit", "Action")
-    for u in sorted(app.plan_services_enable):
+    for u in sorted(app.plan.svc_enable):
         tsvc.add_row(u, "enable", key=f"en:{u}")
-    for u in sorted(app.plan_services_disable):
+    for u in sorted(app.plan.svc_disable):
         tsvc.add_row(u, "disable", key=f"dis:{u}")
 
 def _update_info(app):
     box = app.query_one("#plan_info", Static)
     t = app.current_target()
-    combined = set(app.installed_all) | app.plan_repo | app.plan_aur
-    probs = conflict_problems(combined, app.conflicts)
+    probs = app.plan_conflict_problems()
     lines = [
         f"[b]Target[/b]: {t.name}",
-        f"[b]Plan Install[/b]: repo={len(app.plan_repo)} aur={len(app.plan_aur)}",
-        f"[b]Plan Remove[/b]: {len(app.remove_explicit)}",
-        f"[b]Services[/b]: +{len(app.plan_services_enable)} -{len(app.plan_services_disable)}",
-        f"[b]Preset[/b]: {app.plan_preset or '-'} · configs: {'YES' if app.plan_generate_configs else 'no'}",
+        f"[b]Plan Install[/b]: repo={len(app.plan.repo)} aur={len(app.plan.aur)}",
+        f"[b]Plan Remove[/b]: {len(app.plan.remove)}",
+        f"[b]Services[/b]: +{len(app.plan.svc_enable)} -{len(app.plan.svc_disable)}",
+        f"[b]Preset[/b]: {app.plan.preset or '-'} · configs: {'YES' if app.plan.generate_configs else 'no'}",
     ]
+    pf = getattr(app, "_prefetch", None)
+    if pf is not None:
+        c = pf.counts()
+        lines.append(
+            f"[b]Prefetch[/b]: {c.get('done', 0)} ready · {c.get('queued', 0) + c.get('downloading', 0)} pending"
+            f" ({human_size(c.get('bytes_left', 0))}) · {c.get('failed', 0)} failed"
+        )
     if probs:
         lines.append("")
         lines.append("[b]Conflicts[/b]:")
@@ -189,24 +138,17 @@ def _update_info(app):
 
 # -------- selection → plan --------
 def add_selection_to_plan(app):
-    app.plan_repo |= set(app.selected_repo)
-    app.plan_aur |= set(app.selected_aur)
+    with app.plan.batch("selection → plan"):
+        app.plan.repo |= set(app.selected_repo)
+        app.plan.aur |= set(app.selected_aur)
     app.selected_repo.clear()
     app.selected_aur.clear()
-    try:
-        from . import packages_tab
-        packages_tab.refresh(app)
-    except Exception:
-        pass
-    refresh(app)
+    app.refresh_tab("tab_packages")
     app.set_last("Selection → Plan")
 
 # -------- profiles --------
 def _profile_path(app, name: str) -> str:
-    safe = "".join([c for c in name if c.isalnum() or c in ("-", "_")]).strip("_-")
-    if not safe:
-        safe = "profile"
-    return os.path.join(app.PROFILES_DIR, f"{safe}.json")
+    return profile_path(name, app.PROFILES_DIR)
 
 async def profile_save(app):
     name = await app.push_result(TextInputModal("Profile Save", "profile name…"))
@@ -215,17 +157,7 @@ async def profile_save(app):
         app.set_last("Profile save cancelled")
         return
     path = _profile_path(app, name)
-    obj = {
-        "plan_repo": sorted(app.plan_repo),
-        "plan_aur": sorted(app.plan_aur),
-        "remove_explicit": sorted(app.remove_explicit),
-        "svc_enable": sorted(app.plan_services_enable),
-        "svc_disable": sorted(app.plan_services_disable),
-        "preset": app.plan_preset,
-        "gen_configs": app.plan_generate_configs,
-        "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-    }
-    save_json(path, obj)
+    save_json(path, app.plan.to_profile())
     app.set_last(f"Profile saved: {os.path.basename(path)}")
     app.show_output("Profile saved", f"Saved to:\n{path}")
 
@@ -241,168 +173,156 @@ async def profile_load(app):
     if not isinstance(obj, dict):
         app.show_output("Profile load", f"Not found or invalid:\n{path}")
         return
-    app.plan_repo = set(obj.get("plan_repo", []) or [])
-    app.plan_aur = set(obj.get("plan_aur", []) or [])
-    app.remove_explicit = set(obj.get("remove_explicit", []) or [])
-    app.plan_services_enable = set(obj.get("svc_enable", []) or [])
-    app.plan_services_disable = set(obj.get("svc_disable", []) or [])
-    app.plan_preset = obj.get("preset") or None
-    app.plan_generate_configs = bool(obj.get("gen_configs", False))
-    refresh(app)
+    app.plan.load_profile(obj)
     app.set_last(f"Profile loaded: {os.path.basename(path)}")
 
-# -------- quick add --------
+# -------- quick add / bulk import --------
+# Sources come from the sync DB index plus one batched AUR lookup, in a worker.
 async def quick_add(app):
-    val = await app.push_result(TextInputModal("Quick Add", "package name (repo or aur)…"))
-    pkg = (val or "").strip()
-    if not pkg:
+    val = await app.push_result(TextInputModal("Quick Add", "package name(s) (repo, aur or group)…"))
+    names, bad = parse_names(val or "")
+    if not names and not bad:
         app.set_last("QuickAdd cancelled")
         return
-
-    # smart source detect
-    src = None
-    if pacman_repo_has(pkg):
-        src = "repo"
-    elif aur_has_yay(pkg):
-        src = "aur"
-    else:
-        # fallback: treat as repo first, then aur; user can fix later
-        src = "repo" if not which("yay") else "aur"
-
-    if src == "aur":
-        app.plan_aur.add(pkg)
-        app.plan_repo.discard(pkg)
-    else:
-        app.plan_repo.add(pkg)
-        app.plan_aur.discard(pkg)
-
-    refresh(app)
-    app.set_last(f"QuickAdd: {pkg} ({src})")
-
-# -------- apply plan --------
-def _run_cmd_live(cmd: List[str]) -> Tuple[int, str]:
-    rc, out = run_capture(cmd)
-    return rc, out
-
-def _apply_worker(app) -> None:
-    app.call_from_thread(app.set_busy, "Applying plan … (sudo may ask password)")
-    cmds_run: List[str] = []
-    out_chunks: List[str] = []
-    rc_final = 0
-
-    def run_and_collect(cmd: List[str]) -> int:
-        nonlocal rc_final
-        cmds_run.append(" ".join(cmd))
-        rc, out = _run_cmd_live(cmd)
-        out_chunks.append(f"$ {' '.join(cmd)}\n{out}\n")
-        if rc != 0 and rc_final == 0:
-            rc_final = rc
-        return rc
-
-    # 1) conflict check
-    combined = set(app.installed_all) | app.plan_repo | app.plan_aur
-    probs = conflict_problems(combined, app.conflicts)
-    if probs:
+    # one name goes straight in; several get the bulk summary first
+    _start_import(app, names, bad, "QuickAdd", confirm=len(names) > 1 or bool(bad))
+
+async def bulk_import(app):
+    val = await app.push_result(ListInputModal(
+        "Bulk Import", "Paketliste einfügen (pacman -Qqe / -Qe, Leerzeichen oder Komma) oder Pfad zu einer Datei"))
+    text = (val or "").strip()
+    if not text:
+        app.set_last("Bulk import cancelled")
+        return
+    path = os.path.expanduser(text)
+    if "\n" not in text and os.path.isfile(path):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError as e:
+            app.set_last(f"Bulk import: {e}")
+            return
+    names, bad = parse_names(text)
+    _start_import(app, names, bad, "Bulk import", confirm=True)
+
+def _start_import(app, names: List[str], bad: List[str], label: str, confirm: bool) -> None:
+    from ..validate import aur_lookup
+    installed = app.installed_all.frozen()
+    def worker():
+        app.call_from_thread(app.set_busy, f"{label}: resolving {len(names)} names …")
+        res = resolve_names(names, sync_packages(), installed, aur_lookup(app.daemon))
+        res.invalid = bad
         app.call_from_thread(app.set_busy, "")
-        app.call_from_thread(app.show_output, "Conflicts", "\n".join(probs))
-        app.call_from_thread(app.set_last, "Apply aborted: conflicts")
+        app.call_from_thread(_finish_import, app, res, label, confirm)
+    threading.Thread(target=worker, daemon=True).start()
+
+async def _finish_import(app, res, label: str, confirm: bool) -> None:
+    repo, aur = res.to_plan()
+    if not (repo or aur):
+        app.show_output(label, "Nichts zu übernehmen.\n\n" + res.summary())
+        app.set_last(f"{label}: nothing added")
+        return
+    if confirm and not await app.ask_confirm(f"{label}: {len(repo) + len(aur)} → Plan?", res.summary()):
+        app.set_last(f"{label} cancelled")
         return
+    with app.plan.batch(f"{label.lower()} ({len(repo) + len(aur)})"):
+        app.plan.repo.update(repo)
+        app.plan.aur.update(aur)
+        app.plan.repo -= aur
+        app.plan.aur -= repo
+    skipped = len(res.unknown) + len(res.ambiguous) + len(res.invalid)
+    app.set_last(f"{label}: {len(repo)} repo, {len(aur)} aur → Plan" + (f", {skipped} übersprungen" if skipped else ""))
+
+# -------- prefetch --------
+def _schedule_prefetch(app) -> None:
+    pf = getattr(app, "_prefetch", None)
+    if pf is None:
+        return
+    version, names = app.plan.version, set(app.plan.repo)
+    def worker():
+        ds = download_set(names, local_packages(), sync_packages())
+        # a newer edit schedules its own pass; prefetch may have been switched off meanwhile
+        if app.plan.version == version and getattr(app, "_prefetch", None) is pf:
+            pf.update(ds)
+            app.call_from_thread(_update_info, app)
+    threading.Thread(target=worker, daemon=True).start()
+
+def _toggle_prefetch(app) -> None:
+    pf = getattr(app, "_prefetch", None)
+    if pf is not None:
+        pf.close()
+        app._prefetch = None  # type: ignore[attr-defined]
+    else:
+        app._prefetch = Prefetcher(  # type: ignore[attr-defined]
+            PREFETCH_DIR,
+            on_change=lambda: app.call_from_thread(_update_info, app),
+        )
+        _schedule_prefetch(app)
+    try:
+        app.query_one("#btn_plan_prefetch").label = f"Prefetch: {'on' if app._prefetch else 'off'}"
+    except Exception:
+        pass
+    _update_info(app)
 
-    # 2) removals (explicit only)
-    if app.remove_explicit:
-        rm = sorted(app.remove_explicit)
-        run_and_collect(["sudo", "pacman", "-Rns", "--noconfirm"] + rm)
-
-    # 3) repo installs
-    if app.plan_repo:
-        pkgs = sorted(app.plan_repo)
-        run_and_collect(["sudo", "pacman", "-S", "--needed", "--noconfirm"] + pkgs)
-
-    # 4) AUR installs
-    if app.plan_aur:
-        if not which("yay"):
-            out_chunks.append("ERROR: yay not installed, cannot install AUR.\n")
-            rc_final = rc_final or 2
-        else:
-            pkgs = sorted(app.plan_aur)
-            run_and_collect(["yay", "-S", "--needed", "--noconfirm"] + pkgs)
-
-    # 5) services apply
-    for u in sorted(app.plan_services_enable):
-        run_and_collect(["sudo", "systemctl", "enable", "--now", u])
-    for u in sorted(app.plan_services_disable):
-        run_and_collect(["sudo", "systemctl", "disable", "--now", u])
-
-    # 6) presets/config generator
-    if app.plan_generate_configs and app.plan_preset:
-        ok, msg = _generate_configs(app)
-        out_chunks.append(msg + "\n")
-        if not ok:
-            rc_final = rc_final or 3
-
-    # history log
-    log_history(app.HISTORY_LOG, "apply", cmds_run, rc_final)
+# -------- apply plan --------
+def _journal_path(app) -> str:
+    return APPLY_JOURNAL
+
+def _apply_worker(app, plan: PlanSnapshot) -> None:
+    app.call_from_thread(app.set_busy, "Applying plan …")
+    # conflict check happens in apply_plan (UI thread, engine is not thread-safe)
+    pf = getattr(app, "_prefetch", None)
+    res = run_apply(plan, run=runner, journal=_journal_path(app), cache_dirs=(pf.dest,) if pf else (), progress=lambda msg: app.call_from_thread(app.set_busy, f"Applying: {msg}"))
+    log_history(app.HISTORY_LOG, "apply", res.commands, res.rc)
+    if pf is not None and res.rc == 0:
+        pf.clear()
 
     # refresh state
     app.call_from_thread(app.refresh_all)
     app.call_from_thread(app.set_busy, "")
-    app.call_from_thread(refresh, app)
+    app.call_from_thread(app.refresh_tab, "tab_plan")
 
-    # output
     app.call_from_thread(
         app.show_output,
         "Apply result",
-        f"rc={rc_final}\n\n" + ("\n".join(out_chunks)[-18000:]),
+        res.report() + "\n\n" + ("\n".join(res.output)[-18000:]),
     )
-    app.call_from_thread(app.set_last, f"Apply done (rc={rc_final})")
-
-def _generate_configs(app) -> Tuple[bool, str]:
-    from ..arch import sudo_write_file, backup_write_user
-    lines = ["Config generation:"]
-    ok = True
-
-    # greetd
-    if app.plan_preset == "hyprland-tuigreet":
-        rc = sudo_write_file("/etc/greetd/config.toml", greetd_config("Hyprland"))
-        lines.append(f"- /etc/greetd/config.toml (Hyprland): rc={rc}")
-        ok = ok and (rc == 0)
-        p1 = backup_write_user("~/.config/hypr/hyprland.conf", hypr_conf())
-        lines.append(f"- {p1}")
-        p2 = backup_write_user("~/.config/waybar/config", waybar_jsonc())
-        lines.append(f"- {p2}")
-        p3 = backup_write_user("~/.config/mako/config", mako_conf())
-        lines.append(f"- {p3}")
-        p4 = backup_write_user("~/.config/wofi/style.css", wofi_style())
-        lines.append(f"- {p4}")
-    elif app.plan_preset == "plasma-tuigreet":
-        rc = sudo_write_file("/etc/greetd/config.toml", greetd_config("startplasma-wayland"))
-        lines.append(f"- /etc/greetd/config.toml (Plasma Wayland): rc={rc}")
-        ok = ok and (rc == 0)
-    else:
-        lines.append("- unknown preset (skip)")
-
-    return ok, "\n".join(lines)
+    app.call_from_thread(app.set_last, f"Apply done (rc={res.rc}, {len(res.failed)} failed)")
 
 async def apply_plan(app):
     # confirmation summary
+    plan = app.plan.snapshot()
     lines = []
-    if app.plan_repo: lines.append(f"Install repo: {len(app.plan_repo)}")
-    if app.plan_aur: lines.append(f"Install AUR: {len(app.plan_aur)}")
-    if app.remove_explicit: lines.append(f"Remove: {len(app.remove_explicit)}")
-    if app.plan_services_enable or app.plan_services_disable:
-        lines.append(f"Services: +{len(app.plan_services_enable)} -{len(app.plan_services_disable)}")
-    if app.plan_generate_configs and app.plan_preset:
-        lines.append(f"Generate configs: {app.plan_preset}")
+    if plan.repo: lines.append(f"Install repo: {len(plan.repo)}")
+    if plan.aur: lines.append(f"Install AUR: {len(plan.aur)}")
+    if plan.remove: lines.append(f"Remove: {len(plan.remove)}")
+    if plan.svc_enable or plan.svc_disable:
+        lines.append(f"Services: +{len(plan.svc_enable)} -{len(plan.svc_disable)}")
+    if plan.generate_configs and plan.preset:
+        lines.append(f"Generate configs: {plan.preset}")
     if not lines:
         app.show_output("Apply", "Plan ist leer.")
         return
 
+    prev = load_journal(_journal_path(app), plan)
+    if prev:
+        lines.append("Resume: " + ", ".join(f"{len(v)} {k}" for k, v in sorted(prev.items())) + " already done")
+
+    probs = app.plan_conflict_problems()
+    if probs:
+        app.show_output("Conflicts", "\n".join(probs))
+        app.set_last("Apply aborted: conflicts")
+        return
+
     ok = await app.ask_confirm("Apply Plan", "Wirklich ausführen?\n\n" + "\n".join(lines))
     if not ok:
         app.set_last("Apply cancelled")
         return
 
-    threading.Thread(target=_apply_worker, args=(app,), daemon=True).start()
+    if not app.ensure_priv_helper():
+        app.set_last("sudo helper not started; falling back to per-step sudo")
+    # the worker runs on the snapshot; edits made meanwhile go into the next apply
+    threading.Thread(target=_apply_worker, args=(app, plan), daemon=True).start()
 
 # -------- Plan actions --------
 def action_toggle(app) -> bool:
@@ -413,10 +333,8 @@ def action_toggle(app) -> bool:
             if not tbl.row_count:
                 return True
             p = str(tbl.get_row_at(tbl.cursor_row)[0])
-            if p in app.remove_explicit: app.remove_explicit.remove(p)
-            else: app.remove_explicit.add(p)
-            _populate_plan_tables(app)
-            _update_info(app)
+            if p in app.plan.remove: app.plan.remove.remove(p)
+            else: app.plan.remove.add(p)
             return True
         if app.query_one("#plan_add_tbl").has_focus:
             tbl = app.query_one("#plan_add_tbl", DataTable)
@@ -425,13 +343,11 @@ def action_toggle(app) -> bool:
             row = tbl.get_row_at(tbl.cursor_row)
             pkg, src = str(row[0]), str(row[1])
             if src == "aur":
-                if pkg in app.plan_aur: app.plan_aur.remove(pkg)
-                else: app.plan_aur.add(pkg)
+                if pkg in app.plan.aur: app.plan.aur.remove(pkg)
+                else: app.plan.aur.add(pkg)
             else:
-                if pkg in app.plan_repo: app.plan_repo.remove(pkg)
-                else: app.plan_repo.add(pkg)
-            _populate_plan_tables(app)
-            _update_info(app)
+                if pkg in app.plan.repo: app.plan.repo.remove(pkg)
+                else: app.plan.repo.add(pkg)
             return True
     except Exception:
         return False
@@ -450,15 +366,8 @@ async def on_button(app, bid: str) -> bool:
     if bid == "btn_plan_clear":
         ok = await app.ask_confirm("Clear Plan", "Plan wirklich leeren?")
         if ok:
-            app.plan_repo.clear()
-            app.plan_aur.clear()
-            app.remove_explicit.clear()
-            app.plan_services_enable.clear()
-            app.plan_services_disable.clear()
-            app.plan_preset = None
-            app.plan_generate_configs = False
-            refresh(app)
-            app.set_last("Plan cleared")
+            app.plan.clear()
+            app.set_last("Plan cleared (ctrl+z to undo)")
         return True
     if bid == "btn_plan_apply":
         await apply_plan(app)
@@ -469,5 +378,11 @@ async def on_button(app, bid: str) -> bool:
     if bid == "btn_profile_load":
         await profile_load(app)
         return True
+    if bid == "btn_plan_prefetch":
+        _toggle_prefetch(app)
+        return True
+    if bid == "btn_plan_bulk":
+        await bulk_import(app)
+        return True
     return False
 
@@ -20,13 +20,14 @@ def build(app, pane):
         )
     )
     pane.mount(Static("", id="preset_info", classes="infobox"))
+    app.plan.subscribe("presets_tab", lambda ch: refresh(app), fields=("preset", "generate_configs"))
     refresh(app)
 
 def refresh(app):
     box = app.query_one("#preset_info", Static)
     body = (
-        f"[b]Preset planned[/b]: {app.plan_preset or '-'}\n"
-        f"[b]Generate configs[/b]: {'YES' if app.plan_generate_configs else 'no'}\n\n"
+        f"[b]Preset planned[/b]: {app.plan.preset or '-'}\n"
+        f"[b]Generate configs[/b]: {'YES' if app.plan.generate_configs else 'no'}\n\n"
         "Hyprland preset adds typical Wayland stack (kitty/waybar/wofi/mako/hyprpaper/cliphist/grim/slurp etc.)\n"
         "Plasma preset adds startplasma-wayland + greetd/tuigreet.\n\n"
         "Apply is executed in [b]Plan[/b] tab."
@@ -36,8 +37,8 @@ def refresh(app):
 def _apply_common(app):
     # greetd + tuigreet + essentials
     for p in ["greetd", "tuigreet"]:
-        app.plan_repo.add(p)
-    app.plan_services_enable.add("greetd.service")
+        app.plan.repo.add(p)
+    app.plan.svc_enable.add("greetd.service")
 
 def _preset_hypr(app):
     _apply_common(app)
@@ -52,8 +53,8 @@ def _preset_hypr(app):
         "qt6-wayland", "qt5-wayland",
     ]
     for p in pkgs:
-        app.plan_repo.add(p)
-    app.plan_preset = "hyprland-tuigreet"
+        app.plan.repo.add(p)
+    app.plan.preset = "hyprland-tuigreet"
 
 def _preset_plasma(app):
     _apply_common(app)
@@ -64,26 +65,25 @@ def _preset_plasma(app):
         "pipewire", "wireplumber", "pipewire-pulse",
     ]
     for p in pkgs:
-        app.plan_repo.add(p)
-    app.plan_preset = "plasma-tuigreet"
+        app.plan.repo.add(p)
+    app.plan.preset = "plasma-tuigreet"
 
 async def on_button(app, bid: str) -> bool:
     if bid == "btn_preset_hypr":
-        _preset_hypr(app)
-        app.plan_generate_configs = True
+        with app.plan.batch("preset hyprland-tuigreet"):
+            _preset_hypr(app)
+            app.plan.generate_configs = True
         app.set_last("Preset planned: hyprland-tuigreet")
-        refresh(app)
         return True
     if bid == "btn_preset_plasma":
-        _preset_plasma(app)
-        app.plan_generate_configs = True
+        with app.plan.batch("preset plasma-tuigreet"):
+            _preset_plasma(app)
+            app.plan.generate_configs = True
         app.set_last("Preset planned: plasma-tuigreet")
-        refresh(app)
         return True
     if bid == "btn_preset_toggle_cfg":
-        app.plan_generate_configs = not app.plan_generate_configs
+        app.plan.generate_configs = not app.plan.generate_configs
         app.set_last("Toggled config generation")
-        refresh(app)
         return True
     return False
 
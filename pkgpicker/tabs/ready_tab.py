@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import re
-from typing import List, Tuple
+import threading
+from typing import List
 
 from textual.containers import Horizontal
 from textual.widgets import Button, Static
 
-from ..arch import lspci_full
+from ..alpm import sync_packages
+from ..hardware import scan_devices, suggest, suggested_packages
 
 def build(app, pane):
     app.mount_topcard(pane, "ReadyCheck", "Hardware scan → Driver suggestions (Wayland-first) + Add to Plan", "Button: add suggested drivers to plan")
@@ -20,17 +21,6 @@ def build(app, pane):
     pane.mount(Static("", id="ready_out", classes="infobox"))
     _render(app, scan=False)
 
-def _detect_gpu_pkgs(lspci_txt: str) -> Tuple[str, List[str]]:
-    t = lspci_txt.lower()
-    # rough heuristics
-    if "nvidia" in t:
-        return "NVIDIA", ["nvidia", "nvidia-utils", "lib32-nvidia-utils", "vulkan-icd-loader", "lib32-vulkan-icd-loader"]
-    if "advanced micro devices" in t or "amd/ati" in t or "radeon" in t:
-        return "AMD", ["mesa", "vulkan-radeon", "lib32-mesa", "lib32-vulkan-radeon", "vulkan-icd-loader", "lib32-vulkan-icd-loader"]
-    if "intel" in t:
-        return "Intel", ["mesa", "vulkan-intel", "lib32-mesa", "lib32-vulkan-intel", "vulkan-icd-loader", "lib32-vulkan-icd-loader"]
-    return "Unknown", ["mesa", "vulkan-icd-loader"]
-
 def _suggest_base_wayland() -> List[str]:
     return [
         "pipewire", "wireplumber", "pipewire-pulse",
@@ -40,28 +30,46 @@ def _suggest_base_wayland() -> List[str]:
 
 def _render(app, scan: bool):
     box = app.query_one("#ready_out", Static)
-    txt = lspci_full() if scan else ""
-    if not txt:
+    if not scan:
         box.update("Hardware scan not run yet.\n\nClick [b]Scan hardware[/b].")
         app._ready_cache = {"vendor": "?", "pkgs": []}  # type: ignore[attr-defined]
         return
+    box.update("Scanning /sys …")
+    def worker():
+        devs = scan_devices()
+        sugs = suggest(devs)
+        avail = set(sync_packages())
+        app.call_from_thread(_show, app, devs, sugs, suggested_packages(sugs, avail))
+    threading.Thread(target=worker, daemon=True).start()
 
-    vendor, gpu_pkgs = _detect_gpu_pkgs(txt)
-    base = _suggest_base_wayland()
-    pkgs = base + gpu_pkgs
-
+def _show(app, devs, sugs, hw_pkgs: List[str]):
+    try:
+        box = app.query_one("#ready_out", Static)
+    except Exception:
+        return
+    gpus = sorted({s.module for s in sugs if s.kind == "gpu"})
+    vendor = " + ".join(gpus) or "Unknown"
+    pkgs = _suggest_base_wayland() + [p for p in hw_pkgs if p not in _suggest_base_wayland()]
     missing = [p for p in pkgs if p not in app.installed_all]
+    rows = []
+    for s in sugs:
+        bound = "" if s.device.driver == s.module else f"  [dim](bound: {s.device.driver or '-'})[/dim]"
+        rows.append(
+            f"[{s.kind}] {s.device.slot}  {s.device.vendor}:{s.device.device}  → {s.module}{bound}"
+            f"\n      [dim]{' '.join(s.packages)}[/dim]"
+        )
     body = [
-        f"[b]GPU vendor[/b]: {vendor}",
+        f"[b]GPU driver[/b]: {vendor}",
+        f"[b]Devices[/b]: {sum(1 for d in devs if d.bus == 'pci')} PCI · {sum(1 for d in devs if d.bus == 'usb')} USB interfaces",
+        "",
+        "[b]Driver matches[/b]:",
+        "\n".join(rows) or "  (none)",
         "",
         "[b]Suggested packages[/b]:",
         "  " + " ".join(pkgs),
         "",
         f"[b]Missing[/b] ({len(missing)}):",
         "  " + " ".join(missing),
-        "",
-        "[b]lspci -nnk[/b] (truncated):",
-        txt[:3500],
     ]
     box.update("\n".join(body))
     app._ready_cache = {"vendor": vendor, "pkgs": pkgs, "missing": missing}  # type: ignore[attr-defined]
@@ -69,19 +77,14 @@ def _render(app, scan: bool):
 async def on_button(app, bid: str) -> bool:
     if bid == "btn_ready_scan":
         _render(app, scan=True)
-        app.set_last("ReadyCheck scanned")
+        app.set_last("ReadyCheck: scanning")
         return True
     if bid == "btn_ready_add":
         cache = getattr(app, "_ready_cache", {}) or {}
         pkgs = list(cache.get("missing", []) or [])
-        for p in pkgs:
-            app.plan_repo.add(p)
+        with app.plan.batch("drivers → plan"):
+            app.plan.repo.update(pkgs)
         app.set_last(f"Added {len(pkgs)} driver/base pkgs to plan")
-        try:
-            from . import plan_tab
-            plan_tab.refresh(app)
-        except Exception:
-            pass
         return True
     return False
 
@@ -4,6 +4,7 @@ from textual.widgets import Button, DataTable, Input, Static
 from typing import List, Tuple
 
 from ..cache import cached_search
+from ..details import pane_text, window
 
 def build(app, pane):
     app.mount_topcard(pane, "Search", "Repo + AUR (cached).", "Space Toggle · Enter Info · q QuickAdd")
@@ -40,6 +41,28 @@ def _populate(app, rows: List[Tuple[str, str, str]]):
         sel = "✔" if (name in app.selected_repo or name in app.selected_aur) else ""
         inst = "✔" if name in app.installed_all else ""
         tbl.add_row(sel, name, src, inst, desc[:90], key=f"{src}:{name}")
+    app._search_rows = rows  # type: ignore[attr-defined]
+    _prefetch(app, 0)
+
+def _prefetch(app, idx: int) -> None:
+    rows = [(n, s) for n, s, _ in getattr(app, "_search_rows", [])]
+    if rows:
+        app.details.prefetch(window(rows, idx), lambda names: app.call_from_thread(_details_ready, app, names))
+
+def _details_ready(app, names) -> None:
+    try:
+        tbl = app.query_one("#search_tbl", DataTable)
+    except Exception:
+        return
+    if tbl.row_count and str(tbl.get_row_at(tbl.cursor_row)[1]) in names:
+        _info(app, tbl.cursor_row)
+
+def _info(app, idx: int) -> None:
+    rows = getattr(app, "_search_rows", [])
+    if not 0 <= idx < len(rows):
+        return
+    name, src, desc = rows[idx]
+    app.query_one("#search_info", Static).update(pane_text(app.details, name, src, f"[b]{name}[/b] [{src}]\n\n{desc}"))
 
 def _do_search(app, mode: str, query: str):
     query = query.strip()
@@ -48,10 +71,13 @@ def _do_search(app, mode: str, query: str):
         return
 
     rows: List[Tuple[str, str, str]] = []
-    if mode in ("repo", "both"):
+    res = app.daemon_call("search", query=query, repo=mode in ("repo", "both"), aur=mode in ("aur", "both"), limit=1000)
+    if res is not None:
+        rows = [(r["name"], "aur" if r["source"] == "aur" else "repo", r.get("desc", "")) for r in res]
+    if res is None and mode in ("repo", "both"):
         for r in cached_search(app.SEARCH_CACHE_FILE, "repo", query):
             rows.append((r["name"], "repo", r.get("desc", "")))
-    if mode in ("aur", "both"):
+    if res is None and mode in ("aur", "both"):
         for r in cached_search(app.SEARCH_CACHE_FILE, "aur", query):
             rows.append((r["name"], "aur", r.get("desc", "")))
 
@@ -84,8 +110,8 @@ def on_row_highlighted(app, event, table_id: str) -> bool:
         return False
     tbl = event.data_table
     if tbl.row_count:
-        row = tbl.get_row_at(tbl.cursor_row)
-        app.query_one("#search_info", Static).update(f"[b]{row[1]}[/b] [{row[2]}]\n\n{row[4]}")
+        _info(app, tbl.cursor_row)
+        _prefetch(app, tbl.cursor_row)
     return True
 
 def action_toggle(app) -> bool:
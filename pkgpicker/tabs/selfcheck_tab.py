@@ -1,19 +1,69 @@
 from __future__ import annotations
-from textual.widgets import Static
+import threading
+
+from textual.containers import Horizontal
+from textual.widgets import Button, DataTable, Static
 from ..arch import which
 
 def build(app, pane):
-    app.mount_topcard(pane, "Self-Check", "prüft Tools & optional deps", "")
+    app.mount_topcard(pane, "Self-Check", "prüft Tools, optional deps & packages.json", "")
     pane.mount(
         Static(
             f"yay: {'OK' if which('yay') else 'MISSING'} · "
-            f"expac: {'OK' if which('expac') else 'MISSING'} · "
-            f"paccache: {'OK' if which('paccache') else 'MISSING'} · "
-            f"lspci: {'OK' if which('lspci') else 'MISSING'}",
+            f"expac: {'OK' if which('expac') else 'MISSING'}",
             classes="infobox",
         )
     )
+    cat = app.catalog
+    lines = [f"Katalog: {len(cat.sources)} Datei(en) · {len(cat.categories)} Kategorien · "
+             f"{sum(cat.counts)} Pakete · {'Cache' if cat.cached else 'neu kompiliert'}"]
+    lines += [f"[red]✘[/red] {e}" for e in cat.errors[:50]]
+    pane.mount(Static("\n".join(lines), classes="infobox"))
+
+    pane.mount(Static("Namensprüfung läuft …", id="chk_info", classes="infobox"))
+    tbl = DataTable(id="chk_tbl")
+    app.safe_cursor_row(tbl)
+    tbl.add_columns("Art", "Paket", "Wo", "Detail")
+    pane.mount(tbl)
+    pane.mount(
+        Horizontal(
+            Button("Katalog neu prüfen", id="btn_chk_run", variant="primary"),
+            Button("Nur Repos", id="btn_chk_repo", variant="default"),
+            classes="toolbar",
+        )
+    )
+    _run(app, force=False, aur=True)
+
+def _run(app, force: bool, aur: bool) -> None:
+    from ..validate import validate
+    cat = app.catalog
+    def worker():
+        rep = validate(cat, app.snapshot, aur=aur, backend=app.daemon if aur else None, force=force)
+        app.call_from_thread(_show, app, rep)
+    threading.Thread(target=worker, daemon=True).start()
+
+def _show(app, rep) -> None:
+    from ..validate import by_kind
+    try:
+        tbl = app.query_one("#chk_tbl", DataTable)
+        info = app.query_one("#chk_info", Static)
+    except Exception:
+        return
+    tbl.clear()
+    for f in rep.findings:
+        tbl.add_row(f.kind, f.name, f.where, f.detail)
+    kinds = " · ".join(f"{k}: {n}" for k, n in sorted(by_kind(rep.findings).items())) or "[green]alles gefunden[/green]"
+    aur = f" · [yellow]AUR nicht geprüft: {rep.aur_error}[/yellow]" if rep.aur_error else ""
+    info.update(f"{rep.checked} Namen geprüft{' (Cache)' if rep.cached else ''} · {kinds}{aur}")
+
+def on_catalog(app, diff) -> None:
+    build(app, app.clear_pane("tab_selfcheck"))  # the name check is cached per catalog digest
 
 async def on_button(app, bid: str) -> bool:
+    if bid == "btn_chk_run":
+        _run(app, force=True, aur=True)
+        return True
+    if bid == "btn_chk_repo":
+        _run(app, force=True, aur=False)
+        return True
     return False
-
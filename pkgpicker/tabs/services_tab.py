@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
 from typing import Any, Dict, List, Set, Tuple
 
 from textual.containers import Container, Horizontal
+from textual.coordinate import Coordinate
 from textual.widgets import Button, DataTable, Static
 
-from ..arch import systemctl_is_active, systemctl_is_enabled
+from ..alpm import local_generation, local_units, sync_generation, sync_units
+from ..arch import systemctl_active_many
+from ..snapshot import units_token
+from ..units import preset_rules, preset_state, unit_states
+
+COLUMNS = ("Plan", "Unit", "enabled", "active", "preset", "pkg", "desc")
 
 def _normalize_unit(u: Any) -> str:
     unit = ""
@@ -33,7 +42,7 @@ def build(app, pane):
 
     tbl = DataTable(id="svc_tbl")
     app.safe_cursor_row(tbl)
-    tbl.add_columns("Plan", "Unit", "enabled", "active", "desc")
+    tbl.add_columns(*COLUMNS)
 
     row.mount(Container(tbl, id="svc_left"))
     row.mount(Static("", id="svc_info", classes="infobox"))
@@ -47,8 +56,13 @@ def build(app, pane):
             classes="toolbar",
         )
     )
+    app.plan.subscribe("services_tab", lambda ch: _update_plan_column(app), fields=("svc_enable", "svc_disable"))
     refresh(app)
 
+def on_catalog(app, diff) -> None:
+    if "services" in diff.cfg or diff.targets:
+        refresh(app)
+
 def _service_sources(app) -> List[Any]:
     # Combine cfg services + target services + a few essentials
     raw = []
@@ -64,34 +78,106 @@ def _service_sources(app) -> List[Any]:
     raw = essentials + raw
     return raw
 
-def refresh(app):
-    tbl = app.query_one("#svc_tbl", DataTable)
-    tbl.clear(columns=True)
-    tbl.add_columns("Plan", "Unit", "enabled", "active", "desc")
+def _package_units(installed: Set[str], planned: Set[str]) -> Dict[str, str]:
+    """unit -> package for everything installed (minus planned removals) or planned."""
+    out: Dict[str, str] = {}
+    loc = local_units()
+    for pkg in sorted(installed):
+        for u in loc.get(pkg, ()):
+            out.setdefault(u, pkg)
+    planned = [p for p in sorted(planned) if p not in loc]
+    if planned:
+        syn = sync_units()
+        for pkg in planned:
+            for u in syn.get(pkg, ()):
+                out.setdefault(u, pkg)
+    return out
 
+def refresh(app):
+    # sources are read on the UI thread; unit files, DB file lists and systemctl in a worker
     seen: Set[str] = set()
     entries: List[Tuple[str, str]] = []
-
     for u in _service_sources(app):
         unit = _normalize_unit(u)
         if not unit or unit in seen:
             continue
         seen.add(unit)
         entries.append((unit, _desc(u)))
+    installed = set(app.installed_all) - set(app.plan.remove)
+    planned = set(app.plan.repo)
+    inputs = hashlib.sha1(json.dumps([entries, sorted(installed), sorted(planned)]).encode()).hexdigest()
+
+    # last known rows first (warm start); the worker then patches what changed
+    cached, _ = app.snapshot.get("services")
+    if cached and not _table_units(app):
+        _fill(app, [tuple(r) for r in cached])
+
+    def worker():
+        token = [inputs, units_token(), local_generation(), sync_generation()]
+        cached, fresh = app.snapshot.get("services", token)
+        if fresh:
+            # only `active` is runtime state; enablement/presets/packages are covered by the token
+            active = systemctl_active_many([r[0] for r in cached])
+            out = [(r[0], r[1], active.get(r[0], ""), r[3], r[4], r[5]) for r in cached]
+        else:
+            by_unit = _package_units(installed, planned)
+            rows = entries + [(u, "") for u in sorted(by_unit) if u not in seen]
+            units = [u for u, _ in rows]
+            states = unit_states(units)
+            active = systemctl_active_many(units)
+            rules = preset_rules()
+            out = [
+                (u, states.get(u, ""), active.get(u, ""), preset_state(u, rules), by_unit.get(u, ""), desc)
+                for u, desc in rows
+            ]
+        app.snapshot.put("services", token, out)
+        app.call_from_thread(_fill, app, out)
+    threading.Thread(target=worker, daemon=True).start()
+
+def _table_units(app) -> List[str]:
+    try:
+        tbl = app.query_one("#svc_tbl", DataTable)
+    except Exception:
+        return []
+    return [str(tbl.get_row_at(i)[1]) for i in range(tbl.row_count)]
 
-    for unit, desc in entries:
-        en = systemctl_is_enabled(unit)
-        ac = systemctl_is_active(unit)
-        plan = ""
-        if unit in app.plan_services_enable:
-            plan = "enable"
-        elif unit in app.plan_services_disable:
-            plan = "disable"
-        tbl.add_row(plan, unit, en, ac, desc[:80], key=unit)
-
-    app.set_last("Services refreshed")
+def _fill(app, rows: List[Tuple[str, str, str, str, str, str]]):
+    try:
+        tbl = app.query_one("#svc_tbl", DataTable)
+    except Exception:
+        return
+    if _table_units(app) == [r[0] for r in rows]:
+        # same units in the same order: touch only the cells that changed
+        for i, (unit, en, ac, pre, pkg, desc) in enumerate(rows):
+            old = tbl.get_row_at(i)
+            for col, val in ((2, en), (3, ac), (4, pre), (5, pkg), (6, desc[:80])):
+                if str(old[col]) != val:
+                    tbl.update_cell_at(Coordinate(i, col), val)
+    else:
+        tbl.clear(columns=True)
+        tbl.add_columns(*COLUMNS)
+        for unit, en, ac, pre, pkg, desc in rows:
+            tbl.add_row(_plan_label(app, unit), unit, en, ac, pre, pkg, desc[:80], key=unit)
+    app.set_last(f"Services refreshed ({len(rows)} units)")
     app.update_status()
 
+def _plan_label(app, unit: str) -> str:
+    if unit in app.plan.svc_enable:
+        return "enable"
+    if unit in app.plan.svc_disable:
+        return "disable"
+    return ""
+
+def _update_plan_column(app):
+    # plan changes only touch the "Plan" cells; systemctl state is not re-queried
+    try:
+        tbl = app.query_one("#svc_tbl", DataTable)
+    except Exception:
+        return
+    for i in range(tbl.row_count):
+        unit = str(tbl.get_row_at(i)[1])
+        tbl.update_cell_at(Coordinate(i, 0), _plan_label(app, unit))
+
 def _current_unit(app) -> str:
     tbl = app.query_one("#svc_tbl", DataTable)
     if not tbl.row_count:
@@ -108,8 +194,10 @@ def on_row_highlighted(app, event, table_id: str) -> bool:
     body = (
         f"[b]{row[1]}[/b]\n"
         f"enabled: {row[2]}\n"
-        f"active: {row[3]}\n\n"
-        f"{row[4]}"
+        f"active: {row[3]}\n"
+        f"preset: {row[4]}\n"
+        f"package: {row[5] or '-'}\n\n"
+        f"{row[6]}"
     )
     app.query_one("#svc_info", Static).update(body)
     return True
@@ -124,14 +212,14 @@ def action_toggle(app) -> bool:
     unit = _current_unit(app)
     if not unit:
         return True
-    if unit in app.plan_services_enable:
-        app.plan_services_enable.remove(unit)
-        app.plan_services_disable.add(unit)
-    elif unit in app.plan_services_disable:
-        app.plan_services_disable.remove(unit)
-    else:
-        app.plan_services_enable.add(unit)
-    refresh(app)
+    with app.plan.batch(f"svc {unit}"):
+        if unit in app.plan.svc_enable:
+            app.plan.svc_enable.remove(unit)
+            app.plan.svc_disable.add(unit)
+        elif unit in app.plan.svc_disable:
+            app.plan.svc_disable.remove(unit)
+        else:
+            app.plan.svc_enable.add(unit)
     app.set_last(f"Toggled svc plan: {unit}")
     return True
 
@@ -145,21 +233,21 @@ async def on_button(app, bid: str) -> bool:
     if bid == "btn_svc_en":
         unit = _current_unit(app)
         if unit:
-            app.plan_services_enable.add(unit)
-            app.plan_services_disable.discard(unit)
-            refresh(app)
+            with app.plan.batch(f"svc enable {unit}"):
+                app.plan.svc_enable.add(unit)
+                app.plan.svc_disable.discard(unit)
         return True
     if bid == "btn_svc_dis":
         unit = _current_unit(app)
         if unit:
-            app.plan_services_disable.add(unit)
-            app.plan_services_enable.discard(unit)
-            refresh(app)
+            with app.plan.batch(f"svc disable {unit}"):
+                app.plan.svc_disable.add(unit)
+                app.plan.svc_enable.discard(unit)
         return True
     if bid == "btn_svc_clear":
-        app.plan_services_enable.clear()
-        app.plan_services_disable.clear()
-        refresh(app)
+        with app.plan.batch("clear svc plan"):
+            app.plan.svc_enable.clear()
+            app.plan.svc_disable.clear()
         app.set_last("Service plan cleared")
         return True
     return False
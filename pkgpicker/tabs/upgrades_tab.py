@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Tuple
+
+from textual.containers import Container, Horizontal
+from textual.widgets import Button, DataTable, Static
+
+from ..alpm import pending_upgrades
+from ..arch import human_size
+from ..models import PkgMeta
+
+def build(app, pane):
+    app.mount_topcard(
+        pane,
+        "Upgrades",
+        "Installed vs. sync DB (native vercmp, kein checkupdates/pacman -Qu)",
+        "Stand der Sync-DBs = letztes pacman -Sy · Enter Info",
+    )
+    row = Horizontal(id="upg_row")
+    pane.mount(row)
+
+    tbl = DataTable(id="upg_tbl")
+    app.safe_cursor_row(tbl)
+    tbl.add_columns("Pkg", "Installed", "New", "Repo", "Download", "Δ Size")
+
+    row.mount(Container(tbl, id="upg_left"))
+    row.mount(Static("", id="upg_info", classes="infobox"))
+
+    pane.mount(
+        Horizontal(
+            Button("Refresh", id="btn_upg_refresh", variant="primary"),
+            classes="toolbar",
+        )
+    )
+    refresh(app)
+
+def refresh(app):
+    app.set_busy("Upgrades …")
+    threading.Thread(target=_worker, args=(app,), daemon=True).start()
+
+def _worker(app):
+    t0 = time.perf_counter()
+    ups = pending_upgrades()
+    ms = (time.perf_counter() - t0) * 1000
+    app.call_from_thread(_populate, app, ups, ms)
+
+def _populate(app, ups: List[Tuple[PkgMeta, PkgMeta]], ms: float):
+    app._upg_cache = ups  # type: ignore[attr-defined]
+    app.set_busy("")
+    try:
+        tbl = app.query_one("#upg_tbl", DataTable)
+    except Exception:
+        return
+    tbl.clear(columns=True)
+    tbl.add_columns("Pkg", "Installed", "New", "Repo", "Download", "Δ Size")
+    dl = 0
+    delta = 0
+    for lm, sm in ups:
+        dl += sm.csize
+        delta += sm.isize - lm.isize
+        tbl.add_row(lm.name, lm.version, sm.version, sm.repo, human_size(sm.csize), human_size(sm.isize - lm.isize), key=lm.name)
+    app.query_one("#upg_info", Static).update(
+        f"[b]Upgrades[/b]: {len(ups)}\n"
+        f"Download: {human_size(dl)}\n"
+        f"Installed size Δ: {human_size(delta)}\n\n"
+        f"[dim]computed in {ms:.0f} ms[/dim]"
+    )
+    app.set_last(f"Upgrades: {len(ups)}")
+
+def on_row_highlighted(app, event, table_id: str) -> bool:
+    if table_id != "upg_tbl":
+        return False
+    tbl = event.data_table
+    ups = getattr(app, "_upg_cache", []) or []
+    idx = tbl.cursor_row
+    if not tbl.row_count or idx < 0 or idx >= len(ups):
+        return True
+    lm, sm = ups[idx]
+    app.query_one("#upg_info", Static).update(
+        f"[b]{lm.name}[/b]\n"
+        f"{lm.version} → {sm.version} ({sm.repo})\n"
+        f"Download: {human_size(sm.csize)} · Installed: {human_size(lm.isize)} → {human_size(sm.isize)}\n\n"
+        f"{sm.desc}"
+    )
+    return True
+
+async def on_button(app, bid: str) -> bool:
+    if bid == "btn_upg_refresh":
+        refresh(app)
+        return True
+    return False
@@ -3,113 +3,41 @@ from __future__ import annotations
 import asyncio
 import os
 import threading
-from typing import Any, Dict, List, Optional, Set
+from typing import AbstractSet, Any, Dict, List, Optional, Set
 
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, Static, TabbedContent, TabPane, DataTable
 
-from .models import Category, Target, ConflictRule, PackageItem
-from .arch import (
-    pacman_installed_all,
-    pacman_installed_explicit,
-    pacman_repo_packages,
-    pacman_foreign_packages,
-)
-from .cache import load_json_safe
+from . import paths
+from .models import Target
+from .catalog import Catalog, CatalogDiff, diff_catalogs, load_catalog
+from .conflicts import db_relations
+from .daemon import DaemonError, connect
+from .details import DetailCache
 from .history import parse_history
 from .modals import ConfirmModal, OutputModal
+from .plan import Plan
+from .privhelper import get_helper
+from .pkgids import IdSet
+from .snapshot import Snapshot, installed_state, installed_token, remember_local, restore_local
+from .state import StatusModel, observed_set
 
-from .tabs import (
-    packages_tab,
-    search_tab,
-    plan_tab,
-    installed_tab,
-    ready_tab,
-    services_tab,
-    presets_tab,
-    hygiene_tab,
-    history_tab,
-    selfcheck_tab,
-    help_tab,
-)
+from . import tabs
 
 APP_NAME = "pkgpicker"
 
 def mkdirp(p: str) -> None:
     os.makedirs(p, exist_ok=True)
 
-def conflict_problems(selected: Set[str], rules: List[ConflictRule]) -> List[str]:
-    probs: List[str] = []
-    for r in rules:
-        present = [p for p in r.group if p in selected]
-        if r.mode == "exactly_one":
-            if len(present) != 1:
-                probs.append(f"{r.name}: erwartet genau 1, aktuell: {present if present else 'none'}")
-        else:
-            if len(present) > 1:
-                probs.append(f"{r.name}: zu viele ausgewählt: {present}")
-    return probs
-
-def parse_categories(cfg: Dict[str, Any]) -> List[Category]:
-    out: List[Category] = []
-    for c in cfg.get("categories", []) or []:
-        items: List[PackageItem] = []
-        for it in c.get("items", []) or []:
-            if isinstance(it, str):
-                nm = it.strip()
-                if nm:
-                    items.append(PackageItem(name=nm, source="repo"))
-            elif isinstance(it, dict):
-                nm = str(it.get("name", "")).strip()
-                if not nm:
-                    continue
-                items.append(
-                    PackageItem(
-                        name=nm,
-                        source=str(it.get("source", "repo")).strip(),
-                        desc=str(it.get("desc", "")).strip(),
-                        featured=bool(it.get("featured", False)),
-                        reason=str(it.get("reason", "")).strip(),
-                    )
-                )
-        out.append(Category(name=str(c.get("name", "")).strip(), items=items))
-    return out
-
-def parse_targets(cfg: Dict[str, Any]) -> List[Target]:
-    out: List[Target] = []
-    for t in cfg.get("targets", []) or []:
-        out.append(
-            Target(
-                id=str(t.get("id", "")).strip(),
-                name=str(t.get("name", "")).strip(),
-                required_packages=list(t.get("required_packages", []) or []),
-                recommended_packages=list(t.get("recommended_packages", []) or []),
-                services=list(t.get("services", []) or []),
-                preset=str(t.get("preset", "hyprland")).strip(),
-            )
-        )
-    return out
-
-def parse_conflicts(cfg: Dict[str, Any]) -> List[ConflictRule]:
-    out: List[ConflictRule] = []
-    for r in cfg.get("conflicts", []) or []:
-        out.append(
-            ConflictRule(
-                name=str(r.get("name", "conflict")),
-                group=list(r.get("group", []) or []),
-                mode=str(r.get("mode", "at_most_one")),
-            )
-        )
-    return out
-
 class PkgPickerApp(App):
-    CACHE_DIR = os.path.join(os.path.expanduser("~/.cache/pkgpicker"))
-    HISTORY_LOG = os.path.join(CACHE_DIR, "history.log")
-    SEARCH_CACHE_FILE = os.path.join(CACHE_DIR, "search_cache.json")
-    PKGINFO_CACHE_FILE = os.path.join(CACHE_DIR, "pkginfo_cache.json")
-    PROFILES_DIR = os.path.join(CACHE_DIR, "profiles")
-    EXPORTS_DIR = os.path.join(CACHE_DIR, "exports")
-    BUNDLES_DIR = os.path.join(EXPORTS_DIR, "bundles")
+    CACHE_DIR = paths.CACHE_DIR
+    HISTORY_LOG = paths.HISTORY_LOG
+    SEARCH_CACHE_FILE = paths.SEARCH_CACHE_FILE
+    PKGINFO_CACHE_FILE = paths.PKGINFO_CACHE_FILE
+    PROFILES_DIR = paths.PROFILES_DIR
+    EXPORTS_DIR = paths.EXPORTS_DIR
+    BUNDLES_DIR = paths.BUNDLES_DIR
+    CATALOG_POLL = 1.0  # seconds between packages.json stat checks
 
     CSS = """
     Screen { background: $background; }
@@ -133,6 +61,7 @@ class PkgPickerApp(App):
     Input { border: round $surface; background: $panel; margin: 0 1 1 1; }
 
     #modal { width: 92%; max-width: 170; padding: 1 2; border: round $primary; background: $panel; }
+    #modal TextArea { height: 16; }
     """
 
     BINDINGS = [
@@ -143,11 +72,13 @@ class PkgPickerApp(App):
         ("f4", "go_search", "Search"),
         ("f5", "go_installed", "Installed"),
         ("f6", "go_plan", "Plan"),
+        ("f7", "go_upgrades", "Upgrades"),
         ("f8", "go_ready", "Ready"),
         ("f9", "go_services", "Services"),
         ("f10", "go_presets", "Presets"),
         ("f11", "go_hygiene", "Hygiene"),
         ("f12", "go_history", "History"),
+        ("c", "go_coverage", "Coverage"),
         ("r", "refresh", "Refresh"),
         ("[", "target_prev", "Target prev"),
         ("]", "target_next", "Target next"),
@@ -156,49 +87,61 @@ class PkgPickerApp(App):
         ("enter", "info", "Info"),
         ("a", "add_plan", "Selection→Plan"),
         ("q", "quick_add", "Quick Add"),
+        ("b", "bulk_import", "Bulk Import"),
         ("i", "apply_plan", "Apply Plan"),
         ("x", "export_csv", "Export CSV"),
         ("p", "profile_save", "Profile Save"),
         ("l", "profile_load", "Profile Load"),
+        ("ctrl+z", "plan_undo", "Undo"),
+        ("ctrl+y", "plan_redo", "Redo"),
     ]
 
+    # observable state (assignment replaces contents, subscribers stay attached)
+    installed_all = observed_set()
+    selected_repo = observed_set()
+    selected_aur = observed_set()
+
     def __init__(self, data_path: str):
         super().__init__()
         self.data_path = data_path
-        self.cfg = self._load_config(data_path)
-
-        self.categories = parse_categories(self.cfg)
-        self.targets = parse_targets(self.cfg)
-        self.conflicts = parse_conflicts(self.cfg)
+        self.catalog = self._load_catalog(data_path)
+        self.cfg = self.catalog.cfg
+        self.targets = self.catalog.targets
+        self.conflicts = self.catalog.conflicts
+        self._watched = self.catalog  # last version seen by the watcher (may be broken, mid-save)
+        self._stop = threading.Event()
 
         self.target_idx = 0
         self.cat_idx = 0
 
         # installed state
-        self.installed_all: Set[str] = set()
-        self.installed_explicit: List[str] = []
-        self.installed_repo: Set[str] = set()
-        self.installed_foreign: Set[str] = set()
+        # all name sets are bitsets over the shared pkgids.NAMES table
+        self.installed_all: AbstractSet[str] = set()
+        self.installed_explicit = IdSet()
+        self.installed_repo = IdSet()
+        self.installed_foreign = IdSet()
         self.history: List[Dict[str, Any]] = []
 
-        # selection + plan
-        self.selected_repo: Set[str] = set()
-        self.selected_aur: Set[str] = set()
-        self.plan_repo: Set[str] = set()
-        self.plan_aur: Set[str] = set()
-        self.remove_explicit: Set[str] = set()
+        # selection + plan (install/remove/services/preset, with undo journal)
+        self.selected_repo: AbstractSet[str] = set()
+        self.selected_aur: AbstractSet[str] = set()
+        self.plan = Plan()
 
-        # services plan
-        self.plan_services_enable: Set[str] = set()
-        self.plan_services_disable: Set[str] = set()
+        # last session's derived state; parts are revalidated against their tokens
+        self.snapshot = Snapshot.load()
+        restore_local(self.snapshot)
+        self.daemon = connect()  # shared warm indexes of `pkgpicker daemon`, if one runs
+        self.details = DetailCache()  # info-pane metadata, prefetched around the cursor
 
-        # preset/config generation
-        self.plan_preset: Optional[str] = None
-        self.plan_generate_configs: bool = False
-
-        self.last_action = "Ready."
+        self.last_action = f"packages.json: {self.catalog.errors[0]}" if self.catalog.errors else "Ready."
         self.busy = ""
 
+        self._built: Set[str] = set()  # tab panes built so far (the rest build on first show)
+
+        self.status_model = StatusModel(self, self.plan, self.conflicts)
+        self._status_key: Optional[tuple] = None
+        self.plan.subscribe("statusbar", lambda ch: self.update_status())
+
     # ---------- modal helpers ----------
     async def push_result(self, screen) -> Any:
         loop = asyncio.get_running_loop()
@@ -217,21 +160,8 @@ class PkgPickerApp(App):
     def show_output(self, title: str, body: str) -> None:
         self.push_screen(OutputModal(title, body))
 
-    def _load_config(self, path: str) -> Dict[str, Any]:
-        default_cfg = {
-            "ui": {"title": "PkgPicker", "tagline": "Minimal → Wayland Desktop + Packages + Services"},
-            "categories": [],
-            "targets": [],
-            "conflicts": [],
-            "services": [],
-            "presets": [],
-        }
-        cfg = load_json_safe(path, default_cfg)
-        if not isinstance(cfg, dict):
-            cfg = default_cfg
-        for k, v in default_cfg.items():
-            cfg.setdefault(k, v)
-        return cfg
+    def _load_catalog(self, path: str) -> Catalog:
+        return load_catalog(path)
 
     # ---------- basics ----------
     def current_target(self) -> Target:
@@ -240,12 +170,109 @@ class PkgPickerApp(App):
         return self.targets[self.target_idx]
 
     def refresh_all(self) -> None:
-        self.installed_all = pacman_installed_all()
-        self.installed_explicit = pacman_installed_explicit()
-        self.installed_repo = pacman_repo_packages()
-        self.installed_foreign = pacman_foreign_packages()
+        token = installed_token()
+        st = installed_state()
+        self.snapshot.put("installed", token, st)
+        self._set_installed(st)
         self.history = parse_history(self.HISTORY_LOG)
 
+    def _set_installed(self, st: Dict[str, List[str]]) -> bool:
+        """Assign only the parts that differ (installed_all notifies its subscribers)."""
+        changed = False
+        for key in ("all", "explicit", "repo", "foreign"):
+            val = IdSet(st[key])
+            if val != getattr(self, f"installed_{key}"):
+                setattr(self, f"installed_{key}", val)
+                changed = True
+        return changed
+
+    def daemon_call(self, method: str, **params: Any) -> Any:
+        """Query the daemon; None (and the daemon is dropped) when it is gone or absent."""
+        if self.daemon is None:
+            return None
+        try:
+            return self.daemon.call(method, **params)
+        except (OSError, ValueError, DaemonError):
+            self.daemon = None
+            return None
+
+    def warm_start(self) -> None:
+        """Installed sets from the daemon or the snapshot; recomputed in the background when stale."""
+        st = self.daemon_call("installed")
+        if isinstance(st, dict):
+            self.snapshot.put("installed", installed_token(), st)
+            self._set_installed(st)
+            self.history = parse_history(self.HISTORY_LOG)
+            return
+        st, fresh = self.snapshot.get("installed", installed_token())
+        if not isinstance(st, dict):
+            self.refresh_all()
+            return
+        self._set_installed(st)
+        self.history = parse_history(self.HISTORY_LOG)
+        if not fresh:
+            threading.Thread(target=self._revalidate_worker, daemon=True).start()
+
+    def _revalidate_worker(self) -> None:
+        token = installed_token()
+        st = installed_state()
+        self.snapshot.put("installed", token, st)
+        self.call_from_thread(self._patch_installed, st)
+
+    def _patch_installed(self, st: Dict[str, List[str]]) -> None:
+        if not self._set_installed(st):
+            return
+        for tab_id in ("tab_packages", "tab_installed", "tab_plan", "tab_services"):
+            self.refresh_tab(tab_id)
+        self.set_last("State revalidated.")
+
+    # ---------- catalog hot reload ----------
+    def _watch_catalog(self) -> None:
+        # polling like the daemon: a few stats per tick, content only hashed when an mtime moved
+        while not self._stop.wait(self.CATALOG_POLL):
+            if self._watched.stale():
+                new = load_catalog(self.data_path)
+                self._watched = new
+                self.call_from_thread(self._reload_catalog, new)
+
+    def _reload_catalog(self, new: Catalog) -> None:
+        if new.broken:
+            # keep the old models (and the selection) until the file parses again
+            self.set_last(f"packages.json: {new.errors[0] if new.errors else 'unreadable'} · Reload ausgesetzt")
+            return
+        diff = diff_catalogs(self.catalog, new)
+        if not diff:
+            return
+        old = self.catalog
+        cat = old.categories[self.cat_idx] if old.categories else None
+        tid = self.current_target().id
+        self.catalog, self.cfg, self.targets, self.conflicts = new, new.cfg, new.targets, new.conflicts
+        self.cat_idx = new.categories.index(cat) if cat in new.categories else min(self.cat_idx, max(0, len(new.categories) - 1))
+        ids = [t.id for t in new.targets]
+        self.target_idx = ids.index(tid) if tid in ids else min(self.target_idx, max(0, len(ids) - 1))
+        if diff.conflicts:
+            self.status_model.set_rules(new.conflicts)
+        self._prune_catalog_state(diff)
+        for tab_id in list(self._built):
+            mod = tabs.load(tab_id)
+            if hasattr(mod, "on_catalog"):
+                mod.on_catalog(self, diff)
+        self.set_last(f"packages.json neu geladen ({len(diff.categories)} Kategorien geändert)")
+
+    def _prune_catalog_state(self, diff: CatalogDiff) -> None:
+        """Drop selection/plan entries whose package left the catalog; follow repo↔aur source changes."""
+        if not (diff.gone or diff.moved):
+            return
+        with self.plan.batch("catalog reload"):
+            for s in (self.selected_repo, self.selected_aur, self.plan.repo, self.plan.aur):
+                s -= diff.gone
+            for repo, aur in ((self.selected_repo, self.selected_aur), (self.plan.repo, self.plan.aur)):
+                for name, src in diff.moved:
+                    a, b = (repo, aur) if src == "aur" else (aur, repo) if src == "repo" else (None, None)
+                    if a is not None and name in a:
+                        a.discard(name)
+                        b.add(name)
+
     def set_busy(self, msg: str) -> None:
         self.busy = msg
         try:
@@ -253,26 +280,66 @@ class PkgPickerApp(App):
         except Exception:
             pass
 
+    def ensure_priv_helper(self) -> bool:
+        """
+        Start the root helper once. With cached sudo credentials this is silent;
+        otherwise the TUI is suspended so sudo can prompt on a clean terminal.
+        """
+        h = get_helper()
+        if h.alive or h.start(interactive=False):
+            return True
+        try:
+            with self.suspend():
+                return h.start(interactive=True)
+        except Exception:
+            return False
+
+    def on_unmount(self) -> None:
+        self._stop.set()
+        get_helper().close()
+        pf = getattr(self, "_prefetch", None)
+        if pf is not None:
+            pf.close()
+        remember_local(self.snapshot)
+        try:
+            self.snapshot.save()
+        except OSError:
+            pass
+
     def set_last(self, msg: str) -> None:
         self.last_action = msg
         self.update_status()
 
+    def _load_relations_worker(self) -> None:
+        rel = db_relations()
+        self.call_from_thread(self._set_relations, rel)
+
+    def _set_relations(self, rel) -> None:
+        self.status_model.load_relations(rel)
+        self.refresh_tab("tab_plan")
+
+    def plan_conflict_problems(self) -> List[str]:
+        return self.status_model.plan_conflicts.problems()
+
     def update_status(self) -> None:
+        key = (self.status_model.version, self.target_idx, self.last_action)
+        if key == self._status_key:
+            return
+        self._status_key = key
         t = self.current_target()
-        combined = set(self.installed_all) | self.plan_repo | self.plan_aur | self.selected_repo | self.selected_aur
-        probs = conflict_problems(combined, self.conflicts)
+        sel_r, sel_a, pl_r, pl_a, rm, sv_en, sv_dis, n_conflicts = self.status_model.counts()
         s = (
             f"Target: {t.name}   "
-            f"Sel: repo={len(self.selected_repo)} aur={len(self.selected_aur)}   "
-            f"Plan: +repo={len(self.plan_repo)} +aur={len(self.plan_aur)}  -rm={len(self.remove_explicit)}   "
-            f"SvcPlan: +{len(self.plan_services_enable)} -{len(self.plan_services_disable)}   "
-            f"Conflicts: {len(probs)}   "
+            f"Sel: repo={sel_r} aur={sel_a}   "
+            f"Plan: +repo={pl_r} +aur={pl_a}  -rm={rm}   "
+            f"SvcPlan: +{sv_en} -{sv_dis}   "
+            f"Conflicts: {n_conflicts}   "
             f"Last: {self.last_action}"
         )
         try:
             self.query_one("#statusbar", Static).update(s)
         except Exception:
-            pass
+            self._status_key = None
 
     def mount_topcard(self, pane: TabPane, title: str, subtitle: str = "", keys: str = "") -> None:
         lines = [f"[b]{title}[/b]"]
@@ -292,6 +359,7 @@ class PkgPickerApp(App):
     # ---------- statusbar visibility fix (Self-Check/Help) ----------
     def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated) -> None:
         pane_id = getattr(event.pane, "id", "") or ""
+        self.ensure_built(pane_id)
         hide = pane_id in ("tab_selfcheck", "tab_help")
         try:
             self.query_one("#statusbar", Static).styles.display = "none" if hide else "block"
@@ -306,17 +374,8 @@ class PkgPickerApp(App):
         yield Static("", id="statusbar")
         yield Static("", id="busy")
         with TabbedContent(id="tabs"):
-            yield TabPane("Packages", id="tab_packages")
-            yield TabPane("Search", id="tab_search")
-            yield TabPane("Plan", id="tab_plan")
-            yield TabPane("Installed", id="tab_installed")
-            yield TabPane("ReadyCheck", id="tab_ready")
-            yield TabPane("Services", id="tab_services")
-            yield TabPane("Presets", id="tab_presets")
-            yield TabPane("Hygiene", id="tab_hygiene")
-            yield TabPane("History", id="tab_history")
-            yield TabPane("Self-Check", id="tab_selfcheck")
-            yield TabPane("Help", id="tab_help")
+            for spec in tabs.TABS:
+                yield TabPane(spec.title, id=spec.id)
         yield Footer()
 
     def on_mount(self) -> None:
@@ -325,15 +384,17 @@ class PkgPickerApp(App):
         mkdirp(self.EXPORTS_DIR)
         mkdirp(self.BUNDLES_DIR)
 
-        self.refresh_all()
-        self.build_all()
+        self.warm_start()
+        self.ensure_built("tab_packages")
+        threading.Thread(target=self._load_relations_worker, daemon=True).start()
+        threading.Thread(target=self._watch_catalog, daemon=True).start()
 
-        tabs = self.query_one("#tabs", TabbedContent)
-        tabs.active = "tab_packages"
+        tc = self.query_one("#tabs", TabbedContent)
+        tc.active = "tab_packages"
 
         self.update_status()
         # enforce initial visibility
-        hide = (tabs.active or "") in ("tab_selfcheck", "tab_help")
+        hide = (tc.active or "") in ("tab_selfcheck", "tab_help")
         self.query_one("#statusbar", Static).styles.display = "none" if hide else "block"
         self.query_one("#busy", Static).styles.display = "none" if hide else "block"
 
@@ -342,21 +403,26 @@ class PkgPickerApp(App):
         pane.remove_children()
         return pane
 
-    def build_all(self) -> None:
-        packages_tab.build(self, self.clear_pane("tab_packages"))
-        search_tab.build(self, self.clear_pane("tab_search"))
-        plan_tab.build(self, self.clear_pane("tab_plan"))
-        installed_tab.build(self, self.clear_pane("tab_installed"))
-        ready_tab.build(self, self.clear_pane("tab_ready"))
-        services_tab.build(self, self.clear_pane("tab_services"))
-        presets_tab.build(self, self.clear_pane("tab_presets"))
-        hygiene_tab.build(self, self.clear_pane("tab_hygiene"))
-        history_tab.build(self, self.clear_pane("tab_history"))
-        selfcheck_tab.build(self, self.clear_pane("tab_selfcheck"))
-        help_tab.build(self, self.clear_pane("tab_help"))
+    def ensure_built(self, tab_id: str) -> None:
+        """Import and build a tab the first time it is shown."""
+        if tab_id in self._built or tab_id not in tabs.BY_ID:
+            return
+        self._built.add(tab_id)
+        tabs.load(tab_id).build(self, self.clear_pane(tab_id))
+
+    def rebuild_built(self) -> None:
+        for tab_id in list(self._built):
+            self._built.discard(tab_id)
+            self.ensure_built(tab_id)
+
+    def refresh_tab(self, tab_id: str) -> None:
+        """Refresh a tab's widgets if it exists yet; an unbuilt tab renders fresh on first show."""
+        if tab_id in self._built:
+            tabs.load(tab_id).refresh(self)
 
     # ---------- navigation actions ----------
     def _go(self, tab_id: str) -> None:
+        self.ensure_built(tab_id)
         self.query_one("#tabs", TabbedContent).active = tab_id
 
     def action_go_help(self) -> None: self._go("tab_help")
@@ -365,19 +431,21 @@ class PkgPickerApp(App):
     def action_go_search(self) -> None: self._go("tab_search")
     def action_go_installed(self) -> None: self._go("tab_installed")
     def action_go_plan(self) -> None: self._go("tab_plan")
+    def action_go_upgrades(self) -> None: self._go("tab_upgrades")
     def action_go_ready(self) -> None: self._go("tab_ready")
     def action_go_services(self) -> None: self._go("tab_services")
     def action_go_presets(self) -> None: self._go("tab_presets")
     def action_go_hygiene(self) -> None: self._go("tab_hygiene")
     def action_go_history(self) -> None: self._go("tab_history")
+    def action_go_coverage(self) -> None: self._go("tab_coverage")
 
     def action_focus_search(self) -> None:
         self._go("tab_search")
-        search_tab.focus_input(self)
+        tabs.load("tab_search").focus_input(self)
 
     def action_refresh(self) -> None:
         self.refresh_all()
-        self.build_all()
+        self.rebuild_built()
         self.set_last("Refreshed.")
 
     def action_target_prev(self) -> None:
@@ -385,7 +453,8 @@ class PkgPickerApp(App):
             return
         self.target_idx = max(0, self.target_idx - 1)
         self.refresh_all()
-        packages_tab.refresh(self)
+        self.refresh_tab("tab_packages")
+        self.refresh_tab("tab_coverage")
         self.set_last("Target geändert.")
 
     def action_target_next(self) -> None:
@@ -393,63 +462,64 @@ class PkgPickerApp(App):
             return
         self.target_idx = min(len(self.targets) - 1, self.target_idx + 1)
         self.refresh_all()
-        packages_tab.refresh(self)
+        self.refresh_tab("tab_packages")
+        self.refresh_tab("tab_coverage")
         self.set_last("Target geändert.")
 
     # ---------- global dispatch ----------
     def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
-        table_id = getattr(event.data_table, "id", "")
-        if packages_tab.on_row_highlighted(self, event, table_id): return
-        if search_tab.on_row_highlighted(self, event, table_id): return
-        if installed_tab.on_row_highlighted(self, event, table_id): return
-        if services_tab.on_row_highlighted(self, event, table_id): return
-        if history_tab.on_row_highlighted(self, event, table_id): return
-        if plan_tab.on_row_highlighted(self, event, table_id): return
+        table_id = getattr(event.data_table, "id", "") or ""
+        spec = tabs.TABLES.get(table_id)
+        if spec is not None:
+            tabs.load(spec.id).on_row_highlighted(self, event, table_id)
 
     async def on_button_pressed(self, event) -> None:
-        bid = event.button.id
-        if await packages_tab.on_button(self, bid): return
-        if await search_tab.on_button(self, bid): return
-        if await plan_tab.on_button(self, bid): return
-        if await installed_tab.on_button(self, bid): return
-        if await ready_tab.on_button(self, bid): return
-        if await services_tab.on_button(self, bid): return
-        if await presets_tab.on_button(self, bid): return
-        if await hygiene_tab.on_button(self, bid): return
-        if await history_tab.on_button(self, bid): return
-        if await selfcheck_tab.on_button(self, bid): return
-        if await help_tab.on_button(self, bid): return
+        spec = tabs.BUTTONS.get(event.button.id or "")
+        if spec is not None:
+            await tabs.load(spec.id).on_button(self, event.button.id)
 
     # ---------- key actions ----------
+    def _focused_tab(self):
+        """Module owning the focused table (space/enter act on it), or None."""
+        spec = tabs.TABLES.get(getattr(self.focused, "id", None) or "")
+        return tabs.load(spec.id) if spec is not None else None
+
     def action_toggle(self) -> None:
-        if packages_tab.action_toggle(self): return
-        if search_tab.action_toggle(self): return
-        if installed_tab.action_toggle(self): return
-        if services_tab.action_toggle(self): return
-        if plan_tab.action_toggle(self): return
+        mod = self._focused_tab()
+        if mod is not None and hasattr(mod, "action_toggle"):
+            mod.action_toggle(self)
 
     def action_info(self) -> None:
-        if packages_tab.action_info(self): return
-        if search_tab.action_info(self): return
-        if installed_tab.action_info(self): return
-        if services_tab.action_info(self): return
-        if plan_tab.action_info(self): return
+        mod = self._focused_tab()
+        if mod is not None and hasattr(mod, "action_info"):
+            mod.action_info(self)
 
     def action_add_plan(self) -> None:
-        plan_tab.add_selection_to_plan(self)
+        tabs.load("tab_plan").add_selection_to_plan(self)
 
     async def action_quick_add(self) -> None:
-        await plan_tab.quick_add(self)
+        await tabs.load("tab_plan").quick_add(self)
+
+    async def action_bulk_import(self) -> None:
+        await tabs.load("tab_plan").bulk_import(self)
 
     async def action_apply_plan(self) -> None:
-        await plan_tab.apply_plan(self)
+        await tabs.load("tab_plan").apply_plan(self)
 
     async def action_export_csv(self) -> None:
-        await installed_tab.export_csv(self)
+        await tabs.load("tab_installed").export_csv(self)
 
     async def action_profile_save(self) -> None:
-        await plan_tab.profile_save(self)
+        await tabs.load("tab_plan").profile_save(self)
 
     async def action_profile_load(self) -> None:
-        await plan_tab.profile_load(self)
+        await tabs.load("tab_plan").profile_load(self)
+
+    def action_plan_undo(self) -> None:
+        label = self.plan.undo()
+        self.set_last(f"Undo: {label}" if label else "Nothing to undo")
+
+    def action_plan_redo(self) -> None:
+        label = self.plan.redo()
+        self.set_last(f"Redo: {label}" if label else "Nothing to redo")
 
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import fnmatch
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# systemd unit-file state read from the filesystem (what `systemctl is-enabled` reports),
+# without spawning systemctl per unit.
+ETC_DIR = "/etc/systemd/system"
+RUN_DIR = "/run/systemd/system"
+VENDOR_DIRS = ("/usr/lib/systemd/system", "/lib/systemd/system")
+PRESET_DIRS = ("/etc/systemd/system-preset", "/run/systemd/system-preset", "/usr/lib/systemd/system-preset")
+UNIT_SUFFIXES = (".service", ".socket", ".timer")
+_DEP_DIRS = (".wants", ".requires", ".upholds")
+
+def template_of(unit: str) -> str:
+    """'getty@tty1.service' -> 'getty@.service' (unchanged for non-instances)."""
+    name, dot, suffix = unit.rpartition(".")
+    if "@" in name and not name.endswith("@"):
+        return name.split("@", 1)[0] + "@" + dot + suffix
+    return unit
+
+def _links(base: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """(wanted names, alias targets, masked names) from one config dir."""
+    wanted: Set[str] = set()
+    aliased: Set[str] = set()
+    masked: Set[str] = set()
+    try:
+        entries = list(os.scandir(base))
+    except OSError:
+        return wanted, aliased, masked
+    for e in entries:
+        if e.is_dir(follow_symlinks=False) and e.name.endswith(_DEP_DIRS):
+            try:
+                for w in os.scandir(e.path):
+                    wanted.add(w.name)
+                    if w.is_symlink():
+                        wanted.add(os.path.basename(os.readlink(w.path)))
+            except OSError:
+                continue
+        elif e.is_symlink():
+            try:
+                target = os.readlink(e.path)
+            except OSError:
+                continue
+            if target == "/dev/null":
+                masked.add(e.name)
+            elif os.path.basename(target) != e.name:
+                aliased.add(os.path.basename(target))  # Alias=, e.g. display-manager.service
+    return wanted, aliased, masked
+
+def _find_unit_file(unit: str) -> Optional[str]:
+    for d in (ETC_DIR, RUN_DIR) + VENDOR_DIRS:
+        for name in (unit, template_of(unit)):
+            p = os.path.join(d, name)
+            if os.path.exists(p):
+                return p
+    return None
+
+def _has_install_section(path: str) -> bool:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            section = ""
+            for ln in f:
+                ln = ln.strip()
+                if ln.startswith("["):
+                    section = ln
+                elif section == "[Install]" and ln.split("=", 1)[0].strip() in ("WantedBy", "RequiredBy", "UpheldBy", "Alias", "Also"):
+                    return True
+    except OSError:
+        pass
+    return False
+
+class UnitStates:
+    """One scan of the config dirs; state() is then a set lookup plus at most one file read."""
+
+    def __init__(self):
+        self.wanted, self.aliased, self.masked = _links(ETC_DIR)
+        self.run_wanted, _, run_masked = _links(RUN_DIR)
+        self.masked |= run_masked
+        self.vendor_wanted: Set[str] = set()
+        for d in VENDOR_DIRS:
+            self.vendor_wanted |= _links(d)[0]
+
+    def state(self, unit: str) -> str:
+        if unit in self.masked:
+            return "masked"
+        path = _find_unit_file(unit)
+        if path is None:
+            return "not-found"
+        # instances are enabled one by one; a template counts as enabled if any instance is
+        if unit in self.wanted or unit in self.aliased:
+            return "enabled"
+        if unit in self.run_wanted:
+            return "enabled-runtime"
+        if not _has_install_section(path):
+            return "static"
+        if unit in self.vendor_wanted:
+            return "indirect"
+        return "disabled"
+
+def unit_states(units: Iterable[str]) -> Dict[str, str]:
+    st = UnitStates()
+    return {u: st.state(u) for u in units}
+
+# -------- presets --------
+def preset_rules() -> List[Tuple[str, str]]:
+    """(action, glob) in evaluation order: files sorted by name, /etc shadows /usr/lib."""
+    files: Dict[str, str] = {}
+    for d in reversed(PRESET_DIRS):
+        try:
+            for name in os.listdir(d):
+                if name.endswith(".preset"):
+                    files[name] = os.path.join(d, name)
+        except OSError:
+            continue
+    rules: List[Tuple[str, str]] = []
+    for name in sorted(files):
+        try:
+            for ln in open(files[name], "r", encoding="utf-8", errors="replace"):
+                parts = ln.split()
+                if len(parts) >= 2 and parts[0] in ("enable", "disable"):
+                    rules.append((parts[0], parts[1]))
+        except OSError:
+            continue
+    return rules
+
+def preset_state(unit: str, rules: Optional[List[Tuple[str, str]]] = None) -> str:
+    # systemd: first matching line wins, no match means enabled
+    for action, pat in preset_rules() if rules is None else rules:
+        if fnmatch.fnmatchcase(unit, pat):
+            return action + "d"
+    return "enabled"
+
+def unit_from_path(path: str) -> str:
+    """'usr/lib/systemd/system/sshd.service' -> 'sshd.service'; '' for anything else."""
+    d, _, name = path.rpartition("/")
+    if d.lstrip("/") in ("usr/lib/systemd/system", "lib/systemd/system") and name.endswith(UNIT_SUFFIXES):
+        return name
+    return ""
@@ -0,0 +1,130 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from . import alpm
+from .catalog import Catalog
+from .models import PkgMeta
+from .snapshot import Snapshot
+
+# Every package name packages.json mentions, checked in one pass against the
+# sync DBs (packages, groups, replaces, provides) and one batched AUR lookup for
+# whatever the repos don't have. Reports are kept in the state snapshot, keyed by
+# the catalog's content digest and the sync DB generation.
+SNAPSHOT_KEY = "catalog_check"
+AUR_TTL = 6 * 3600  # AUR moves without touching any local file
+
+AurLookup = Callable[[List[str]], Set[str]]
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    where: str  # category name, "target <id>" or "conflict <name>"
+    name: str
+    kind: str  # unknown | source | renamed | group | virtual
+    detail: str = ""
+
+@dataclass(slots=True)
+class Report:
+    findings: List[Finding]
+    checked: int
+    aur_error: str = ""
+    ts: float = 0.0
+    cached: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"findings": [[f.where, f.name, f.kind, f.detail] for f in self.findings],
+                "checked": self.checked, "aur_error": self.aur_error, "ts": self.ts}
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "Report":
+        return cls([Finding(*f) for f in obj["findings"]], obj["checked"], obj["aur_error"], obj["ts"], cached=True)
+
+def catalog_refs(cat: Catalog) -> List[Tuple[str, str, Optional[str]]]:
+    """(where, name, expected source) for each mention. Target → Plan installs from the repos."""
+    out: List[Tuple[str, str, Optional[str]]] = []
+    for i, c in enumerate(cat.categories):
+        out.extend((c, it.name, it.source) for it in cat.items(i))
+    for t in cat.targets:
+        out.extend((f"target {t.id}", n, "repo") for n in (*t.required_packages, *t.recommended_packages))
+    for r in cat.conflicts:
+        out.extend((f"conflict {r.name}", n, None) for n in r.group)
+    return out
+
+def sync_indexes(sync: Mapping[str, PkgMeta]) -> Tuple[Dict[str, List[str]], Dict[str, str], Dict[str, List[str]]]:
+    """(group → member packages, replaced name → replacing package, provided name → providers)."""
+    groups: Dict[str, List[str]] = {}
+    replaced: Dict[str, str] = {}
+    for m in sync.values():
+        for g in m.groups:
+            groups.setdefault(g, []).append(m.name)
+        for r in m.replaces:
+            replaced.setdefault(alpm.dep_name(r), m.name)
+    return groups, replaced, alpm.provides_index(sync.values())
+
+def check(cat: Catalog, sync: Mapping[str, PkgMeta], aur_lookup: Optional[AurLookup] = None) -> Report:
+    refs = catalog_refs(cat)
+    groups, replaced, prov = sync_indexes(sync)
+
+    outside = sorted({n for _, n, _ in refs if n not in sync})
+    aur: Set[str] = set()
+    err = ""
+    if aur_lookup is not None and outside:
+        try:
+            aur = aur_lookup(outside)
+        except (OSError, ValueError) as e:
+            err = str(e)
+    aur_checked = aur_lookup is not None and not err
+
+    out: List[Finding] = []
+    for where, n, src in refs:
+        m = sync.get(n)
+        if m is not None:
+            if src == "aur":
+                out.append(Finding(where, n, "source", f"in {m.repo}, source ist aur"))
+            continue
+        if n in aur:
+            if src == "repo":
+                out.append(Finding(where, n, "source", "nur im AUR, source ist repo"))
+            continue
+        if n in replaced:
+            out.append(Finding(where, n, "renamed", f"ersetzt durch {replaced[n]}"))
+        elif n in groups:
+            out.append(Finding(where, n, "group", f"Paketgruppe ({len(groups[n])} Pakete)"))
+        elif n in prov:
+            out.append(Finding(where, n, "virtual", "bereitgestellt von " + ", ".join(sorted(prov[n])[:3])))
+        elif aur_checked or src == "repo":
+            out.append(Finding(where, n, "unknown", "weder Repos noch AUR" if aur_checked else "nicht in den Repos"))
+    return Report(out, len({n for _, n, _ in refs}), err, time.time())
+
+def aur_lookup(backend: Any = None) -> AurLookup:
+    """Names known to the AUR: the daemon's packages.gz index if it has one, else batched RPC info calls."""
+    def look(names: List[str]) -> Set[str]:
+        if backend is not None:
+            try:
+                got = backend.call("aur_known", names=names)
+            except Exception:  # daemon gone or too old; the RPC path below still works
+                got = None
+            if got is not None:
+                return set(got)
+        from .aur import aur_info
+        return set(aur_info(names))
+    return look
+
+def validate(cat: Catalog, snap: Optional[Snapshot] = None, aur: bool = True, backend: Any = None,
+             force: bool = False) -> Report:
+    token = [cat.digest(), alpm.sync_generation(), aur]
+    if snap is not None and not force:
+        val, fresh = snap.get(SNAPSHOT_KEY, token)
+        if fresh and isinstance(val, dict) and not (aur and (val["aur_error"] or time.time() - val["ts"] > AUR_TTL)):
+            return Report.from_json(val)
+    rep = check(cat, alpm.sync_packages(), aur_lookup(backend) if aur else None)
+    if snap is not None:
+        snap.put(SNAPSHOT_KEY, token, rep.to_json())
+    return rep
+
+def by_kind(findings: Iterable[Finding]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for f in findings:
+        out[f.kind] = out.get(f.kind, 0) + 1
+    return out
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Pure-Python port of pacman's alpm_pkg_vercmp / rpmvercmp (lib/libalpm/version.c).
+# ctype is used in the C locale there, so only ASCII counts as digit/alpha.
+
+def _isdigit(c: str) -> bool:
+    return "0" <= c <= "9"
+
+def _isalpha(c: str) -> bool:
+    return ("a" <= c <= "z") or ("A" <= c <= "Z")
+
+def _isalnum(c: str) -> bool:
+    return _isdigit(c) or _isalpha(c)
+
+def rpmvercmp(a: str, b: str) -> int:
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    one = two = 0
+    ptr1 = ptr2 = 0
+    while one < la and two < lb:
+        while one < la and not _isalnum(a[one]):
+            one += 1
+        while two < lb and not _isalnum(b[two]):
+            two += 1
+        if not (one < la and two < lb):
+            break
+        # different separator lengths decide on their own
+        if (one - ptr1) != (two - ptr2):
+            return -1 if (one - ptr1) < (two - ptr2) else 1
+        ptr1, ptr2 = one, two
+        if _isdigit(a[ptr1]):
+            while ptr1 < la and _isdigit(a[ptr1]):
+                ptr1 += 1
+            while ptr2 < lb and _isdigit(b[ptr2]):
+                ptr2 += 1
+            isnum = True
+        else:
+            while ptr1 < la and _isalpha(a[ptr1]):
+                ptr1 += 1
+            while ptr2 < lb and _isalpha(b[ptr2]):
+                ptr2 += 1
+            isnum = False
+        if one == ptr1:
+            return -1
+        # numeric segments are always newer than alpha segments
+        if two == ptr2:
+            return 1 if isnum else -1
+        s1, s2 = a[one:ptr1], b[two:ptr2]
+        if isnum:
+            s1 = s1.lstrip("0")
+            s2 = s2.lstrip("0")
+            if len(s1) != len(s2):
+                return 1 if len(s1) > len(s2) else -1
+        if s1 != s2:
+            return -1 if s1 < s2 else 1
+        one, two = ptr1, ptr2
+    if one >= la and two >= lb:
+        return 0
+    # a remaining alpha string never beats an empty string
+    rest1 = a[one] if one < la else ""
+    rest2 = b[two] if two < lb else ""
+    if (not rest1 and not (rest2 and _isalpha(rest2))) or (rest1 and _isalpha(rest1)):
+        return -1
+    return 1
+
+@lru_cache(maxsize=65536)
+def parse_evr(evr: str) -> Tuple[str, str, Optional[str]]:
+    """'1:2.0-3' -> ('1', '2.0', '3'); epoch defaults to '0', release may be None."""
+    s = 0
+    while s < len(evr) and _isdigit(evr[s]):
+        s += 1
+    se = evr.rfind("-", s)
+    if s < len(evr) and evr[s] == ":":
+        epoch = evr[:s] or "0"
+        start = s + 1
+    else:
+        epoch = "0"
+        start = 0
+    if se >= 0:
+        return epoch, evr[start:se], evr[se + 1:]
+    return epoch, evr[start:], None
+
+def vercmp(a: Optional[str], b: Optional[str]) -> int:
+    """<0 if a is older than b, 0 if equal, >0 if newer (same semantics as `vercmp a b`)."""
+    if a is None and b is None:
+        return 0
+    if a is None:
+        return -1
+    if b is None:
+        return 1
+    if a == b:
+        return 0
+    e1, v1, r1 = parse_evr(a)
+    e2, v2, r2 = parse_evr(b)
+    ret = rpmvercmp(e1, e2)
+    if ret == 0:
+        ret = rpmvercmp(v1, v2)
+        if ret == 0 and r1 is not None and r2 is not None:
+            ret = rpmvercmp(r1, r2)
+    return ret
+
+# A version string as a tuple key: one (rank, separator length, value) per segment,
+# then an end marker. The ranks reproduce rpmvercmp's tail rules: a bare alpha suffix
+# is older than the end ("1.0a" < "1.0"), while anything behind a separator is newer
+# ("1.0" < "1.0.a") unless the shorter side has trailing separators of its own.
+_ALPHA, _END, _ALPHA_SEP, _END_SEP, _NUM = 0, 1, 2, 3, 4
+
+_SEG_RX = re.compile(r"([^0-9A-Za-z]*)(?:([0-9]+)|([A-Za-z]+))")
+
+def _segments(s: str) -> Tuple[tuple, ...]:
+    out = []
+    end = 0
+    for m in _SEG_RX.finditer(s):
+        sep, num, alpha = m.groups()
+        if num is not None:
+            num = num.lstrip("0")
+            out.append((_NUM, len(sep), (len(num), num)))
+        else:
+            out.append((_ALPHA_SEP if sep else _ALPHA, len(sep), alpha))
+        end = m.end()
+    out.append((_END_SEP if end < len(s) else _END,))
+    return tuple(out)
+
+@lru_cache(maxsize=65536)
+def version_key(evr: str) -> Tuple[tuple, ...]:
+    """
+    Sort key that orders like vercmp(), computed once per version string.
+    rpmvercmp is not transitive when both separator length and segment type differ
+    at the same position; there the key orders by segment type.
+    """
+    e, v, r = parse_evr(evr)
+    return _segments(e), _segments(v), _segments(r) if r is not None else ()